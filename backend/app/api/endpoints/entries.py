@@ -0,0 +1,50 @@
+"""
+API endpoint for reading stored journal entries.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from ...db.crud import get_journal_entries
+from ...db.init_db import get_async_db
+from ...utils.pagination import decode_cursor, encode_cursor
+
+router = APIRouter()
+
+# Largest page a client may request
+MAX_PAGE_SIZE = 500
+
+@router.get("/entries/")
+async def list_entries(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    year: Optional[int] = None,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    summary: bool = False,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List journal entries by date, a page at a time.
+    Pass the returned ``next_cursor`` as ``cursor`` to get the following page;
+    it is null on the last page. ``summary=true`` leaves out the content and
+    analysis fields, for lists and dashboards.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # One row past the page tells whether another page follows
+    rows = await get_journal_entries(
+        db, after=after, limit=limit + 1, year=year, month=month,
+        summary=summary, descending=order == "desc"
+    )
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(page[-1].entry_date, page[-1].id)
+
+    return {
+        "entries": [dict(row._mapping) for row in page],
+        "next_cursor": next_cursor
+    }
@@ -1,26 +1,34 @@
 """
 API endpoint for file uploads and processing.
 """
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
-import tempfile
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
 import os
 from ...services.pdf_processor import PDFProcessor
-from ...services.entry_parser import EntryParser
-from ...services.data_cleaner import DataCleaner
-from ...services.data_validator import DataValidator
+from ...services.entry_parser import EntryParser, ParsedEntry
+from ...services.batch_stage import clean_and_validate
 from ...services.db_operations import DatabaseOperations
-from ...db.init_db import get_db
+from ...services.incremental_sync import IncrementalSync
+from ...services.checkpoint_store import CheckpointStore, IngestCheckpoint
+from ...services.embedding_pipeline import embed_pending_entries
+from ...db.init_db import AsyncSessionLocal
 from ...models.journal import JournalEntrySchema
 import logging
-from ...services.status_manager import StatusManager
+from ...services.status_manager import StatusManager, BatchStatus
 from ...core.config import settings
+from ...utils.uploads import SpooledUpload, spool_multipart_files
 import traceback
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# File hashes of jobs running in this process, so a resume never doubles up
+_active_jobs: Set[str] = set()
+# Strong references to resumed jobs so they are not garbage collected mid-run
+_resumed_tasks: Set[asyncio.Task] = set()
+
 # Add size limit (e.g., 50MB)
 MAX_FILE_SIZE = 52_428_800  # 50MB in bytes
 
@@ -31,43 +39,158 @@ class ProcessingStatus:
         self.errors = []
         self.success_count = 0
 
-@router.post("/upload/")
+async def _spool(request: Request, field: str, max_files: Optional[int] = None) -> List[SpooledUpload]:
+    """
+    Stream the PDFs of a form field from the request body to disk, rejecting
+    the upload as soon as a file crosses MAX_FILE_SIZE.
+    """
+    os.makedirs(settings.INGEST_SPOOL_DIR, exist_ok=True)
+    try:
+        return await spool_multipart_files(
+            request, field, max_size=MAX_FILE_SIZE, max_files=max_files,
+            suffix=".pdf", spool_dir=settings.INGEST_SPOOL_DIR
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _pdf_form(field: str, multiple: bool = False) -> dict:
+    """
+    OpenAPI request body for a PDF form field. The endpoints read the body
+    themselves, so FastAPI cannot derive it and /docs would offer no file picker.
+    """
+    pdf = {"type": "string", "format": "binary"}
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "required": [field],
+        "properties": {field: {"type": "array", "items": pdf} if multiple else pdf},
+    }}}}}
+
+def _claim_job(upload: SpooledUpload) -> None:
+    """
+    Mark a file as being processed, refusing a duplicate of a running job.
+    """
+    if upload.sha256 in _active_jobs:
+        upload.cleanup()
+        raise HTTPException(status_code=409, detail=f"{upload.filename} is already being processed")
+    _active_jobs.add(upload.sha256)
+
+@router.post("/upload/", openapi_extra=_pdf_form("file"))
 async def upload_file(
-    file: UploadFile = File(...),
-    background_tasks: BackgroundTasks = None,
-    db: Session = Depends(get_db)
+    request: Request,
+    incremental: bool = False,
+    background_tasks: BackgroundTasks = None
 ):
     """
-    Handle file upload and processing.
+    Handle file upload and processing; the PDF is sent in the ``file`` form field.
+    With ``incremental=true`` the upload is diffed against entries already
+    stored for the same file name instead of being inserted wholesale.
     """
-    # Check file type
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
-    
-    # Check file size
-    file.file.seek(0, 2)  # Seek to end of file
-    file_size = file.file.tell()  # Get current position (file size)
-    file.file.seek(0)  # Reset position to start
-    
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File size exceeds maximum limit of {MAX_FILE_SIZE // 1_048_576}MB"
-        )
+    # The body is read here rather than by FastAPI's form parsing, which
+    # would receive the whole file before the size limit could apply
+    [upload] = await _spool(request, "file", max_files=1)
+    _claim_job(upload)
     
     # Create processing status using StatusManager
     status = StatusManager.create()
     
     # Add processing task to background
+    # The job opens its own session; a request-scoped one would be closed
+    # before the background task runs
     background_tasks.add_task(
-        process_file,
-        file,
+        _process_with_session,
+        upload,
         status,
-        db
+        incremental
     )
     
     return {"message": "Processing started", "status_id": id(status)}
 
+@router.post("/upload/batch/", openapi_extra=_pdf_form("files", multiple=True))
+async def upload_batch(
+    request: Request,
+    incremental: bool = False,
+    background_tasks: BackgroundTasks = None
+):
+    """
+    Handle a multi-file upload in the ``files`` form field. Files are processed
+    concurrently, limited to BATCH_UPLOAD_WORKERS at a time, under a single
+    batch status id. Files with the same content as another in the batch or
+    a running job are listed under ``skipped`` instead.
+    """
+    spooled = await _spool(request, "files")
+    # A file repeated within the batch, or already being processed, is
+    # skipped so the rest of the batch still runs
+    uploads: List[SpooledUpload] = []
+    claimed: Dict[str, str] = {}
+    skipped: Dict[str, str] = {}
+    for upload in spooled:
+        if upload.sha256 in claimed:
+            skipped[upload.filename] = f"duplicate of {claimed[upload.sha256]}"
+        elif upload.sha256 in _active_jobs:
+            skipped[upload.filename] = "already being processed"
+        else:
+            _active_jobs.add(upload.sha256)
+            claimed[upload.sha256] = upload.filename
+            uploads.append(upload)
+            continue
+        upload.cleanup()
+    if not uploads:
+        raise HTTPException(status_code=409, detail="Every file of the batch is already being processed")
+    
+    batch = StatusManager.create_batch([upload.filename for upload in uploads])
+    
+    background_tasks.add_task(
+        process_batch,
+        uploads,
+        batch,
+        incremental
+    )
+    
+    return {
+        "message": "Batch processing started",
+        "batch_id": id(batch),
+        "status_ids": {filename: id(status) for filename, status in batch.files},
+        "skipped": skipped
+    }
+
+@router.post("/upload/resume/")
+async def resume_uploads():
+    """
+    Resume ingestion jobs that were interrupted, e.g. by a worker restart.
+    """
+    resumed = await resume_interrupted_jobs()
+    return {
+        "message": f"Resumed {len(resumed)} jobs",
+        "status_ids": {filename: id(status) for filename, status in resumed}
+    }
+
+@router.get("/status/batch/{batch_id}")
+async def get_batch_status(batch_id: int):
+    """
+    Get per-file and aggregate processing status for a batch upload.
+    """
+    batch = StatusManager.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    return {
+        "status": batch.status,
+        "progress": batch.progress,
+        "success_count": batch.success_count,
+        "files": [
+            {
+                "filename": filename,
+                "status_id": id(status),
+                "status": status.status,
+                "progress": status.progress,
+                "errors": status.errors,
+                "success_count": status.success_count,
+                "validation": status.validation.to_dict()
+            }
+            for filename, status in batch.files
+        ]
+    }
+
 @router.get("/status/{status_id}")
 async def get_status(status_id: int):
     """
@@ -81,101 +204,286 @@ async def get_status(status_id: int):
         "status": status.status,
         "progress": status.progress,
         "errors": status.errors,
-        "success_count": status.success_count
+        "success_count": status.success_count,
+        "cache_hits": status.cache_hits,
+        "cache_misses": status.cache_misses,
+        "inserted_count": status.inserted_count,
+        "updated_count": status.updated_count,
+        "skipped_count": status.skipped_count,
+        "deleted_count": status.deleted_count,
+        "embedded_count": status.embedded_count,
+        "validation": status.validation.to_dict()
     }
 
-async def process_file(file: UploadFile, status: ProcessingStatus, db: Session):
+async def process_batch(uploads: List[SpooledUpload], batch: BatchStatus, incremental: bool = False):
+    """
+    Process every file of a batch upload with bounded concurrency.
+    Each file gets its own database session since sessions are not shareable
+    across concurrently running tasks.
+    """
+    semaphore = asyncio.Semaphore(settings.BATCH_UPLOAD_WORKERS or os.cpu_count() or 1)
+    
+    async def process_one(upload: SpooledUpload, status: ProcessingStatus):
+        async with semaphore:
+            await _process_with_session(upload, status, incremental)
+    
+    results = await asyncio.gather(
+        *(process_one(upload, status) for upload, (_, status) in zip(uploads, batch.files)),
+        return_exceptions=True
+    )
+    failures = sum(1 for result in results if isinstance(result, Exception))
+    logger.info(f"Batch complete: {len(uploads) - failures} files succeeded, {failures} failed")
+
+async def _process_with_session(upload: SpooledUpload, status: ProcessingStatus, incremental: bool = False):
+    """
+    Run process_file with a database session of its own.
+    """
+    async with AsyncSessionLocal() as db:
+        await process_file(upload, status, db, incremental)
+
+async def _store_batch(
+    batch: List[ParsedEntry],
+    db_operations: DatabaseOperations,
+    status: ProcessingStatus,
+    sync: Optional[IncrementalSync] = None
+) -> int:
+    """
+    Clean, validate and store one batch of parsed entries.
+    Returns the number of entries that passed validation.
+    """
+    # CPU-bound cleaning and validation run in worker processes so the
+    # event loop stays free to answer status polls
+    stage = await clean_and_validate(batch)
+    valid_entries = stage.valid_entries
+    status.validation.merge(stage.diagnostics)
+    if stage.errors:
+        status.errors.extend(stage.errors)
+    logger.debug(f"Batch validated: {len(valid_entries)} of {len(batch)} entries valid")
+    if not valid_entries:
+        return 0
+    
+    if sync:
+        success_count, errors = await sync.apply_batch(valid_entries)
+        status.inserted_count = sync.inserted
+        status.updated_count = sync.updated
+        status.skipped_count = sync.unchanged
+    else:
+        success_count, errors = await db_operations.store_entries(valid_entries)
+        status.inserted_count = db_operations.inserted
+        status.skipped_count = db_operations.skipped
+    status.success_count += success_count
+    if errors:
+        status.errors.extend(errors)
+    return len(valid_entries)
+
+async def _embed_entries(db: AsyncSession, source_file: str, status: ProcessingStatus) -> None:
     """
-    Process the uploaded file using our pipeline.
+    Embed the entries of a file that have no embedding yet. A failure is
+    reported but does not fail the job: the entries are stored, and the next
+    upload of the file or scripts/embed_entries.py embeds them.
+    """
+    if not settings.OPENAI_API_KEY:
+        logger.info("OPENAI_API_KEY is not set, leaving entries without embeddings")
+        return
+    try:
+        stats = await embed_pending_entries(db, source_file=source_file)
+        status.embedded_count = stats.texts
+        logger.info(f"Embeddings: {stats.summary()}")
+    except Exception as e:
+        await db.rollback()
+        error_msg = f"Embedding failed, entries are stored without embeddings: {str(e)}"
+        logger.error(error_msg)
+        status.errors.append(error_msg)
+
+async def process_file(
+    upload: SpooledUpload,
+    status: ProcessingStatus,
+    db: AsyncSession,
+    incremental: bool = False
+):
+    """
+    Process the spooled upload using our pipeline. The caller must have claimed
+    the job with _claim_job. Progress is checkpointed after every stored batch; if the job is interrupted
+    (cancelled, or the worker dies) the spooled file and checkpoint are kept so it can resume where it
+    stopped. A job that fails with an error is over: both are removed and the next upload starts afresh.
     """
     # Initialize services
     pdf_processor = PDFProcessor()
     entry_parser = EntryParser()
-    data_cleaner = DataCleaner()
-    data_validator = DataValidator()
     db_operations = DatabaseOperations(db)
+    checkpoints = CheckpointStore(settings.INGEST_CHECKPOINT_DIR)
+    finished = False
     
     try:
-        logger.info(f"Starting to process file: {file.filename}")
+        logger.info(f"Starting to process file: {upload.filename} ({upload.size} bytes at {upload.path})")
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file.flush()
-            
-            logger.info(f"Saved temporary file: {temp_file.name}")
-            status.progress = 10
-            
-            # Process PDF
-            logger.info("Starting PDF processing")
-            extracted_content = await pdf_processor.process_pdf(temp_file.name)
-            logger.info(f"PDF processing complete. Content length: {len(extracted_content)}")
-            logger.info(f"Content preview: {extracted_content[:200]}...")  # Debug line
-            status.progress = 30
-            
-            # Parse entries
-            logger.info("Starting entry parsing")
-            entries = entry_parser.parse_entries(
-                content=extracted_content,
-                source_file=file.filename
+        checkpoint = checkpoints.load(upload.sha256)
+        if checkpoint is not None and checkpoint.attempts >= settings.INGEST_MAX_ATTEMPTS:
+            logger.warning(f"Starting over after {checkpoint.attempts} interrupted runs")
+            if checkpoint.spool_path != upload.path:
+                SpooledUpload(checkpoint.spool_path, upload.filename, upload.size, upload.sha256).cleanup()
+            checkpoint = None
+        if checkpoint is not None and checkpoint.incremental and checkpoint.unmatched_rows is None:
+            # Written without the rows left to match, so deletions could not be resumed
+            logger.warning("Starting over: the checkpoint does not record which rows were matched")
+            checkpoint = None
+        resuming = checkpoint is not None
+        if checkpoint is None:
+            checkpoint = IngestCheckpoint(
+                file_hash=upload.sha256,
+                filename=upload.filename,
+                spool_path=upload.path,
+                incremental=incremental
             )
-            logger.info(f"Entry parsing complete. Found {len(entries)} entries")
-            if entries:
-                sample_entry = entries[0]
-                logger.info(f"Sample entry: {sample_entry}")
-            status.progress = 50
-            
-            # Clean entries
-            logger.info("Starting data cleaning")
-            cleaned_entries = [
-                {
-                    **entry,
-                    "content": data_cleaner.clean_text(entry["content"])
-                }
-                for entry in entries
-            ]
-            logger.info(f"Data cleaning complete. Cleaned {len(cleaned_entries)} entries")
-            if cleaned_entries:
-                logger.info(f"Sample cleaned entry: {cleaned_entries[0]}")
-            status.progress = 70
-            
-            # Validate entries
-            logger.info("Starting entry validation")
-            valid_entries = data_validator.validate_entries(cleaned_entries)
-            logger.info(f"Validation complete. {len(valid_entries)} valid entries")
-            if valid_entries:
-                logger.info(f"Sample valid entry: {valid_entries[0]}")
-            status.progress = 80
+        else:
+            logger.info(
+                f"Resuming from page {checkpoint.resume_page} "
+                f"({checkpoint.entries_stored} entries already stored)"
+            )
+            checkpoint.attempts += 1
+            incremental = checkpoint.incremental
+            if checkpoint.spool_path != upload.path:
+                # Same file uploaded again after an interruption: keep only the new copy
+                SpooledUpload(checkpoint.spool_path, upload.filename, upload.size, upload.sha256).cleanup()
+                checkpoint.spool_path = upload.path
+        resume_page = checkpoint.resume_page
+        skip_entries = checkpoint.skip_entries
+        
+        sync = None
+        if incremental:
+            # Rows matched or inserted by an interrupted run are left alone
+            sync = IncrementalSync(db, upload.filename, unmatched=checkpoint.unmatched_rows if resuming else None)
+            await sync.load()
+            checkpoint.unmatched_rows = sync.unmatched_rows()
+        checkpoints.save(checkpoint)
+        status.progress = 10
+        
+        # Stream pages -> entries -> cleaned/validated/stored batches so that
+        # memory stays proportional to one batch rather than the whole journal
+        logger.info("Starting streaming PDF processing")
+        pages = pdf_processor.iter_pages(upload.path, file_hash=upload.sha256, start_page=resume_page)
+        entries = entry_parser.iter_entries(pages, source_file=upload.filename)
+        
+        total_parsed = 0
+        total_valid = checkpoint.entries_stored
+        batch = []
+        # Entries seen so far that start on the current page, for the checkpoint
+        run_page, run_length = None, 0
+        async for entry in entries:
+            if entry.page == run_page:
+                run_length += 1
+            else:
+                run_page, run_length = entry.page, 1
+            if entry.page == resume_page and run_length <= skip_entries:
+                # Already handled before the interruption
+                continue
             
-            # Store entries
-            logger.info("Starting database storage")
-            if not valid_entries:
-                logger.error("No valid entries to store!")
-                raise ValueError("No valid entries found after validation")
-                
-            success_count, errors = await db_operations.store_entries(valid_entries)
-            logger.info(f"Storage complete. Stored {success_count} entries with {len(errors)} errors")
+            total_parsed += 1
+            batch.append(entry)
+            if len(batch) < settings.INGEST_BATCH_SIZE:
+                continue
             
-            # Update status
-            status.status = "completed"
-            status.progress = 100
-            status.success_count = success_count
-            if errors:
-                status.errors.extend(errors)
+            total_valid += await _store_batch(
+                batch, db_operations, status, sync
+            )
+            checkpoint.resume_page = run_page
+            checkpoint.skip_entries = run_length
+            checkpoint.entries_stored = total_valid
+            if sync:
+                checkpoint.unmatched_rows = sync.unmatched_rows()
+            checkpoints.save(checkpoint)
+            batch = []
+            # Extraction accounts for the bulk of the work between 10% and 95%
+            if pdf_processor.page_count:
+                status.progress = 10 + int(85 * entry.page / pdf_processor.page_count)
+            status.cache_hits = pdf_processor.cache_hits
+            status.cache_misses = pdf_processor.cache_misses
+        
+        if batch:
+            total_valid += await _store_batch(
+                batch, db_operations, status, sync
+            )
+        status.cache_hits = pdf_processor.cache_hits
+        status.cache_misses = pdf_processor.cache_misses
+        
+        logger.info(
+            f"Streaming complete. Parsed {total_parsed} entries, "
+            f"stored {status.success_count} with {len(status.errors)} errors"
+        )
+        logger.info(f"Validation: {status.validation.summary()}")
+        if total_valid == 0:
+            logger.error("No valid entries to store!")
+            raise ValueError("No valid entries found after validation")
+        
+        # Rows missing from the new export are only removed once the whole file is read
+        if sync:
+            status.deleted_count = await sync.finish()
+        
+        if settings.EMBED_ON_INGEST:
+            await _embed_entries(db, upload.filename, status)
+        
+        # Update status
+        status.status = "completed"
+        status.progress = 100
+        finished = True
             
     except Exception as e:
         logger.error(f"Processing failed: {str(e)}")
         logger.error(traceback.format_exc())  # Log full traceback
         status.status = "failed"
         status.errors.append(str(e))
+        # Retrying would fail the same way, e.g. on a corrupt PDF
+        finished = True
         raise HTTPException(status_code=500, detail=str(e))
         
     finally:
-        # Cleanup
-        if 'temp_file' in locals():
+        _active_jobs.discard(upload.sha256)
+        # Interrupted jobs keep their spooled file and checkpoint so they can be resumed
+        if finished:
+            checkpoints.delete(upload.sha256)
             try:
-                os.unlink(temp_file.name)
-                logger.info(f"Cleaned up temporary file: {temp_file.name}")
+                upload.cleanup()
+                logger.info(f"Cleaned up spooled file: {upload.path}")
             except Exception as e:
-                logger.error(f"Error cleaning up temporary file: {str(e)}") 
\ No newline at end of file
+                logger.error(f"Error cleaning up spooled file: {str(e)}")
+        else:
+            logger.info(f"Keeping spooled file {upload.path} for resume")
+
+async def resume_interrupted_jobs() -> List[Tuple[str, ProcessingStatus]]:
+    """
+    Restart every ingestion job that has a checkpoint but is not running.
+    Returns (filename, status) for each resumed job.
+    """
+    checkpoints = CheckpointStore(settings.INGEST_CHECKPOINT_DIR)
+    resumed = []
+    
+    for checkpoint in checkpoints.pending():
+        if checkpoint.file_hash in _active_jobs:
+            continue
+        if not os.path.exists(checkpoint.spool_path):
+            logger.warning(f"Dropping checkpoint for {checkpoint.filename}: spooled file is gone")
+            checkpoints.delete(checkpoint.file_hash)
+            continue
+        if checkpoint.attempts >= settings.INGEST_MAX_ATTEMPTS:
+            # The job keeps dying, e.g. a PDF that crashes the worker
+            logger.warning(f"Giving up on {checkpoint.filename} after {checkpoint.attempts} attempts")
+            checkpoints.delete(checkpoint.file_hash)
+            SpooledUpload(checkpoint.spool_path, checkpoint.filename, 0, checkpoint.file_hash).cleanup()
+            continue
+        
+        upload = SpooledUpload(
+            path=checkpoint.spool_path,
+            filename=checkpoint.filename,
+            size=os.path.getsize(checkpoint.spool_path),
+            sha256=checkpoint.file_hash
+        )
+        status = StatusManager.create()
+        _claim_job(upload)
+        task = asyncio.create_task(_process_with_session(upload, status, checkpoint.incremental))
+        _resumed_tasks.add(task)
+        task.add_done_callback(_resumed_tasks.discard)
+        resumed.append((checkpoint.filename, status))
+    
+    if resumed:
+        logger.info(f"Resumed {len(resumed)} interrupted ingestion jobs")
+    return resumed
@@ -2,10 +2,39 @@
 """
 CRUD operations for database models.
 """
-from typing import List, Optional
+from calendar import monthrange
+from datetime import date
+from typing import AsyncIterator, List, Optional, Tuple
+from sqlalchemy import Row, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.journal import JournalEntry, AnalysisResult
 
+# Columns of a summary row. ix_journal_entries_entry_date_id includes all of
+# them, so summary pages are read from the index alone.
+SUMMARY_COLUMNS = (
+    JournalEntry.id,
+    JournalEntry.entry_date,
+    JournalEntry.year,
+    JournalEntry.month,
+    JournalEntry.day,
+    JournalEntry.day_of_week,
+    JournalEntry.word_count,
+    JournalEntry.source_file,
+)
+
+# Summary columns plus content and analysis; embeddings are never listed
+FULL_COLUMNS = SUMMARY_COLUMNS + (
+    JournalEntry.content,
+    JournalEntry.sentiment_score,
+    JournalEntry.complexity_score,
+    JournalEntry.topics,
+    JournalEntry.mentioned_people,
+    JournalEntry.mentioned_locations,
+    JournalEntry.created_at,
+    JournalEntry.updated_at,
+)
+
 def create_journal_entry(
     db: Session,
     user_id: int,
@@ -16,12 +45,50 @@ def create_journal_entry(
     # TODO: Implement journal entry creation
     pass
 
-def get_journal_entries(
-    db: Session,
-    user_id: int,
-    skip: int = 0,
-    limit: int = 100
-) -> List[JournalEntry]:
-    """Get journal entries for a user."""
-    # TODO: Implement journal entry retrieval
-    pass
\ No newline at end of file
+async def get_journal_entries(
+    db: AsyncSession,
+    after: Optional[Tuple[date, int]] = None,
+    limit: int = 100,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    summary: bool = False,
+    descending: bool = False
+) -> List[Row]:
+    """
+    Get a page of journal entries ordered by (entry_date, id).
+
+    ``after`` is the (entry_date, id) of the last row of the previous page;
+    the page starts right after it, so every page is an index range scan of
+    ``limit`` rows, however deep it is. ``year`` limits the scan to one
+    partition. ``summary`` leaves out content and analysis columns.
+    """
+    order = (JournalEntry.entry_date, JournalEntry.id)
+    query = select(*(SUMMARY_COLUMNS if summary else FULL_COLUMNS))
+    if after is not None:
+        key = tuple_(*order)
+        query = query.where(key < tuple_(*after) if descending else key > tuple_(*after))
+    if year is not None:
+        query = query.where(JournalEntry.year == year)
+        if month is not None:
+            # A date range the index can seek to, rather than a filter on month
+            query = query.where(
+                JournalEntry.entry_date >= date(year, month, 1),
+                JournalEntry.entry_date <= date(year, month, monthrange(year, month)[1])
+            )
+    if month is not None:
+        query = query.where(JournalEntry.month == month)
+    query = query.order_by(*(column.desc() for column in order) if descending else order).limit(limit)
+
+    result = await db.execute(query)
+    return result.fetchall()
+
+async def iter_journal_entries(db: AsyncSession, page_size: int = 1000, **filters) -> AsyncIterator[Row]:
+    """Every journal entry matching ``filters`` (see get_journal_entries), fetched page by page, e.g. for exports."""
+    after = None
+    while True:
+        page = await get_journal_entries(db, after=after, limit=page_size, **filters)
+        for row in page:
+            yield row
+        if len(page) < page_size:
+            return
+        after = (page[-1].entry_date, page[-1].id)
@@ -0,0 +1,165 @@
+"""
+How embeddings are stored, indexed and searched.
+
+EMBEDDING_DIMENSIONS and EMBEDDING_STORAGE decide the column type
+(``vector(256)``, ``halfvec(256)``, ...). EMBEDDING_INDEX_QUANTIZATION decides
+what the similarity index is built over: the column itself, a half-precision
+cast of it, or its binary quantization. A quantized index only yields
+candidates; they are reranked by exact distance on the stored column.
+
+halfvec and binary quantization need pgvector 0.7 or later on the server.
+"""
+from typing import Any, Callable, List, Optional
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import cast, func
+from ..core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+RunSQL = Callable[[str], List[Any]]
+
+STORAGE_TYPES = ("vector", "halfvec")
+INDEX_QUANTIZATIONS = ("none", "halfvec", "binary")
+
+# Distance operator and operator class suffix of each supported metric
+METRICS = {
+    "cosine": ("<=>", "cosine_ops"),
+    "l2": ("<->", "l2_ops"),
+    "inner_product": ("<#>", "ip_ops"),
+}
+
+def _storage(storage: Optional[str] = None) -> str:
+    storage = storage or settings.EMBEDDING_STORAGE
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"Unknown embedding storage {storage!r}, expected one of {STORAGE_TYPES}")
+    return storage
+
+def _quantization(quantization: Optional[str] = None) -> str:
+    quantization = quantization or settings.EMBEDDING_INDEX_QUANTIZATION
+    if quantization not in INDEX_QUANTIZATIONS:
+        raise ValueError(f"Unknown index quantization {quantization!r}, expected one of {INDEX_QUANTIZATIONS}")
+    return quantization
+
+def embedding_sql_type(storage: Optional[str] = None, dimensions: Optional[int] = None) -> str:
+    """SQL type of the embedding column, e.g. ``halfvec(256)``."""
+    return f"{_storage(storage)}({dimensions or settings.EMBEDDING_DIMENSIONS})"
+
+def embedding_column_type(storage: Optional[str] = None, dimensions: Optional[int] = None):
+    """SQLAlchemy type of the embedding column."""
+    dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+    return HALFVEC(dimensions) if _storage(storage) == "halfvec" else Vector(dimensions)
+
+def is_quantized(quantization: Optional[str] = None) -> bool:
+    """True if the index holds an approximation of the column, so results need a rerank."""
+    return _quantization(quantization) != "none"
+
+def candidate_count(limit: int) -> int:
+    """Rows fetched from a quantized index for ``limit`` results."""
+    return limit * max(1, settings.EMBEDDING_RERANK_FACTOR)
+
+def index_expression(column: str = "embedding", quantization: Optional[str] = None) -> str:
+    """The expression the similarity index is built over; searches must order by the same one."""
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    quantization = _quantization(quantization)
+    if quantization == "halfvec":
+        return f"({column}::halfvec({dimensions}))"
+    if quantization == "binary":
+        return f"(binary_quantize({column})::bit({dimensions}))"
+    return column
+
+def index_operator_class(metric: str = "cosine", quantization: Optional[str] = None) -> str:
+    """Operator class of the similarity index, e.g. ``halfvec_cosine_ops``."""
+    quantization = _quantization(quantization)
+    if quantization == "binary":
+        # Hamming distance between sign bits stands in for every metric
+        return "bit_hamming_ops"
+    if quantization == "halfvec":
+        return f"halfvec_{METRICS[metric][1]}"
+    return f"{_storage()}_{METRICS[metric][1]}"
+
+def index_distance_sql(column: str, query: str, metric: str = "cosine", quantization: Optional[str] = None) -> str:
+    """
+    SQL distance between ``column`` and the query parameter ``query`` that the
+    similarity index can serve, for ORDER BY ... LIMIT.
+    """
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    quantization = _quantization(quantization)
+    expression = index_expression(column, quantization)
+    if quantization == "binary":
+        return f"{expression} <~> binary_quantize({query}::{embedding_sql_type()})::bit({dimensions})"
+    if quantization == "halfvec":
+        return f"{expression} {METRICS[metric][0]} {query}::halfvec({dimensions})"
+    return f"{column} {METRICS[metric][0]} {query}::{embedding_sql_type()}"
+
+def exact_distance_sql(column: str, query: str, metric: str = "cosine") -> str:
+    """SQL distance between the stored ``column`` and the query parameter ``query``."""
+    return f"{column} {METRICS[metric][0]} {query}::{embedding_sql_type()}"
+
+def index_distance(column, embedding, quantization: Optional[str] = None):
+    """SQLAlchemy cosine distance between ``column`` and ``embedding`` that the similarity index can serve."""
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    quantization = _quantization(quantization)
+    query = cast(embedding, embedding_column_type())
+    if quantization == "binary":
+        return cast(func.binary_quantize(column), BIT(dimensions)).op("<~>")(
+            cast(func.binary_quantize(query), BIT(dimensions))
+        )
+    if quantization == "halfvec":
+        return cast(column, HALFVEC(dimensions)).cosine_distance(cast(embedding, HALFVEC(dimensions)))
+    return column.cosine_distance(query)
+
+def stored_embedding_type(run: RunSQL, table: str, column: str = "embedding") -> Optional[str]:
+    """SQL type the embedding column has in the database, e.g. ``vector(1536)``."""
+    rows = run(f"""
+        SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = to_regclass('{table}') AND attname = '{column}' AND NOT attisdropped
+    """)
+    return rows[0][0] if rows else None
+
+def similarity_indexes(run: RunSQL, table: str) -> List[str]:
+    """
+    HNSW and IVFFlat indexes on ``table`` and its partitions, leaving out
+    the per-partition copies of an index built on the partitioned table.
+    """
+    rows = run(f"""
+        SELECT c.oid::regclass::text
+        FROM pg_partition_tree(to_regclass('{table}')) AS t
+        JOIN pg_index AS i ON i.indrelid = t.relid
+        JOIN pg_class AS c ON c.oid = i.indexrelid
+        JOIN pg_am AS am ON am.oid = c.relam
+        WHERE am.amname IN ('hnsw', 'ivfflat') AND NOT c.relispartition
+    """)
+    return [index for (index,) in rows]
+
+def convert_embedding_column(
+    run: RunSQL,
+    table: str,
+    column: str = "embedding",
+    delete_mismatched: bool = False
+) -> bool:
+    """
+    Change the embedding column to embedding_sql_type() if it differs.
+
+    Embeddings of another dimensionality cannot be converted and have to be
+    generated again: they are set to NULL, or their rows deleted with
+    ``delete_mismatched``. Similarity indexes on the table are dropped, since
+    their operator class may not fit the new type; db.vector_index builds
+    them again. Returns True if the column was changed.
+    """
+    current = stored_embedding_type(run, table, column)
+    target = embedding_sql_type()
+    if current is None or current == target:
+        return False
+
+    for index in similarity_indexes(run, table):
+        run(f"DROP INDEX IF EXISTS {index}")
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    mismatched = f"{column} IS NOT NULL AND vector_dims({column}) <> {dimensions}"
+    if delete_mismatched:
+        run(f"DELETE FROM {table} WHERE {mismatched}")
+    else:
+        run(f"UPDATE {table} SET {column} = NULL WHERE {mismatched}")
+    run(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {target} USING {column}::{target}")
+    logger.info(f"Changed {table}.{column} from {current} to {target}")
+    return True
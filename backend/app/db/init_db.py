@@ -2,26 +2,97 @@
 """
 Database initialization and connection management.
 """
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+import time
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from ..core.config import settings
-from ..models.journal import Base, JournalEntry
-from sqlalchemy.schema import MetaData
+from .embeddings import embedding_sql_type, stored_embedding_type
+from .partitions import connection_runner, forget_partitions
 
-# Create synchronous engine
-engine = create_engine(settings.DATABASE_URL, echo=True)
+def database_url(driver: str) -> str:
+    """DATABASE_URL with its driver replaced, e.g. postgresql+asyncpg -> postgresql+psycopg2."""
+    url = make_url(settings.DATABASE_URL)
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+# Synchronous engine for schema setup and maintenance scripts
+engine = create_engine(database_url("psycopg2"), echo=settings.DB_ECHO, pool_pre_ping=True)
 
 # Create synchronous session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers and the ingest pipeline, so database
+# I/O does not block the event loop
+async_engine = create_async_engine(
+    database_url("asyncpg"),
+    echo=settings.DB_ECHO,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True
+)
+
+# Objects stay usable after commit; sessions are short-lived and never shared between tasks
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Alembic scripts live in backend/migrations; alembic.ini at the repo root points there too
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+def _alembic_config() -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+def schema_revisions() -> Tuple[Optional[str], Optional[str]]:
+    """(revision the database is at, newest migration revision)."""
+    head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+    with engine.connect() as conn:
+        current = MigrationContext.configure(conn).get_current_revision()
+    return current, head
+
+def check_embedding_storage():
+    """Warn if the embedding column does not match the EMBEDDING_* settings."""
+    with engine.connect() as conn:
+        stored = stored_embedding_type(connection_runner(conn), "journal_entries")
+    if stored and stored != embedding_sql_type():
+        print(
+            f"Warning: journal_entries.embedding is {stored} but settings call for "
+            f"{embedding_sql_type()}; run scripts/convert_embeddings.py"
+        )
+
 def init_db():
-    """Initialize database with required tables."""
-    # First create pgvector extension
+    """
+    Bring the schema up to date without touching existing data.
+
+    Reads the revision recorded in alembic_version and compares it with the
+    newest migration; when they match no DDL is issued at all. Otherwise the
+    pending migrations run in one transaction, under an advisory lock so that
+    several workers starting together migrate only once.
+    """
+    start = time.perf_counter()
+    current, head = schema_revisions()
+    if current == head:
+        check_embedding_storage()
+        print(f"Database schema is current ({head}), checked in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return False
+
+    config = _alembic_config()
     with engine.begin() as conn:
-        conn.execute(text('CREATE EXTENSION IF NOT EXISTS vector'))
-    
-    # Then create tables
-    Base.metadata.create_all(bind=engine)
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('journal_analyzer_migrations'))"))
+        config.attributes["connection"] = conn
+        # Upgrading starts from the revision read under the lock, so a worker
+        # that waited for another one's migration has nothing left to do
+        command.upgrade(config, "head")
+    print(f"Migrated database schema {current or 'empty'} -> {head} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return True
 
 def check_table_structure():
     """Check the actual structure of the journal_entries table"""
@@ -57,7 +128,7 @@ def check_table_structure():
         return False
 
 def reset_database():
-    """Drop all tables and recreate them"""
+    """Drop all tables and data and recreate the schema. Never run on startup."""
     try:
         print("\n=== Starting Database Reset ===")
         
@@ -80,8 +151,9 @@ def reset_database():
             # Commit these changes
             conn.commit()
             
-            # Create all tables from models
-            Base.metadata.create_all(bind=engine)
+            # Create all tables by running every migration
+            init_db()
+            forget_partitions()
             print("✓ Created all tables")
             
             # Verify table structure
@@ -116,6 +188,15 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_engines():
+    """Close pooled connections on shutdown."""
+    await async_engine.dispose()
+    engine.dispose()
+
 def verify_database():
     """Verify database connection and tables."""
     try:
@@ -0,0 +1,132 @@
+"""
+Helpers for tables partitioned by year.
+
+Tables are declared ``PARTITION BY RANGE (year)`` with one partition per year,
+created on demand before rows for that year are written. Queries that filter
+on ``year`` let the planner prune every other year's partition and indexes.
+
+The synchronous helpers take a ``run(sql) -> rows`` callable so they work with
+both a SQLAlchemy connection and a psycopg2 cursor.
+"""
+from typing import Any, Callable, Hashable, Iterable, List, Sequence, Set, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+logger = logging.getLogger(__name__)
+
+RunSQL = Callable[[str], List[Any]]
+
+# Suffix of a pre-partitioning table while its rows are copied over
+UNPARTITIONED_SUFFIX = "_unpartitioned"
+
+# (database key, partition) pairs known to exist, so DDL is issued once per process
+_known_partitions: Set[Tuple[Hashable, str]] = set()
+
+def connection_runner(conn) -> RunSQL:
+    """Adapt a SQLAlchemy connection to the run(sql) -> rows callable."""
+    def run(sql):
+        result = conn.execute(text(sql))
+        return result.fetchall() if result.returns_rows else []
+    return run
+
+def partition_name(table: str, year: int) -> str:
+    return f"{table}_y{year}"
+
+def create_partition_sql(table: str, year: int) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, year)} "
+        f"PARTITION OF {table} FOR VALUES FROM ({year}) TO ({year + 1})"
+    )
+
+def forget_partitions() -> None:
+    """Drop the cache of known partitions, e.g. after the schema was reset."""
+    _known_partitions.clear()
+
+def _missing(database: Hashable, tables: Sequence[str], years: Iterable[int]) -> List[Tuple[str, int]]:
+    return [
+        (table, year)
+        for year in sorted(set(years))
+        for table in tables
+        if (database, partition_name(table, year)) not in _known_partitions
+    ]
+
+def _lock_sql(table: str, year: int) -> str:
+    """
+    Transaction-level advisory lock serializing creation of one partition, so
+    concurrent jobs do not race on CREATE TABLE IF NOT EXISTS.
+    """
+    return f"SELECT pg_advisory_xact_lock(hashtext('{partition_name(table, year)}'))"
+
+def ensure_year_partitions_sync(run: RunSQL, database: Hashable, tables: Sequence[str], years: Iterable[int]) -> None:
+    """Create any missing yearly partitions of ``tables``. The caller commits."""
+    missing = _missing(database, tables, years)
+    for table, year in missing:
+        run(_lock_sql(table, year))
+        run(create_partition_sql(table, year))
+        _known_partitions.add((database, partition_name(table, year)))
+    if missing:
+        logger.info(f"Ensured partitions: {', '.join(partition_name(table, year) for table, year in missing)}")
+
+async def ensure_year_partitions(db: AsyncSession, tables: Sequence[str], years: Iterable[int]) -> None:
+    """
+    Create any missing yearly partitions of ``tables`` and commit, so the
+    partitions exist before rows are written to them.
+    """
+    database = db.get_bind().url.render_as_string(hide_password=True)
+    missing = _missing(database, tables, years)
+    if not missing:
+        return
+    for table, year in missing:
+        await db.execute(text(_lock_sql(table, year)))
+        await db.execute(text(create_partition_sql(table, year)))
+    await db.commit()
+    for table, year in missing:
+        _known_partitions.add((database, partition_name(table, year)))
+    logger.info(f"Ensured partitions: {', '.join(partition_name(table, year) for table, year in missing)}")
+
+def is_unpartitioned(run: RunSQL, table: str) -> bool:
+    """True if ``table`` exists as a plain (not partitioned) table."""
+    rows = run(f"SELECT relkind FROM pg_class WHERE oid = to_regclass('{table}')")
+    return bool(rows) and rows[0][0] == "r"
+
+def detach_unpartitioned(run: RunSQL, table: str) -> str:
+    """
+    Rename a plain table, its indexes and its serial sequences out of the way
+    so the partitioned table can be created under the original names.
+    Returns the new name of the old table.
+    """
+    legacy = table + UNPARTITIONED_SUFFIX
+    for (index,) in run(f"SELECT indexname FROM pg_indexes WHERE tablename = '{table}'"):
+        run(f"ALTER INDEX {index} RENAME TO {index}{UNPARTITIONED_SUFFIX}")
+    for (sequence,) in run(f"""
+        SELECT pg_get_serial_sequence('{table}', attname)
+        FROM pg_attribute
+        WHERE attrelid = '{table}'::regclass AND attnum > 0 AND NOT attisdropped
+          AND pg_get_serial_sequence('{table}', attname) IS NOT NULL
+    """):
+        run(f"ALTER SEQUENCE {sequence} RENAME TO {sequence.split('.')[-1]}{UNPARTITIONED_SUFFIX}")
+    run(f"ALTER TABLE {table} RENAME TO {legacy}")
+    return legacy
+
+def copy_into_partitions(run: RunSQL, database: Hashable, source: str, target: str, columns: Sequence[str]) -> int:
+    """
+    Copy every row of ``source`` into the partitioned ``target``, creating the
+    partitions needed and moving the id sequence past the copied ids.
+    Returns the number of rows copied.
+    """
+    years = [year for (year,) in run(f"SELECT DISTINCT year FROM {source}")]
+    ensure_year_partitions_sync(run, database, [target], years)
+    column_list = ", ".join(columns)
+    rows = run(f"""
+        WITH copied AS (
+            INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {source} RETURNING 1
+        )
+        SELECT count(*) FROM copied
+    """)
+    if "id" in columns:
+        run(f"""
+            SELECT setval(pg_get_serial_sequence('{target}', 'id'),
+                          COALESCE((SELECT max(id) FROM {target}), 0) + 1, false)
+        """)
+    return rows[0][0]
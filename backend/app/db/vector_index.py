@@ -0,0 +1,445 @@
+"""
+Self-tuning similarity indexes.
+
+Every partition of a vector table gets its own index, sized for the embeddings
+it holds. Partitions with fewer than VECTOR_INDEX_MIN_ROWS get none: an exact
+scan of a few thousand vectors is about as fast as an index and finds every
+neighbour. HNSW ``m`` and ``ef_construction`` grow with the partition; IVFFlat
+``lists`` follow pgvector's guidance of rows / 1000, sqrt(rows) past a million.
+
+After a build the index is calibrated: stored vectors are searched through
+the index and exactly, and the smallest ``hnsw.ef_search`` or
+``ivfflat.probes`` that reaches VECTOR_SEARCH_TARGET_RECALL is recorded in
+vector_index_state, with the row count, build time and index size. Searches
+SET LOCAL the recorded value (see search_settings).
+
+``VectorIndexManager.maintain`` only rebuilds an index when its partition has
+outgrown the parameters it was built with, the embedding settings changed, or
+an IVFFlat index can no longer reach the target recall; otherwise it at most
+calibrates again. Indexes are built with CREATE INDEX CONCURRENTLY, so the
+``run(sql) -> rows`` callable must not be inside a transaction.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+import json
+import math
+import time
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.config import settings
+from .embeddings import (
+    RunSQL,
+    candidate_count,
+    exact_distance_sql,
+    index_distance_sql,
+    index_expression,
+    index_operator_class,
+    is_quantized,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEX_METHODS = ("hnsw", "ivfflat")
+
+# Query-time parameter of each index method
+SEARCH_PARAMETERS = {"hnsw": "hnsw.ef_search", "ivfflat": "ivfflat.probes"}
+
+# HNSW (m, ef_construction) for partitions of fewer than the given rows
+HNSW_TIERS = ((100_000, 16, 64), (1_000_000, 24, 128), (math.inf, 32, 200))
+
+# ef_search values tried during calibration, from pgvector's default of 40
+# up to the largest it allows; stored vectors are easier queries than real
+# ones, so calibration only ever raises the default
+HNSW_EF_SEARCH_STEPS = (40, 64, 100, 160, 250, 400, 640, 1000)
+
+# Stored vectors used as calibration queries, and neighbours compared per query
+CALIBRATION_QUERIES = 50
+CALIBRATION_K = 10
+
+# An index is calibrated again once its partition grew or shrank by this factor
+RECALIBRATE_GROWTH = 1.25
+
+# Seconds recorded search settings are cached before being read again
+SEARCH_SETTINGS_TTL = 300
+
+STATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS vector_index_state (
+        index_name TEXT PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        partition_name TEXT NOT NULL,
+        method TEXT NOT NULL,
+        params JSONB NOT NULL,
+        rows_at_build BIGINT NOT NULL,
+        build_seconds DOUBLE PRECISION NOT NULL,
+        index_bytes BIGINT NOT NULL,
+        built_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+        search_value INTEGER,
+        recall DOUBLE PRECISION,
+        rows_at_calibration BIGINT,
+        calibrated_at TIMESTAMP WITH TIME ZONE
+    )
+"""
+
+# (database key, table) -> (loaded at, [(partition, method, search value)])
+_search_settings: Dict[Tuple[Hashable, str], Tuple[float, List[Tuple[str, str, int]]]] = {}
+
+@dataclass
+class IndexPlan:
+    """Index method and build parameters chosen for a partition."""
+    method: str
+    params: Dict[str, int]
+
+    def with_clause(self) -> str:
+        return ", ".join(f"{name} = {value}" for name, value in self.params.items())
+
+def _method(method: Optional[str] = None) -> str:
+    method = method or settings.VECTOR_INDEX_METHOD
+    if method not in INDEX_METHODS:
+        raise ValueError(f"Unknown vector index method {method!r}, expected one of {INDEX_METHODS}")
+    return method
+
+def plan_index(rows: int, method: Optional[str] = None) -> Optional[IndexPlan]:
+    """The index a partition of ``rows`` embeddings should have, or None to search it exactly."""
+    method = _method(method)
+    if rows < settings.VECTOR_INDEX_MIN_ROWS:
+        return None
+    if method == "ivfflat":
+        lists = rows // 1000 if rows <= 1_000_000 else int(math.sqrt(rows))
+        return IndexPlan("ivfflat", {"lists": max(lists, 1)})
+    for below, m, ef_construction in HNSW_TIERS:
+        if rows < below:
+            return IndexPlan("hnsw", {"m": m, "ef_construction": ef_construction})
+
+def search_values(plan: IndexPlan, fetched: int) -> List[int]:
+    """
+    Candidate values of the plan's search parameter, cheapest first.
+    ``ef_search`` below the rows fetched would cut results short.
+    """
+    if plan.method == "ivfflat":
+        lists = plan.params["lists"]
+        probes = [2 ** i for i in range(int(math.log2(lists)) + 1)]
+        return probes if probes[-1] == lists else probes + [lists]
+    first = max(min(fetched, HNSW_EF_SEARCH_STEPS[-1]), HNSW_EF_SEARCH_STEPS[0])
+    return [first] + [value for value in HNSW_EF_SEARCH_STEPS if value > first]
+
+def index_name(partition: str, column: str = "embedding") -> str:
+    return f"{partition}_{column}_ann_idx"
+
+def leaf_partitions(run: RunSQL, table: str) -> List[str]:
+    """Partitions of ``table`` that hold rows; a plain table is its own only partition."""
+    rows = run(f"""
+        SELECT relid::regclass::text FROM pg_partition_tree(to_regclass('{table}'))
+        WHERE isleaf ORDER BY relid::regclass::text
+    """)
+    if not rows:
+        rows = run(f"SELECT oid::regclass::text FROM pg_class WHERE oid = to_regclass('{table}') AND relkind = 'r'")
+    return [partition for (partition,) in rows]
+
+def ensure_state_table(run: RunSQL) -> None:
+    run(STATE_TABLE_SQL)
+
+def forget_search_settings() -> None:
+    """Drop cached search settings, e.g. after indexes were rebuilt."""
+    _search_settings.clear()
+
+def _recall(exact: Sequence[Any], approximate: Sequence[Any]) -> float:
+    return len(set(exact) & set(approximate)) / len(exact) if exact else 1.0
+
+class VectorIndexManager:
+    """
+    Builds, rebuilds and calibrates the similarity indexes of one table.
+    ``legacy_indexes`` are indexes built on the whole table before indexes
+    were managed per partition; they are dropped once maintain has run.
+    """
+    def __init__(
+        self,
+        run: RunSQL,
+        table: str,
+        column: str = "embedding",
+        key: str = "id",
+        legacy_indexes: Sequence[str] = ()
+    ):
+        self.run = run
+        self.table = table
+        self.column = column
+        self.key = key
+        self.legacy_indexes = legacy_indexes
+
+    def maintain(self, recalibrate: bool = True) -> List[Dict[str, Any]]:
+        """
+        Bring every partition's index in line with the partition's size and
+        the embedding settings. New indexes are always calibrated; kept ones
+        only with ``recalibrate``, once their partition's size has changed
+        enough. Returns one report per partition, with the action taken:
+        "exact", "kept", "calibrated", "built", "rebuilt" or "dropped".
+        """
+        ensure_state_table(self.run)
+        states = self._states()
+        partitions = leaf_partitions(self.run, self.table)
+        reports = [
+            self._maintain_partition(partition, states.get(index_name(partition, self.column)), recalibrate)
+            for partition in partitions
+        ]
+        # Partitions dropped since their index was recorded
+        names = [index_name(partition, self.column) for partition in partitions]
+        self.run(f"""
+            DELETE FROM vector_index_state
+            WHERE table_name = '{self.table}' AND index_name <> ALL(ARRAY[{", ".join(f"'{n}'" for n in names)}]::text[])
+        """)
+        for index in self.legacy_indexes:
+            self.run(f"DROP INDEX IF EXISTS {index}")
+        forget_search_settings()
+        return reports
+
+    def _states(self) -> Dict[str, Dict[str, Any]]:
+        rows = self.run(f"""
+            SELECT index_name, method, params, rows_at_build, search_value, rows_at_calibration
+            FROM vector_index_state WHERE table_name = '{self.table}'
+        """)
+        return {
+            name: {
+                "method": method,
+                "params": params if isinstance(params, dict) else json.loads(params),
+                "rows_at_build": rows_at_build,
+                "search_value": search_value,
+                "rows_at_calibration": rows_at_calibration,
+            }
+            for name, method, params, rows_at_build, search_value, rows_at_calibration in rows
+        }
+
+    def _definition(self, name: str) -> Optional[str]:
+        rows = self.run(f"SELECT pg_get_indexdef(to_regclass('{name}'))")
+        return rows[0][0] if rows else None
+
+    def _maintain_partition(self, partition: str, state: Optional[Dict[str, Any]], recalibrate: bool) -> Dict[str, Any]:
+        name = index_name(partition, self.column)
+        rows = self.run(f"SELECT count({self.column}) FROM {partition}")[0][0]
+        plan = plan_index(rows)
+        definition = self._definition(name)
+        report = {"partition": partition, "rows": rows, "action": "exact"}
+
+        if plan is None:
+            if definition is not None:
+                self.run(f"DROP INDEX CONCURRENTLY {name}")
+                self.run(f"DELETE FROM vector_index_state WHERE index_name = '{name}'")
+                report["action"] = "dropped"
+            return report
+
+        report.update(method=plan.method, params=plan.params)
+        reason = self._rebuild_reason(plan, rows, state, definition)
+        if reason:
+            self._build(partition, plan, rows, replace=definition is not None)
+            report.update(action="rebuilt" if definition is not None else "built", reason=reason)
+        elif not recalibrate or not self._needs_calibration(rows, state):
+            # The index keeps the parameters it was built with
+            report.update(action="kept", params=state["params"], search_value=state["search_value"])
+            return report
+        else:
+            report.update(action="calibrated", params=state["params"])
+
+        value, recall = self._calibrate(partition, plan, rows)
+        if recall < settings.VECTOR_SEARCH_TARGET_RECALL and plan.method == "ivfflat" and not reason:
+            # Lists trained on earlier data no longer split the partition evenly
+            self._build(partition, plan, rows, replace=True)
+            value, recall = self._calibrate(partition, plan, rows)
+            report.update(action="rebuilt", reason="recall", params=plan.params)
+        if recall < settings.VECTOR_SEARCH_TARGET_RECALL:
+            logger.warning(
+                f"{name} reaches recall {recall:.3f} at most, below the target "
+                f"{settings.VECTOR_SEARCH_TARGET_RECALL}"
+            )
+        report.update(search_value=value, recall=recall)
+        return report
+
+    def _rebuild_reason(
+        self,
+        plan: IndexPlan,
+        rows: int,
+        state: Optional[Dict[str, Any]],
+        definition: Optional[str]
+    ) -> Optional[str]:
+        """Why the partition's index has to be built (again), or None if it fits."""
+        if definition is None:
+            return "missing"
+        if state is None:
+            return "untracked"
+        quantization = settings.EMBEDDING_INDEX_QUANTIZATION
+        if (
+            f"USING {plan.method} " not in definition
+            or index_operator_class() not in definition
+            or ("binary_quantize" in definition) != (quantization == "binary")
+            or ("::halfvec(" in definition) != (quantization == "halfvec")
+        ):
+            return "settings"
+        if plan.method != state["method"]:
+            return "method"
+        if plan.method == "hnsw":
+            # The graph grows with the partition; only a new size tier calls for a rebuild
+            return "outgrown" if plan.params != state["params"] else None
+        growth = rows / max(state["rows_at_build"], 1)
+        if growth >= settings.VECTOR_INDEX_REBUILD_GROWTH or growth <= 1 / settings.VECTOR_INDEX_REBUILD_GROWTH:
+            return "drift"
+        return None
+
+    @staticmethod
+    def _needs_calibration(rows: int, state: Dict[str, Any]) -> bool:
+        calibrated = state["rows_at_calibration"]
+        if state["search_value"] is None or not calibrated:
+            return True
+        growth = rows / calibrated
+        return growth >= RECALIBRATE_GROWTH or growth <= 1 / RECALIBRATE_GROWTH
+
+    def _build(self, partition: str, plan: IndexPlan, rows: int, replace: bool) -> None:
+        """
+        Build the partition's index concurrently, so writes carry on meanwhile.
+        An index being replaced keeps serving searches until the new one is ready.
+        """
+        name = index_name(partition, self.column)
+        building = f"{name}_new" if replace else name
+        # Left invalid by an interrupted concurrent build
+        self.run(f"DROP INDEX CONCURRENTLY IF EXISTS {building}")
+        # An HNSW build slows down many times over once its graph outgrows this
+        self.run(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_BUILD_MEMORY}'")
+        start = time.perf_counter()
+        try:
+            self.run(f"""
+                CREATE INDEX CONCURRENTLY {building} ON {partition}
+                USING {plan.method} ({index_expression(self.column)} {index_operator_class()})
+                WITH ({plan.with_clause()})
+            """)
+        finally:
+            self.run("RESET maintenance_work_mem")
+        seconds = time.perf_counter() - start
+        if replace:
+            self.run(f"DROP INDEX CONCURRENTLY {name}")
+            self.run(f"ALTER INDEX {building} RENAME TO {name}")
+        size = self.run(f"SELECT pg_relation_size('{name}')")[0][0]
+        self.run(f"""
+            INSERT INTO vector_index_state
+                (index_name, table_name, partition_name, method, params, rows_at_build, build_seconds, index_bytes)
+            VALUES ('{name}', '{self.table}', '{partition}', '{plan.method}', '{json.dumps(plan.params)}',
+                    {rows}, {seconds}, {size})
+            ON CONFLICT (index_name) DO UPDATE
+            SET method = EXCLUDED.method, params = EXCLUDED.params, rows_at_build = EXCLUDED.rows_at_build,
+                build_seconds = EXCLUDED.build_seconds, index_bytes = EXCLUDED.index_bytes, built_at = now(),
+                search_value = NULL, recall = NULL, rows_at_calibration = NULL, calibrated_at = NULL
+        """)
+        logger.info(
+            f"Built {name} ({plan.method}, {plan.with_clause()}) over {rows} rows "
+            f"in {seconds:.1f} s, {size / 2**20:.1f} MB"
+        )
+
+    def _calibrate(self, partition: str, plan: IndexPlan, rows: int) -> Tuple[int, float]:
+        """
+        Find the smallest search parameter value whose recall@k against exact
+        search reaches the target, searching for a sample of stored vectors.
+        Each sample's own row is left out of both result lists, so a search
+        only counts if it finds the vector's neighbours rather than itself.
+        Returns the value and the recall measured with it.
+        """
+        samples = self.run(f"""
+            SELECT {self.key}, {self.column}::text FROM {partition}
+            WHERE {self.column} IS NOT NULL ORDER BY random() LIMIT {CALIBRATION_QUERIES}
+        """)
+        k = CALIBRATION_K
+        fetched = (candidate_count(k) if is_quantized() else k) + 1
+
+        def neighbours(key, rows):
+            return [row[0] for row in rows if row[0] != key][:k]
+
+        def exact(query):
+            return self.run(f"""
+                SELECT {self.key} FROM {partition}
+                ORDER BY {exact_distance_sql(self.column, f"'{query}'")} LIMIT {k + 1}
+            """)
+
+        def approximate(query):
+            return self.run(f"""
+                SELECT {self.key} FROM (
+                    SELECT {self.key}, {exact_distance_sql(self.column, f"'{query}'")} AS distance
+                    FROM {partition}
+                    ORDER BY {index_distance_sql(self.column, f"'{query}'")}
+                    LIMIT {fetched}
+                ) AS candidates
+                ORDER BY distance LIMIT {k + 1}
+            """)
+
+        self.run("SET enable_indexscan = off")
+        try:
+            truth = [neighbours(key, exact(query)) for key, query in samples]
+        finally:
+            self.run("RESET enable_indexscan")
+
+        parameter = SEARCH_PARAMETERS[plan.method]
+        try:
+            for value in search_values(plan, fetched):
+                self.run(f"SET {parameter} = {value}")
+                recall = sum(
+                    _recall(expected, neighbours(key, approximate(query)))
+                    for (key, query), expected in zip(samples, truth)
+                ) / max(len(samples), 1)
+                if recall >= settings.VECTOR_SEARCH_TARGET_RECALL:
+                    break
+        finally:
+            self.run(f"RESET {parameter}")
+
+        self.run(f"""
+            UPDATE vector_index_state
+            SET search_value = {value}, recall = {recall}, rows_at_calibration = {rows}, calibrated_at = now()
+            WHERE index_name = '{index_name(partition, self.column)}'
+        """)
+        logger.info(f"Calibrated {index_name(partition, self.column)}: {parameter} = {value}, recall {recall:.3f}")
+        return value, recall
+
+def _search_settings_sql(table: str) -> str:
+    return f"""
+        SELECT partition_name, method, search_value FROM vector_index_state
+        WHERE table_name = '{table}' AND search_value IS NOT NULL
+    """
+
+def _statements(recorded: List[Tuple[str, str, int]], partition: Optional[str], fetched: int) -> List[str]:
+    values: Dict[str, int] = {}
+    for name, method, value in recorded:
+        if partition is None or name == partition:
+            parameter = SEARCH_PARAMETERS[method]
+            values[parameter] = max(values.get(parameter, 0), value)
+    if "hnsw.ef_search" in values:
+        values["hnsw.ef_search"] = min(max(values["hnsw.ef_search"], fetched), HNSW_EF_SEARCH_STEPS[-1])
+    return [f"SET LOCAL {parameter} = {value}" for parameter, value in values.items()]
+
+def _cached(database: Hashable, table: str) -> Optional[List[Tuple[str, str, int]]]:
+    cached = _search_settings.get((database, table))
+    if cached and time.monotonic() - cached[0] < SEARCH_SETTINGS_TTL:
+        return cached[1]
+    return None
+
+def search_settings_sync(
+    run: RunSQL,
+    database: Hashable,
+    table: str,
+    fetched: int,
+    partition: Optional[str] = None
+) -> List[str]:
+    """
+    SET LOCAL statements giving a search of ``table`` (or one ``partition``)
+    that fetches ``fetched`` rows from the index its calibrated recall. Run
+    them in the search's transaction. The largest value recorded for the
+    searched partitions is used, as one setting applies to all of them.
+    """
+    recorded = _cached(database, table)
+    if recorded is None:
+        rows = run(f"SELECT to_regclass('vector_index_state') IS NOT NULL")
+        recorded = [tuple(row) for row in run(_search_settings_sql(table))] if rows[0][0] else []
+        _search_settings[(database, table)] = (time.monotonic(), recorded)
+    return _statements(recorded, partition, fetched)
+
+async def search_settings(db: AsyncSession, table: str, fetched: int, partition: Optional[str] = None) -> List[str]:
+    """search_settings_sync for an async session."""
+    database = db.get_bind().url.render_as_string(hide_password=True)
+    recorded = _cached(database, table)
+    if recorded is None:
+        exists = (await db.execute(text("SELECT to_regclass('vector_index_state') IS NOT NULL"))).scalar()
+        recorded = [tuple(row) for row in (await db.execute(text(_search_settings_sql(table)))).fetchall()] if exists else []
+        _search_settings[(database, table)] = (time.monotonic(), recorded)
+    return _statements(recorded, partition, fetched)
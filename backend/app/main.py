@@ -1,6 +1,9 @@
 from fastapi import FastAPI
-from .db.init_db import init_db
-from .api.endpoints import upload
+from .db.init_db import init_db, dispose_engines
+from .api.endpoints import entries, upload
+from .services.pdf_processor import shutdown_extraction_pool
+from .services.batch_stage import shutdown_batch_stage_pool
+from .services.storage_service import close_storage_pools
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI()
@@ -16,10 +19,24 @@ app.add_middleware(
 
 @app.on_event("startup")
 def startup_event():
+    # Applies pending migrations only; existing data is never dropped
     init_db()
 
+@app.on_event("startup")
+async def resume_ingests():
+    # Pick up jobs a previous worker was running when it died
+    await upload.resume_interrupted_jobs()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_extraction_pool()
+    shutdown_batch_stage_pool()
+    close_storage_pools()
+    await dispose_engines()
+
 # Include your routers here
-app.include_router(upload.router) 
+app.include_router(upload.router)
+app.include_router(entries.router)
 
 @app.get("/")
 async def root():
@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from .journal import JournalEntry
 
 class VectorEntry(BaseModel):
@@ -16,5 +16,7 @@ class StorageMetrics(BaseModel):
     total_entries: int
     total_vectors: int
     avg_vector_size: float
-    storage_size: str
-    index_size: str 
\ No newline at end of file
+    storage_size: str  # tables, without indexes
+    index_size: str  # all indexes
+    index_sizes: Dict[str, str] = {}
+    exact: bool = False  # counts and dimensions measured rather than estimated 
\ No newline at end of file
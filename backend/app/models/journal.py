@@ -3,10 +3,10 @@
 SQLAlchemy models for journal entries and analysis results.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Date, Float, JSON, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Date, Float, JSON, Text, ForeignKey, ForeignKeyConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from pgvector.sqlalchemy import Vector
+from ..db.embeddings import embedding_column_type
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from sqlalchemy.sql import func
@@ -14,15 +14,16 @@ from sqlalchemy.sql import func
 Base = declarative_base()
 
 class JournalEntry(Base):
-    """SQLAlchemy model for journal entries"""
+    """SQLAlchemy model for journal entries, partitioned by year"""
     __tablename__ = "journal_entries"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # The primary key includes the partition key, as PostgreSQL requires
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     entry_date = Column(Date, nullable=False)
     day_of_week = Column(Integer, nullable=False)  # 1=Sunday through 7=Saturday
     content = Column(Text, nullable=False)
     word_count = Column(Integer, nullable=False, default=0)
-    year = Column(Integer, nullable=False, index=True)
+    year = Column(Integer, primary_key=True, index=True)
     month = Column(Integer, nullable=False, index=True)
     day = Column(Integer, nullable=False)
     
@@ -33,16 +34,29 @@ class JournalEntry(Base):
     mentioned_people = Column(JSON, nullable=True)
     mentioned_locations = Column(JSON, nullable=True)
     
-    # Vector Embedding (1536 dimensions for OpenAI embeddings)
-    embedding = Column(Vector(1536))
+    # Vector Embedding: EMBEDDING_DIMENSIONS wide, stored as EMBEDDING_STORAGE
+    embedding = Column(embedding_column_type())
     
     # Metadata
     source_file = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=False, index=True)  # SHA-256 of content
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # One row per entry: uploading the same file again skips what is already stored
+        Index("uq_journal_entries_entry_key", "source_file", "entry_date", "content_hash", "year", unique=True),
+        # Keyset pagination by (entry_date, id); covers summary rows (db.crud.SUMMARY_COLUMNS)
+        Index(
+            "ix_journal_entries_entry_date_id", "entry_date", "id",
+            postgresql_include=["year", "month", "day", "day_of_week", "word_count", "source_file"]
+        ),
+        # One partition per year (journal_entries_y2021, ...), created on demand by db.partitions
+        {"postgresql_partition_by": "RANGE (year)"},
+    )
+
 class JournalEntrySchema(BaseModel):
     """Pydantic model for API interactions"""
     date: datetime
@@ -60,8 +74,13 @@ class AnalysisResult(Base):
     __tablename__ = "analysis_results"
 
     id = Column(Integer, primary_key=True, index=True)
-    entry_id = Column(Integer, ForeignKey("journal_entries.id"))
+    entry_id = Column(Integer)
+    entry_year = Column(Integer)
     analysis_type = Column(String)  # e.g., "emotional", "topic", "style"
     results = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
-    # TODO: Add additional fields
\ No newline at end of file
+    # TODO: Add additional fields
+
+    __table_args__ = (
+        ForeignKeyConstraint(["entry_id", "entry_year"], ["journal_entries.id", "journal_entries.year"]),
+    )
\ No newline at end of file
@@ -3,12 +3,27 @@ from datetime import datetime
 from typing import Optional, List
 import re
 
+# Rule parameters, shared with the column-wise BatchValidator
+MIN_CONTENT_LENGTH = 10
+MAX_CONTENT_LENGTH = 50000
+MIN_YEAR = 2019
+MAX_YEAR = 2024
+MIN_DATE = datetime(MIN_YEAR, 1, 1)
+MAX_DATE = datetime(MAX_YEAR, 12, 31)
+INVALID_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\xff]')
+# Minimum share of content that must remain after stripping surrounding whitespace
+MIN_STRIPPED_RATIO = 0.5
+# Allowed difference between the given and the actual word count
+WORD_COUNT_TOLERANCE = 5
+# Suspicious if the average word is longer than this
+MAX_AVG_WORD_LENGTH = 15
+
 class JournalEntryValidation(BaseModel):
     """Validation model for journal entries"""
     date: datetime
-    content: str = Field(..., min_length=10, max_length=50000)
+    content: str = Field(..., min_length=MIN_CONTENT_LENGTH, max_length=MAX_CONTENT_LENGTH)
     word_count: int = Field(..., gt=0)
-    year: int = Field(..., ge=2019, le=2024)
+    year: int = Field(..., ge=MIN_YEAR, le=MAX_YEAR)
     month: int = Field(..., ge=1, le=12)
     day: int = Field(..., ge=1, le=31)
     metadata: dict = Field(default_factory=dict)
@@ -16,7 +31,7 @@ class JournalEntryValidation(BaseModel):
     @validator('content')
     def validate_content(cls, v):
         # Check for common PDF artifacts
-        if re.search(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\xff]', v):
+        if INVALID_CHARS.search(v):
             raise ValueError("Content contains invalid characters")
         
         # Check for reasonable content structure
@@ -24,7 +39,7 @@ class JournalEntryValidation(BaseModel):
             raise ValueError("Content must contain at least one letter")
         
         # Check for excessive whitespace
-        if len(v.strip()) < len(v) * 0.5:
+        if len(v.strip()) < len(v) * MIN_STRIPPED_RATIO:
             raise ValueError("Content contains excessive whitespace")
         
         return v.strip()
@@ -32,11 +47,8 @@ class JournalEntryValidation(BaseModel):
     @validator('date')
     def validate_date(cls, v):
         # Ensure date is within valid range
-        min_date = datetime(2019, 1, 1)
-        max_date = datetime(2024, 12, 31)
-        
-        if v < min_date or v > max_date:
-            raise ValueError(f"Date must be between {min_date.date()} and {max_date.date()}")
+        if v < MIN_DATE or v > MAX_DATE:
+            raise ValueError(f"Date must be between {MIN_DATE.date()} and {MAX_DATE.date()}")
         
         return v
 
@@ -44,6 +56,6 @@ class JournalEntryValidation(BaseModel):
     def validate_word_count(cls, v, values):
         if 'content' in values:
             actual_count = len(values['content'].split())
-            if abs(v - actual_count) > 5:  # Allow small discrepancy
+            if abs(v - actual_count) > WORD_COUNT_TOLERANCE:  # Allow small discrepancy
                 raise ValueError(f"Word count mismatch: got {v}, expected ~{actual_count}")
         return v 
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Service for cleaning and validating batches of parsed entries in a process pool.
+"""
+import asyncio
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+import logging
+from ..core.config import settings
+from .data_cleaner import DataCleaner
+from .data_validator import DataValidator
+from .entry_parser import ParsedEntry
+from .validation_diagnostics import ValidationDiagnostics
+
+logger = logging.getLogger(__name__)
+
+# Shared across uploads so worker processes are only spawned once
+_executor: Optional[ProcessPoolExecutor] = None
+
+def _get_executor(max_workers: int) -> ProcessPoolExecutor:
+    """Return the shared clean/validate process pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max_workers)
+    return _executor
+
+def shutdown_batch_stage_pool() -> None:
+    """Shut down the shared clean/validate process pool."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def _clean_and_validate_shard(
+    entries: List[ParsedEntry],
+    max_samples: int
+) -> Tuple[List[ParsedEntry], ValidationDiagnostics]:
+    """
+    Clean and validate one shard of entries.
+    Runs inside a worker process and returns the valid entries in input order
+    along with the shard's validation diagnostics.
+    """
+    data_cleaner = DataCleaner()
+    for entry in entries:
+        entry.content = data_cleaner.clean_text(entry.content)
+    diagnostics = ValidationDiagnostics(max_samples)
+    return DataValidator().validate_entries(entries, diagnostics), diagnostics
+
+class BatchStageResult:
+    """
+    Valid entries of a batch in input order, one error per failed shard, and
+    the validation diagnostics of the shards that completed.
+    """
+    def __init__(self, valid_entries: List[ParsedEntry], errors: List[str], diagnostics: ValidationDiagnostics):
+        self.valid_entries = valid_entries
+        self.errors = errors
+        self.diagnostics = diagnostics
+
+def shard_size_for(count: int, max_workers: int, min_shard_size: int) -> int:
+    """Entries per shard: one shard per worker, but none smaller than ``min_shard_size``."""
+    return max(1, min_shard_size, math.ceil(count / max_workers))
+
+async def clean_and_validate(
+    entries: List[ParsedEntry],
+    max_workers: Optional[int] = None,
+    min_shard_size: Optional[int] = None
+) -> BatchStageResult:
+    """
+    Clean and validate a batch of entries off the event loop.
+
+    The batch is split into one shard per worker (see shard_size_for), and the
+    shards run concurrently in the shared process pool. A batch that makes a
+    single shard runs in a thread instead, as sending it to one worker process
+    only adds the cost of pickling. Results are reassembled in input order; a
+    shard that fails loses only its own entries and is reported in ``errors``.
+    """
+    max_workers = max_workers or settings.CLEAN_VALIDATE_WORKERS or os.cpu_count() or 1
+    min_shard_size = min_shard_size or settings.CLEAN_VALIDATE_MIN_SHARD_SIZE
+    shard_size = shard_size_for(len(entries), max_workers, min_shard_size)
+    shards = [entries[start:start + shard_size] for start in range(0, len(entries), shard_size)]
+
+    if len(shards) <= 1:
+        results = await asyncio.gather(
+            *(asyncio.to_thread(_clean_and_validate_shard, shard, settings.VALIDATION_SAMPLE_SIZE) for shard in shards),
+            return_exceptions=True
+        )
+    else:
+        loop = asyncio.get_running_loop()
+        executor = _get_executor(max_workers)
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, _clean_and_validate_shard, shard, settings.VALIDATION_SAMPLE_SIZE)
+                for shard in shards
+            ),
+            return_exceptions=True
+        )
+
+    valid_entries: List[ParsedEntry] = []
+    errors: List[str] = []
+    diagnostics = ValidationDiagnostics(settings.VALIDATION_SAMPLE_SIZE)
+    for index, (shard, result) in enumerate(zip(shards, results)):
+        if isinstance(result, BaseException):
+            first, last = index * shard_size, index * shard_size + len(shard) - 1
+            error_msg = f"Cleaning/validation failed for entries {first}-{last} ({shard[0].date} to {shard[-1].date}): {str(result)}"
+            logger.error(error_msg)
+            errors.append(error_msg)
+            if isinstance(result, BrokenProcessPool):
+                # A worker died; start a fresh pool for the next batch
+                shutdown_batch_stage_pool()
+            continue
+        shard_valid, shard_diagnostics = result
+        valid_entries.extend(shard_valid)
+        diagnostics.merge(shard_diagnostics)
+
+    return BatchStageResult(valid_entries, errors, diagnostics)
@@ -0,0 +1,290 @@
+"""
+Service for validating batches of journal entries column-wise.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from ..models.validation import (
+    INVALID_CHARS,
+    MAX_AVG_WORD_LENGTH,
+    MAX_CONTENT_LENGTH,
+    MAX_DATE,
+    MAX_YEAR,
+    MIN_CONTENT_LENGTH,
+    MIN_DATE,
+    MIN_STRIPPED_RATIO,
+    MIN_YEAR,
+    WORD_COUNT_TOLERANCE,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per code point flags for every BMP character, built on first use.
+# Code points above the BMP are rare and classified individually.
+SPACE, ALPHA, INVALID = 1, 2, 4
+_BMP_SIZE = 0x10000
+SCAN_BLOCK_CHARS = 1_000_000
+_flag_table: Optional[np.ndarray] = None
+
+def _get_flag_table() -> np.ndarray:
+    global _flag_table
+    if _flag_table is None:
+        table = np.zeros(_BMP_SIZE, dtype=np.uint8)
+        table[[code for code in range(_BMP_SIZE) if chr(code).isspace()]] |= SPACE
+        table[[code for code in range(_BMP_SIZE) if chr(code).isalpha()]] |= ALPHA
+        # The characters matched by models.validation.INVALID_CHARS
+        table[[code for code in range(0x100) if INVALID_CHARS.match(chr(code))]] |= INVALID
+        _flag_table = table
+    return _flag_table
+
+def _classify(text: str) -> np.ndarray:
+    """Return the SPACE/ALPHA/INVALID flags of every character of a string."""
+    table = _get_flag_table()
+    if text.isascii():
+        return table[np.frombuffer(text.encode("ascii"), dtype=np.uint8)]
+    codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    astral = codes >= _BMP_SIZE
+    if not astral.any():
+        return table[codes]
+    flags = table[np.where(astral, 0, codes)]
+    for index in np.flatnonzero(astral):
+        char = chr(codes[index])
+        flags[index] = (SPACE if char.isspace() else 0) | (ALPHA if char.isalpha() else 0)
+    return flags
+
+def _timestamp(value: datetime) -> float:
+    return (value.toordinal() * 86400 + value.hour * 3600 + value.minute * 60 + value.second
+            + value.microsecond / 1_000_000)
+
+def _date_columns(dates: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert dates to (timestamps, [year, month, day] rows) float arrays, NaN
+    where missing. Dates count as midnight, as JournalEntryValidation coerces them.
+    """
+    timestamps = []
+    parts = []
+    for value in dates:
+        if isinstance(value, str):
+            value = pd.to_datetime(value, errors="coerce")
+            value = None if pd.isna(value) else value.to_pydatetime()
+        if isinstance(value, datetime):
+            timestamps.append(_timestamp(value))
+        elif isinstance(value, date):
+            timestamps.append(value.toordinal() * 86400)
+        else:
+            timestamps.append(np.nan)
+            parts.append((np.nan, np.nan, np.nan))
+            continue
+        parts.append((value.year, value.month, value.day))
+    return np.array(timestamps, dtype=float), np.array(parts, dtype=float).reshape(len(dates), 3)
+
+def _numeric_column(values: Sequence[Any]) -> np.ndarray:
+    """Convert values to a float array, NaN where missing or not numeric."""
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
+
+class BatchValidationResult:
+    """
+    Outcome of validating a batch: a boolean mask of valid rows and the failed
+    rule names of every row (empty for valid rows), both by position.
+    """
+    def __init__(self, mask: np.ndarray, reasons: List[List[str]]):
+        self.mask = mask
+        self.reasons = reasons
+
+    @property
+    def valid_count(self) -> int:
+        return int(self.mask.sum())
+
+    def failures(self) -> Iterator[Tuple[int, List[str]]]:
+        """Yield (row position, failed rules) for every invalid row."""
+        for index in np.flatnonzero(~self.mask):
+            yield int(index), self.reasons[index]
+
+class BatchValidator:
+    """
+    Applies the JournalEntryValidation field rules and the ValidationService
+    consistency checks to a whole batch at once.
+
+    Contents are concatenated and scanned once as an array of per-character
+    flags; per-row answers (invalid characters, letters, word count) come from
+    segmented reductions over that array. Every rule then yields a
+    boolean failure mask over the batch. Rules are chained the way the
+    per-entry validators are: a field's checks stop at its first failure, the
+    word count is only compared once content is valid, and the consistency
+    checks only run on rows whose fields all passed, stopping at the first
+    that fails.
+    """
+
+    def validate(self, entries: Sequence[Any], now: Optional[datetime] = None) -> BatchValidationResult:
+        """Validate objects exposing date, content, word_count, year, month and day."""
+        return self.validate_columns(
+            dates=[entry.date for entry in entries],
+            contents=[entry.content for entry in entries],
+            word_counts=[entry.word_count for entry in entries],
+            years=[entry.year for entry in entries],
+            months=[entry.month for entry in entries],
+            days=[entry.day for entry in entries],
+            now=now
+        )
+
+    def validate_frame(self, frame: pd.DataFrame, now: Optional[datetime] = None) -> BatchValidationResult:
+        """Validate a frame with date, content, word_count, year, month and day columns."""
+        return self.validate_columns(
+            dates=frame["date"].tolist(),
+            contents=frame["content"].tolist(),
+            word_counts=frame["word_count"].tolist(),
+            years=frame["year"].tolist(),
+            months=frame["month"].tolist(),
+            days=frame["day"].tolist(),
+            now=now
+        )
+
+    def validate_columns(
+        self,
+        dates: Sequence[Any],
+        contents: Sequence[Any],
+        word_counts: Sequence[Any],
+        years: Sequence[Any],
+        months: Sequence[Any],
+        days: Sequence[Any],
+        now: Optional[datetime] = None
+    ) -> BatchValidationResult:
+        now = now or datetime.now()
+        rows = len(contents)
+        failures: Dict[str, np.ndarray] = {}
+
+        # date, as seconds since 0001-01-01 so comparisons are plain float masks
+        timestamps, date_parts = _date_columns(dates)
+        failures["date_missing"] = np.isnan(timestamps)
+        with np.errstate(invalid="ignore"):
+            failures["date_range"] = ~failures["date_missing"] & (
+                (timestamps < _timestamp(MIN_DATE)) | (timestamps > _timestamp(MAX_DATE))
+            )
+
+        # content: length, then invalid characters, then letters, then whitespace
+        is_str = np.fromiter((isinstance(content, str) for content in contents), dtype=bool, count=rows)
+        texts = [content if ok else "" for content, ok in zip(contents, is_str)]
+        stats = self._scan(texts)
+        length = stats["length"]
+        failures["content_missing"] = ~is_str
+        failures["content_length"] = is_str & ((length < MIN_CONTENT_LENGTH) | (length > MAX_CONTENT_LENGTH))
+        remaining = is_str & ~failures["content_length"]
+
+        failures["content_invalid_chars"] = remaining & stats["has_invalid"]
+        remaining &= ~failures["content_invalid_chars"]
+
+        failures["content_no_letters"] = remaining & ~stats["has_letter"]
+        remaining &= ~failures["content_no_letters"]
+
+        failures["content_whitespace"] = remaining & (stats["stripped_length"] < length * MIN_STRIPPED_RATIO)
+        content_ok = remaining & ~failures["content_whitespace"]
+
+        # word_count, compared with the actual count only when content is valid
+        word_count = _numeric_column(word_counts)
+        failures["word_count_missing"] = np.isnan(word_count)
+        with np.errstate(invalid="ignore"):
+            failures["word_count_positive"] = ~failures["word_count_missing"] & (word_count <= 0)
+            compare = content_ok & ~failures["word_count_missing"] & ~failures["word_count_positive"]
+            failures["word_count_mismatch"] = compare & (
+                np.abs(word_count - stats["word_count"]) > WORD_COUNT_TOLERANCE
+            )
+
+        # year, month, day
+        components = {}
+        for field, values, low, high in (
+            ("year", years, MIN_YEAR, MAX_YEAR), ("month", months, 1, 12), ("day", days, 1, 31)
+        ):
+            numbers = _numeric_column(values)
+            components[field] = numbers
+            failures[f"{field}_missing"] = np.isnan(numbers)
+            with np.errstate(invalid="ignore"):
+                failures[f"{field}_range"] = ~failures[f"{field}_missing"] & ((numbers < low) | (numbers > high))
+
+        # Consistency checks, in order, on rows whose fields are all valid
+        remaining = ~np.logical_or.reduce(list(failures.values())) if failures else np.ones(rows, dtype=bool)
+
+        failures["date_components_mismatch"] = remaining & (
+            (components["year"] != date_parts[:, 0])
+            | (components["month"] != date_parts[:, 1])
+            | (components["day"] != date_parts[:, 2])
+        )
+        remaining &= ~failures["date_components_mismatch"]
+
+        with np.errstate(invalid="ignore"):
+            failures["future_date"] = remaining & (timestamps > _timestamp(now))
+        remaining &= ~failures["future_date"]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average_word_length = stats["stripped_length"] / np.where(remaining, word_count, 1)
+        failures["avg_word_length"] = remaining & (average_word_length > MAX_AVG_WORD_LENGTH)
+
+        rules = list(failures)
+        matrix = np.vstack([failures[rule] for rule in rules]) if rows else np.zeros((len(rules), 0), dtype=bool)
+        mask = ~matrix.any(axis=0)
+
+        reasons: List[List[str]] = [[] for _ in range(rows)]
+        for rule_index, row_index in zip(*np.nonzero(matrix)):
+            reasons[row_index].append(rules[rule_index])
+
+        logger.debug(f"Validated batch of {rows} entries: {int(mask.sum())} valid")
+        return BatchValidationResult(mask, reasons)
+
+    @classmethod
+    def _scan(cls, texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Compute per-text length, stripped length, word count and whether any
+        invalid character or letter occurs.
+        """
+        rows = len(texts)
+        length = np.fromiter(map(len, texts), dtype=np.int64, count=rows)
+        stats = {
+            "length": length,
+            "stripped_length": np.fromiter((len(text.strip()) for text in texts), dtype=np.int64, count=rows),
+            "word_count": np.zeros(rows, dtype=np.int64),
+            "has_invalid": np.zeros(rows, dtype=bool),
+            "has_letter": np.zeros(rows, dtype=bool),
+        }
+
+        # Scan blocks of about SCAN_BLOCK_CHARS characters so the per-character
+        # arrays stay cache-sized however large the batch is
+        ends = np.cumsum(length)
+        start = 0
+        while start < rows:
+            offset = ends[start - 1] if start else 0
+            end = max(start + 1, int(np.searchsorted(ends, offset + SCAN_BLOCK_CHARS, side="right")))
+            block = slice(start, end)
+            stats["has_invalid"][block], stats["has_letter"][block], stats["word_count"][block] = (
+                cls._scan_block(texts[block], length[block])
+            )
+            start = end
+        return stats
+
+    @staticmethod
+    def _scan_block(texts: List[str], length: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (has_invalid, has_letter, word_count) with one pass over the block's characters."""
+        rows = len(texts)
+        non_empty = length > 0
+        if not non_empty.any():
+            return np.zeros(rows, dtype=bool), np.zeros(rows, dtype=bool), np.zeros(rows, dtype=np.int64)
+
+        flags = _classify("".join(texts))
+        starts = (np.cumsum(length) - length)[non_empty]
+
+        # OR of all flags per row; reduceat needs in-range starts, so empty rows are skipped
+        row_flags = np.zeros(rows, dtype=np.uint8)
+        row_flags[non_empty] = np.bitwise_or.reduceat(flags, starts)
+
+        # A word starts at a non-space whose predecessor is a space or the row start
+        is_space = (flags & SPACE) > 0
+        word_start = ~is_space
+        word_start[1:] &= is_space[:-1]
+        word_start[starts] = ~is_space[starts]
+        word_count = np.zeros(rows, dtype=np.int64)
+        word_count[non_empty] = np.add.reduceat(word_start, starts, dtype=np.int32)
+
+        return (row_flags & INVALID) > 0, (row_flags & ALPHA) > 0, word_count
@@ -0,0 +1,129 @@
+"""
+Service for persisting page-level ingestion checkpoints.
+"""
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IngestCheckpoint:
+    """
+    Progress of one ingestion job, keyed by the uploaded file's SHA-256.
+
+    ``resume_page`` is the page on which the first unfinished entry starts and
+    ``skip_entries`` is how many entries starting on that page were already
+    handled, so a resumed job re-extracts from ``resume_page`` and drops exactly
+    the entries it has already seen. For an incremental job, ``unmatched_rows``
+    holds the (id, year) of the file's existing rows that no handled entry has
+    matched yet, so deletions stay correct on resume. ``attempts`` counts the
+    runs started from the checkpoint, so a job that keeps dying is eventually
+    given up.
+    """
+    def __init__(
+        self,
+        file_hash: str,
+        filename: str,
+        spool_path: str,
+        incremental: bool = False,
+        resume_page: int = 0,
+        skip_entries: int = 0,
+        entries_stored: int = 0,
+        unmatched_rows: Optional[List[Tuple[int, int]]] = None,
+        attempts: int = 1,
+        updated_at: Optional[datetime] = None
+    ):
+        self.file_hash = file_hash
+        self.filename = filename
+        self.spool_path = spool_path
+        self.incremental = incremental
+        self.resume_page = resume_page
+        self.skip_entries = skip_entries
+        self.entries_stored = entries_stored
+        self.unmatched_rows = unmatched_rows
+        self.attempts = attempts
+        self.updated_at = updated_at or datetime.utcnow()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "file_hash": self.file_hash,
+            "filename": self.filename,
+            "spool_path": self.spool_path,
+            "incremental": self.incremental,
+            "resume_page": self.resume_page,
+            "skip_entries": self.skip_entries,
+            "entries_stored": self.entries_stored,
+            "unmatched_rows": [list(row) for row in self.unmatched_rows] if self.unmatched_rows is not None else None,
+            "attempts": self.attempts,
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IngestCheckpoint":
+        return cls(
+            file_hash=data["file_hash"],
+            filename=data["filename"],
+            spool_path=data["spool_path"],
+            incremental=data.get("incremental", False),
+            resume_page=data.get("resume_page", 0),
+            skip_entries=data.get("skip_entries", 0),
+            entries_stored=data.get("entries_stored", 0),
+            unmatched_rows=[tuple(row) for row in data["unmatched_rows"]] if data.get("unmatched_rows") is not None else None,
+            attempts=data.get("attempts", 1),
+            updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None,
+        )
+
+class CheckpointStore:
+    """Stores one JSON checkpoint file per in-progress ingestion job."""
+
+    def __init__(self, checkpoint_dir: str):
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, file_hash: str) -> Path:
+        return self.checkpoint_dir / f"{file_hash}.json"
+
+    def load(self, file_hash: str) -> Optional[IngestCheckpoint]:
+        """Return the checkpoint for a file hash, if one exists."""
+        try:
+            return IngestCheckpoint.from_dict(json.loads(self._path(file_hash).read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring corrupt checkpoint for {file_hash}: {str(e)}")
+            return None
+
+    def save(self, checkpoint: IngestCheckpoint) -> None:
+        """Atomically write a checkpoint so a crash never leaves a torn file."""
+        checkpoint.updated_at = datetime.utcnow()
+        path = self._path(checkpoint.file_hash)
+        fd, tmp_path = tempfile.mkstemp(dir=self.checkpoint_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(checkpoint.to_dict(), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, file_hash: str) -> None:
+        """Remove a checkpoint once its job has finished."""
+        try:
+            self._path(file_hash).unlink()
+        except FileNotFoundError:
+            pass
+
+    def pending(self) -> List[IngestCheckpoint]:
+        """Return all checkpoints of jobs that have not completed."""
+        checkpoints = []
+        for path in sorted(self.checkpoint_dir.glob("*.json")):
+            checkpoint = self.load(path.stem)
+            if checkpoint is not None:
+                checkpoints.append(checkpoint)
+        return checkpoints
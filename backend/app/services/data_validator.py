@@ -1,52 +1,50 @@
 """
 Service for validating journal entries.
 """
-from typing import List, Dict, Any
+from typing import List, Optional
 import logging
-from datetime import datetime
+from .entry_parser import ParsedEntry
+from .validation_diagnostics import ValidationDiagnostics
 
 logger = logging.getLogger(__name__)
 
 class DataValidator:
-    def validate_entries(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Validate journal entries."""
+    def validate_entries(
+        self,
+        entries: List[ParsedEntry],
+        diagnostics: Optional[ValidationDiagnostics] = None
+    ) -> List[ParsedEntry]:
+        """
+        Validate journal entries.
+        Failures are counted in ``diagnostics`` rather than logged per entry,
+        so log volume does not grow with the size of the journal.
+        """
+        diagnostics = diagnostics if diagnostics is not None else ValidationDiagnostics()
         valid_entries = []
         
-        logger.info(f"Starting validation of {len(entries)} entries")
-        
         for entry in entries:
             try:
-                # Log the entry being validated
-                logger.info(f"Validating entry: {entry.get('date')} - {entry.get('content')[:50]}...")
-                
-                # Validate required fields exist
-                required_fields = ['date', 'content', 'source_file']
-                missing_fields = [field for field in required_fields if field not in entry]
-                if missing_fields:
-                    logger.warning(f"Entry missing required fields: {missing_fields}")
+                # Validate required fields are set
+                if not entry.source_file:
+                    diagnostics.record_failure(["missing_source_file"], None, entry.date)
                     continue
                 
                 # Validate content is not empty
-                if not entry['content'] or not entry['content'].strip():
-                    logger.warning("Entry has empty content")
+                if not entry.content or not entry.content.strip():
+                    diagnostics.record_failure(["empty_content"], entry.source_file, entry.date)
                     continue
                 
                 # More lenient date validation
-                if not entry['date']:
-                    logger.warning(f"Invalid date: {entry.get('date')}")
+                if not entry.date:
+                    diagnostics.record_failure(["missing_date"], entry.source_file)
                     continue
                 
-                # More lenient word count validation
-                if 'word_count' not in entry or entry['word_count'] is None:
-                    entry['word_count'] = len(entry['content'].split())
-                    logger.info(f"Added word count: {entry['word_count']}")
-                
                 valid_entries.append(entry)
-                logger.info(f"Entry validated successfully: {entry.get('date')}")
                 
             except Exception as e:
-                logger.error(f"Error validating entry: {str(e)}")
+                diagnostics.record_failure(["validation_error"], getattr(entry, "source_file", None), detail=str(e))
                 continue
         
-        logger.info(f"Validation complete. {len(valid_entries)} valid out of {len(entries)} total")
-        return valid_entries 
\ No newline at end of file
+        diagnostics.record_checked(len(entries))
+        logger.debug(f"Validation complete. {len(valid_entries)} valid out of {len(entries)} total")
+        return valid_entries
\ No newline at end of file
@@ -1,56 +1,146 @@
 """
 Service for handling database operations with batch processing and error handling.
 """
-from sqlalchemy.orm import Session
-from typing import List, Tuple, Dict, Any
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Tuple
+from ..core.config import settings
+from ..db.partitions import ensure_year_partitions
 from ..models.journal import JournalEntry
+from ..utils.hashing import entry_content_hash
+from .entry_parser import ParsedEntry
 import logging
 
 logger = logging.getLogger(__name__)
 
+# An entry is identified by its source file, date and content hash; the
+# unique index also carries the partition key, year
+ENTRY_KEY = ("source_file", "entry_date", "content_hash", "year")
+
+def _insert_statement():
+    """
+    INSERT ... ON CONFLICT DO NOTHING on the entry key. Every other column
+    follows from the entry's date and content, so a stored entry has nothing
+    to update. RETURNING yields a row per inserted entry only.
+    """
+    table = JournalEntry.__table__
+    return insert(table).on_conflict_do_nothing(index_elements=list(ENTRY_KEY)).returning(table.c.id)
+
 class DatabaseOperations:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, batch_size: Optional[int] = None):
         self.db = db
-    
-    async def store_entries(self, entries: List[Dict[str, Any]]) -> Tuple[int, List[str]]:
-        """Store journal entries in the database."""
+        self.batch_size = max(1, batch_size or settings.DB_INSERT_BATCH_SIZE)
+        self.insert = _insert_statement()
+
+        # Running totals over every store_entries call
+        self.inserted = 0
+        self.skipped = 0
+
+    @staticmethod
+    def _to_row(entry_data: ParsedEntry) -> Dict[str, Any]:
+        """Map a parsed entry onto journal_entries columns."""
+        return {
+            "entry_date": entry_data.date,
+            "content": entry_data.content,
+            "day_of_week": entry_data.day_of_week,
+            "word_count": entry_data.word_count,
+            "year": entry_data.year,
+            "month": entry_data.month,
+            "day": entry_data.day,
+            "source_file": entry_data.source_file,
+            "content_hash": entry_content_hash(entry_data.content),
+        }
+
+    async def store_entries(self, entries: List[ParsedEntry]) -> Tuple[int, List[str]]:
+        """
+        Store journal entries in the database.
+
+        Entries are inserted with multi-row INSERTs of ``batch_size`` rows, one
+        transaction per batch. An entry already stored with the same source
+        file, date and content is skipped, so uploading a file again is a
+        cheap no-op. Yearly
+        partitions are created before the first rows for a year are written.
+        Each batch runs inside a savepoint; if it fails, it is split in half
+        and each half retried, so a malformed entry costs only its own row and
+        is reported in the returned errors.
+
+        Returns (rows inserted, errors). The ``inserted`` and ``skipped``
+        attributes keep running totals.
+        """
         success_count = 0
         errors = []
-        
-        for entry_data in entries:
+
+        for start in range(0, len(entries), self.batch_size):
+            batch = []
+            rows = []
+            keys = set()
+            duplicates = 0
+            for entry_data in entries[start:start + self.batch_size]:
+                try:
+                    row = self._to_row(entry_data)
+                except Exception as e:
+                    error_msg = f"Error storing entry for date {entry_data.date}: {str(e)}"
+                    logger.error(error_msg)
+                    errors.append(error_msg)
+                    continue
+                # Repeats within the batch are skipped without sending them
+                key = tuple(row[column] for column in ENTRY_KEY)
+                if key in keys:
+                    duplicates += 1
+                    continue
+                keys.add(key)
+                batch.append(entry_data)
+                rows.append(row)
+            self.skipped += duplicates
+            if not rows:
+                continue
+
             try:
-                # Create new JournalEntry instance
-                db_entry = JournalEntry(
-                    entry_date=entry_data['date'],
-                    content=entry_data['content'],
-                    day_of_week=entry_data['day_of_week'],
-                    word_count=entry_data['word_count'],
-                    year=entry_data['year'],
-                    month=entry_data['month'],
-                    day=entry_data['day'],
-                    source_file=entry_data['source_file'],
-                    sentiment_score=entry_data.get('sentiment_score'),
-                    complexity_score=entry_data.get('complexity_score'),
-                    topics=entry_data.get('topics'),
-                    mentioned_people=entry_data.get('mentioned_people'),
-                    mentioned_locations=entry_data.get('mentioned_locations'),
-                    embedding=entry_data.get('embedding')
-                )
-                
-                # Add and commit
-                self.db.add(db_entry)
-                self.db.commit()
-                self.db.refresh(db_entry)
-                
-                success_count += 1
-                logger.info(f"Successfully stored entry {success_count} for date {entry_data['date']}")
-                
+                years = {row["year"] for row in rows if isinstance(row["year"], int)}
+                await ensure_year_partitions(self.db, [JournalEntry.__tablename__], years)
+                inserted, failed = await self._insert_isolating_failures(batch, rows, errors)
+                await self.db.commit()
             except Exception as e:
-                self.db.rollback()
-                error_msg = f"Error storing entry for date {entry_data.get('date', 'unknown')}: {str(e)}"
+                await self.db.rollback()
+                error_msg = f"Error storing {len(batch)} entries from {batch[0].date} to {batch[-1].date}: {str(e)}"
                 logger.error(error_msg)
                 errors.append(error_msg)
                 continue
-        
-        logger.info(f"Completed storing entries. Success: {success_count}, Errors: {len(errors)}")
-        return success_count, errors 
\ No newline at end of file
+
+            self.inserted += inserted
+            self.skipped += len(rows) - inserted - failed
+            success_count += inserted
+
+        logger.info(
+            f"Completed storing entries. Inserted: {self.inserted}, "
+            f"Skipped: {self.skipped}, Errors: {len(errors)}"
+        )
+        return success_count, errors
+
+    async def _insert_isolating_failures(
+        self,
+        batch: List[ParsedEntry],
+        rows: List[Dict[str, Any]],
+        errors: List[str]
+    ) -> Tuple[int, int]:
+        """
+        Insert rows under a savepoint, bisecting on failure down to single rows.
+        Returns the number of rows (inserted, failed).
+        """
+        try:
+            async with self.db.begin_nested():
+                result = await self.db.execute(self.insert, rows)
+                inserted = len(result.fetchall())
+            return inserted, 0
+        except SQLAlchemyError as e:
+            if len(rows) == 1:
+                error_msg = f"Error storing entry for date {batch[0].date}: {str(getattr(e, 'orig', None) or e)}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+                return 0, 1
+
+        middle = len(rows) // 2
+        first = await self._insert_isolating_failures(batch[:middle], rows[:middle], errors)
+        second = await self._insert_isolating_failures(batch[middle:], rows[middle:], errors)
+        return tuple(a + b for a, b in zip(first, second))
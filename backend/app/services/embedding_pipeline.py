@@ -0,0 +1,340 @@
+"""
+Service for embedding journal entries in bulk.
+
+Entries are packed into requests bounded by an estimated token budget and a
+text count, sent with bounded concurrency, retried with exponential backoff
+when rate limited, and their vectors written back in bulk. Any server that
+speaks the OpenAI embeddings API can be used through OPENAI_BASE_URL.
+"""
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from openai import APIConnectionError, AsyncOpenAI, BadRequestError, InternalServerError, RateLimitError
+from sqlalchemy import Row, bindparam, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.config import settings
+from ..models.journal import JournalEntry
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Characters per token used to estimate request sizes. English prose averages
+# about four; three leaves headroom for numbers, names and other languages.
+CHARS_PER_TOKEN = 3
+
+# Errors worth retrying: rate limits, dropped connections and server errors
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+def input_too_long(error: BadRequestError) -> bool:
+    """True if the request was rejected because an input exceeds the model's context length."""
+    return error.code == "context_length_exceeded" or "maximum context length" in str(error)
+
+def estimate_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+def pack_batches(texts: Sequence[str], max_tokens: int, max_texts: int) -> List[List[int]]:
+    """
+    Group the indices of ``texts`` into consecutive batches of at most
+    ``max_texts`` texts and ``max_tokens`` estimated tokens. A text over the
+    token budget on its own gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    tokens = 0
+    for index, text in enumerate(texts):
+        text_tokens = estimate_tokens(text)
+        if batch and (len(batch) >= max_texts or tokens + text_tokens > max_tokens):
+            batches.append(batch)
+            batch, tokens = [], 0
+        batch.append(index)
+        tokens += text_tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+def retry_after(error: Optional[Exception]) -> Optional[float]:
+    """Seconds the server asked to wait (Retry-After), if it did."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        if "retry-after-ms" in response.headers:
+            return float(response.headers["retry-after-ms"]) / 1000
+        if "retry-after" in response.headers:
+            return float(response.headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+def backoff_delay(attempt: int, error: Optional[Exception] = None) -> float:
+    """
+    Seconds to wait before retry ``attempt`` (0-based): exponential backoff
+    from the server's Retry-After, or from EMBEDDING_BACKOFF_SECONDS, plus up
+    to half again as jitter so retries that waited together spread out.
+    """
+    base = retry_after(error)
+    if base is None:
+        base = settings.EMBEDDING_BACKOFF_SECONDS
+    delay = min(settings.EMBEDDING_BACKOFF_MAX_SECONDS, base * 2 ** attempt)
+    return delay * random.uniform(1.0, 1.5)
+
+@dataclass
+class EmbeddingStats:
+    """
+    Totals of one embedding run. ``tokens`` are as counted by the server;
+    ``skipped`` texts were rejected as too long and got no vector.
+    """
+    texts: int = 0
+    tokens: int = 0
+    requests: int = 0
+    retries: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def texts_per_second(self) -> float:
+        return self.texts / self.seconds if self.seconds else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.texts} texts, {self.tokens} tokens in {self.requests} requests "
+            f"({self.retries} retried, {self.skipped} texts skipped) in {self.seconds:.1f}s: "
+            f"{self.texts_per_second:.1f} texts/s, {self.tokens_per_second:.0f} tokens/s"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "texts": self.texts,
+            "tokens": self.tokens,
+            "requests": self.requests,
+            "retries": self.retries,
+            "skipped": self.skipped,
+            "seconds": round(self.seconds, 3),
+            "texts_per_second": round(self.texts_per_second, 1),
+            "tokens_per_second": round(self.tokens_per_second, 1),
+        }
+
+class EmbeddingPipeline:
+    """
+    Embeds lists of texts through the embeddings API.
+
+    At most ``concurrency`` requests are in flight across every ``embed`` call
+    on the same pipeline, so concurrent ingest jobs share one budget. The
+    client's own retries are disabled; rate limits are retried here.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        model: Optional[str] = None,
+        dimensions: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        batch_tokens: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_retries: Optional[int] = None
+    ):
+        self.client = client or AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=settings.EMBEDDING_REQUEST_TIMEOUT,
+            max_retries=0
+        )
+        self.model = model or settings.EMBEDDING_MODEL
+        self.dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+        self.concurrency = max(1, concurrency or settings.EMBEDDING_CONCURRENCY)
+        self.batch_tokens = batch_tokens or settings.EMBEDDING_BATCH_TOKENS
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.max_retries = settings.EMBEDDING_MAX_RETRIES if max_retries is None else max_retries
+        # Created on first use, inside the event loop that runs the requests
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Once rate limited, no request is sent before this time.monotonic()
+        self._paused_until = 0.0
+
+    async def embed(self, texts: Sequence[str], stats: Optional[EmbeddingStats] = None) -> List[Optional[List[float]]]:
+        """
+        Return one vector per text, in order. Raises once a request runs out of
+        retries. A text the model rejects as too long is skipped: its vector is
+        None and it is counted in ``stats.skipped``; the other texts are embedded.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        stats = stats if stats is not None else EmbeddingStats()
+        max_chars = settings.EMBEDDING_MAX_INPUT_TOKENS * CHARS_PER_TOKEN
+        inputs = [text[:max_chars] or " " for text in texts]
+        vectors: List[Optional[List[float]]] = [None] * len(inputs)
+
+        async def run(batch: List[int]) -> None:
+            try:
+                batch_vectors = await self._request([inputs[index] for index in batch], stats)
+            except BadRequestError as e:
+                if not input_too_long(e):
+                    raise
+                # The token estimate can fall short, e.g. for numbers or other
+                # languages. Halve the batch until the offending text is alone.
+                if len(batch) == 1:
+                    stats.skipped += 1
+                    logger.warning(f"Skipped text {batch[0]} of {len(inputs)}, too long to embed: {e.message}")
+                    return
+                half = len(batch) // 2
+                await asyncio.gather(run(batch[:half]), run(batch[half:]))
+                return
+            for index, vector in zip(batch, batch_vectors):
+                vectors[index] = vector
+
+        # Let every batch finish before raising, so no request outlives the call
+        results = await asyncio.gather(
+            *(run(batch) for batch in pack_batches(inputs, self.batch_tokens, self.batch_size)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        stats.texts += sum(1 for vector in vectors if vector is not None)
+        return vectors
+
+    async def _request(self, inputs: List[str], stats: EmbeddingStats) -> List[List[float]]:
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                # Checked once a slot is free, as the pause may have begun meanwhile
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                try:
+                    response = await self.client.embeddings.create(
+                        model=self.model,
+                        input=inputs,
+                        dimensions=self.dimensions
+                    )
+                    error = None
+                except RETRYABLE_ERRORS as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    error = e
+            stats.requests += 1
+            if error is None:
+                break
+            # Sleep outside the semaphore so other batches keep their slots. A
+            # rate limit applies to every request, so all of them hold off
+            # for as long as the server asked.
+            delay = backoff_delay(attempt, error)
+            if isinstance(error, RateLimitError):
+                pause = retry_after(error) or delay
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            stats.retries += 1
+            attempt += 1
+            logger.warning(f"Embedding request of {len(inputs)} texts failed ({error.__class__.__name__}), retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        if response.usage is not None:
+            stats.tokens += response.usage.total_tokens
+        else:
+            stats.tokens += sum(estimate_tokens(text) for text in inputs)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+_pipeline: Optional[EmbeddingPipeline] = None
+
+def get_embedding_pipeline() -> EmbeddingPipeline:
+    """The pipeline shared by ingest jobs, so EMBEDDING_CONCURRENCY bounds the whole process."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = EmbeddingPipeline()
+    return _pipeline
+
+# Fills in an embedding by primary key, unless the content changed since it
+# was read; updated_at is kept since the entry itself did not change
+_WRITE_BACK = (
+    update(JournalEntry.__table__)
+    .where(
+        JournalEntry.id == bindparam("entry_id"),
+        JournalEntry.year == bindparam("entry_year"),
+        JournalEntry.content_hash.is_not_distinct_from(bindparam("entry_hash"))
+    )
+    .values(
+        embedding=bindparam("vector", type_=JournalEntry.embedding.type),
+        updated_at=JournalEntry.updated_at
+    )
+)
+
+async def _pending_page(
+    db: AsyncSession,
+    after: Optional[Tuple[date, int]],
+    limit: int,
+    source_file: Optional[str]
+) -> List[Row]:
+    """Entries without an embedding, a keyset page at a time in (entry_date, id) order."""
+    order = (JournalEntry.entry_date, JournalEntry.id)
+    query = select(
+        JournalEntry.id, JournalEntry.year, JournalEntry.entry_date,
+        JournalEntry.content, JournalEntry.content_hash
+    ).where(JournalEntry.embedding.is_(None))
+    if source_file is not None:
+        query = query.where(JournalEntry.source_file == source_file)
+    if after is not None:
+        query = query.where(tuple_(*order) > tuple_(*after))
+    result = await db.execute(query.order_by(*order).limit(limit))
+    return result.fetchall()
+
+async def _write_back(db: AsyncSession, rows: List[Row], vectors: List[Optional[List[float]]]) -> None:
+    # Skipped entries keep no embedding
+    params = [
+        {"entry_id": row.id, "entry_year": row.year, "entry_hash": row.content_hash, "vector": vector}
+        for row, vector in zip(rows, vectors)
+        if vector is not None
+    ]
+    if params:
+        await db.execute(_WRITE_BACK, params)
+    await db.commit()
+
+async def embed_pending_entries(
+    db: AsyncSession,
+    pipeline: Optional[EmbeddingPipeline] = None,
+    source_file: Optional[str] = None,
+    page_size: Optional[int] = None
+) -> EmbeddingStats:
+    """
+    Embed every stored entry that has no embedding, optionally only those of
+    one source file. Entries are read ``page_size`` at a time and each page is
+    written back in one transaction; the next page is read and sent while the
+    current one is written. Pages written before an error stay committed.
+    Entries too long to embed are left without an embedding and counted in
+    the stats' ``skipped``.
+    """
+    pipeline = pipeline or get_embedding_pipeline()
+    page_size = page_size or settings.EMBEDDING_WRITE_BATCH_SIZE
+    stats = EmbeddingStats()
+    start = time.perf_counter()
+
+    def start_embedding(page: List[Row]) -> Optional[asyncio.Future]:
+        if not page:
+            return None
+        return asyncio.ensure_future(pipeline.embed([row.content for row in page], stats))
+
+    page = await _pending_page(db, None, page_size, source_file)
+    embedding = start_embedding(page)
+    next_embedding = None
+    try:
+        while page:
+            next_page = []
+            if len(page) == page_size:
+                last = page[-1]
+                next_page = await _pending_page(db, (last.entry_date, last.id), page_size, source_file)
+            next_embedding = start_embedding(next_page)
+            vectors = await embedding
+            await _write_back(db, page, vectors)
+            logger.debug(f"Embedded and stored {len(page)} entries")
+            page, embedding, next_embedding = next_page, next_embedding, None
+    finally:
+        for pending in (embedding, next_embedding):
+            if pending is not None and not pending.done():
+                pending.cancel()
+        stats.seconds = time.perf_counter() - start
+    return stats
@@ -2,12 +2,141 @@
 Service for parsing and segmenting journal entries.
 """
 import re
-from datetime import datetime
-from typing import List
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Entry header: a date followed by the day of week, e.g. "3/14/2021 – Sunday"
+ENTRY_HEADER = re.compile(
+    r'(\d{1,2}/\d{1,2}/\d{4})\s*[–-]\s*(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)'
+)
+
+# A line holding nothing but a month name
+MONTH_HEADER = re.compile(
+    r'^(January|February|March|April|May|June|July|August|September|October|November|December)$',
+    re.MULTILINE
+)
+
+BLANK_LINES = re.compile(r'\n\s*\n')
+
+def clean_entry_body(body: str) -> str:
+    """Strip month headers and blank lines from a single entry body."""
+    body = MONTH_HEADER.sub('', body)
+    body = BLANK_LINES.sub('\n', body)
+    return body.strip()
+
+class ParsedEntry:
+    """
+    A parsed journal entry.
+
+    Records use ``__slots__`` and hold only what the parser actually knows;
+    ``year``/``month``/``day`` are derived from ``date``, and analysis fields
+    (sentiment, topics, embedding...) are filled in later on the database row.
+    The body is kept as ``(start, end)`` offsets into the extracted text and is
+    only sliced and cleaned the first time ``content`` is read, so entries that
+    are skipped (e.g. when resuming) never copy their text.
+    """
+    __slots__ = ('date', 'day_of_week', 'source_file', 'page', '_text', '_start', '_end', '_content', '_word_count')
+
+    def __init__(
+        self,
+        date: date,
+        day_of_week: int,
+        source_file: str,
+        content: Optional[str] = None,
+        text: Optional[str] = None,
+        start: int = 0,
+        end: Optional[int] = None,
+        page: Optional[int] = None,
+        word_count: Optional[int] = None
+    ):
+        self.date = date
+        self.day_of_week = day_of_week
+        self.source_file = source_file
+        self.page = page
+        self._text = text
+        self._start = start
+        self._end = end
+        self._content = content
+        self._word_count = word_count
+
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self._content = clean_entry_body(self._text[self._start:self._end])
+            # Drop the reference so the extracted text can be freed
+            self._text = None
+        return self._content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        # The word count always describes the text as parsed, not as later cleaned
+        if self._word_count is None:
+            self._word_count = len(self.content.split())
+        self._content = value
+        self._text = None
+
+    @property
+    def word_count(self) -> int:
+        if self._word_count is None:
+            self._word_count = len(self.content.split())
+        return self._word_count
+
+    @word_count.setter
+    def word_count(self, value: int) -> None:
+        self._word_count = value
+
+    @property
+    def year(self) -> int:
+        return self.date.year
+
+    @property
+    def month(self) -> int:
+        return self.date.month
+
+    @property
+    def day(self) -> int:
+        return self.date.day
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the entry in the legacy dict layout."""
+        entry = {
+            'date': self.date,
+            'content': self.content,
+            'day_of_week': self.day_of_week,
+            'word_count': self.word_count,
+            'year': self.year,
+            'month': self.month,
+            'day': self.day,
+            'source_file': self.source_file,
+            'sentiment_score': None,
+            'complexity_score': None,
+            'topics': None,
+            'mentioned_people': None,
+            'mentioned_locations': None,
+            'embedding': None
+        }
+        if self.page is not None:
+            entry['page'] = self.page
+        return entry
+
+    def __getstate__(self) -> tuple:
+        # Ship only this entry's own body to worker processes, never the whole text
+        content = self._content if self._content is not None else self._text[self._start:self._end]
+        return (self.date, self.day_of_week, self.source_file, self.page,
+                content, self._content is not None, self._word_count)
+
+    def __setstate__(self, state: tuple) -> None:
+        self.date, self.day_of_week, self.source_file, self.page, content, cleaned, self._word_count = state
+        self._content, self._text = (content, None) if cleaned else (None, content)
+        self._start, self._end = 0, None
+
+    def __repr__(self) -> str:
+        return f"ParsedEntry(date={self.date!r}, source_file={self.source_file!r}, page={self.page!r})"
+
 class EntryParser:
     DAY_MAPPING = {
         'Sunday': 1,
@@ -21,10 +150,10 @@ class EntryParser:
 
     def __init__(self):
         # Pattern specifically matches your date format with day of week
-        self.entry_pattern = r'(\d{1,2}/\d{1,2}/\d{4})\s*[–-]\s*(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)'
+        self.entry_pattern = ENTRY_HEADER
         
         # Pattern to identify month headers
-        self.month_header = r'^(January|February|March|April|May|June|July|August|September|October|November|December)$'
+        self.month_header = MONTH_HEADER
     
     def parse_date(self, date_str: str) -> datetime.date:
         """
@@ -40,67 +169,114 @@ class EntryParser:
             logger.error(f"Failed to parse date '{date_str}': {str(e)}")
             raise
     
-    def parse_entries(self, content: str, source_file: str) -> List[dict]:
-        """Parse content into separate journal entries."""
+    def _build_entry(
+        self,
+        header: re.Match,
+        text: str,
+        end: Optional[int],
+        source_file: str,
+        page: Optional[int] = None
+    ) -> Optional[ParsedEntry]:
+        """
+        Build an entry from a header match and the end offset of its body in
+        ``text``, or None if the date is invalid.
+        """
+        date_str, day_str = header.group(1), header.group(2)
         try:
-            if not isinstance(content, str):
-                raise ValueError(f"Expected string content, got {type(content)}")
-            
-            # First, remove month headers
-            content = re.sub(self.month_header, '', content, flags=re.MULTILINE)
+            # Parse date using flexible parser
+            entry_date = self.parse_date(date_str)
+        except ValueError as e:
+            logger.warning(f"Skipping entry with invalid date {date_str}: {str(e)}")
+            return None
+        
+        # The body stays in ``text`` until its content is first needed
+        return ParsedEntry(
+            date=entry_date,
+            day_of_week=self.DAY_MAPPING[day_str],
+            source_file=source_file,
+            text=text,
+            start=header.end(),
+            end=end,
+            page=page
+        )
+    
+    async def iter_entries(
+        self,
+        pages: AsyncIterable[Tuple[int, str]],
+        source_file: str
+    ) -> AsyncIterator[ParsedEntry]:
+        """
+        Incrementally parse entries from a stream of (page_number, text) pages.
+        
+        An entry is emitted as soon as the next date header closes it, so only the
+        entry currently being read is buffered. Entries spanning page breaks are
+        stitched together exactly as if the pages had been joined with newlines.
+        """
+        buffer = ''
+        # (buffer offset, page number) for each page currently in the buffer
+        page_starts: List[Tuple[int, int]] = []
+        
+        def page_at(offset: int) -> int:
+            index = bisect_right(page_starts, (offset, float('inf'))) - 1
+            return page_starts[max(index, 0)][1]
+        
+        def close_entry(header: re.Match, end: Optional[int]) -> Optional[ParsedEntry]:
+            return self._build_entry(header, buffer, end, source_file, page=page_at(header.start()))
+        
+        async for page_number, text in pages:
+            if not text:
+                continue
+            if buffer:
+                buffer += '\n'
+            page_starts.append((len(buffer), page_number))
+            buffer += text
             
-            # Remove any resulting empty lines
-            content = re.sub(r'\n\s*\n', '\n', content)
+            matches = list(self.entry_pattern.finditer(buffer))
+            if not matches:
+                continue
             
-            # Split content by entry pattern
-            entries_split = re.split(self.entry_pattern, content)
+            # Every header except the last one is closed by its successor
+            for current, following in zip(matches, matches[1:]):
+                entry = close_entry(current, following.start())
+                if entry is not None:
+                    yield entry
             
-            # Remove any empty strings at the start
-            if entries_split[0].strip() == '':
-                entries_split = entries_split[1:]
+            # Keep only the still-open entry; text before the first header is preamble
+            cut = matches[-1].start()
+            first_page = page_at(cut)
+            buffer = buffer[cut:]
+            page_starts = [(0, first_page)] + [
+                (offset - cut, number) for offset, number in page_starts if offset > cut
+            ]
+        
+        # The final entry is closed by the end of the document
+        last = self.entry_pattern.match(buffer)
+        if last:
+            entry = close_entry(last, None)
+            if entry is not None:
+                yield entry
+    
+    def parse_entries(self, content: str, source_file: str) -> List[ParsedEntry]:
+        """Parse content into separate journal entries."""
+        try:
+            if not isinstance(content, str):
+                raise ValueError(f"Expected string content, got {type(content)}")
             
             entries = []
             
-            # Process entries in groups of 3 (date, day, content)
-            for i in range(0, len(entries_split), 3):
-                if i + 2 >= len(entries_split):
-                    break
-                    
-                date_str = entries_split[i]
-                day_str = entries_split[i + 1]
-                content_text = entries_split[i + 2].strip()
+            # Single pass over the headers: each entry records where its body
+            # lies in the content, so the full text is never copied.
+            # Text before the first header is preamble, not an entry.
+            headers = self.entry_pattern.finditer(content)
+            current = next(headers, None)
+            while current is not None:
+                following = next(headers, None)
+                body_end = following.start() if following is not None else len(content)
                 
-                try:
-                    # Parse date using flexible parser
-                    date = self.parse_date(date_str)
-                    
-                    # Get day of week number
-                    day_of_week = self.DAY_MAPPING[day_str]
-                    
-                    # Create entry
-                    entry = {
-                        'date': date,
-                        'content': content_text,
-                        'day_of_week': day_of_week,
-                        'word_count': len(content_text.split()),
-                        'year': date.year,
-                        'month': date.month,
-                        'day': date.day,
-                        'source_file': source_file,
-                        'sentiment_score': None,
-                        'complexity_score': None,
-                        'topics': None,
-                        'mentioned_people': None,
-                        'mentioned_locations': None,
-                        'embedding': None
-                    }
-                    
+                entry = self._build_entry(current, content, body_end, source_file)
+                if entry is not None:
                     entries.append(entry)
-                    logger.debug(f"Parsed entry for {date}: day={day_str}, content_preview={content_text[:50]}")
-                    
-                except ValueError as e:
-                    logger.warning(f"Skipping entry with invalid date {date_str}: {str(e)}")
-                    continue
+                current = following
             
             if not entries:
                 raise ValueError("No valid entries were parsed")
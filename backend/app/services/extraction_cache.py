@@ -0,0 +1,73 @@
+"""
+On-disk, content-addressed cache of extracted PDF page text.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ExtractionCache:
+    """
+    Page text is stored under the hash of the page's content stream, so an
+    unchanged page is never re-extracted even when it appears in a new export.
+    A per-file manifest maps a whole-file hash to its ordered page hashes,
+    which lets an identical re-upload skip opening the PDF entirely.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.pages_dir = self.cache_dir / "pages"
+        self.files_dir = self.cache_dir / "files"
+        self.pages_dir.mkdir(parents=True, exist_ok=True)
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+
+    def _page_path(self, page_hash: str) -> Path:
+        # Fan out by prefix so no single directory grows unbounded
+        return self.pages_dir / page_hash[:2] / f"{page_hash}.txt"
+
+    def get_page(self, page_hash: str) -> Optional[str]:
+        """Return cached text for a page hash, or None on a miss."""
+        try:
+            return self._page_path(page_hash).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put_page(self, page_hash: str, text: str) -> None:
+        """Store extracted text for a page hash."""
+        path = self._page_path(page_hash)
+        path.parent.mkdir(exist_ok=True)
+        self._atomic_write(path, text)
+
+    def has_pages(self, page_hashes: List[str]) -> bool:
+        """Return True if text for every page hash is cached."""
+        return all(self._page_path(page_hash).exists() for page_hash in page_hashes)
+
+    def get_manifest(self, file_hash: str) -> Optional[List[str]]:
+        """Return the ordered page hashes recorded for a file, if known."""
+        try:
+            return json.loads((self.files_dir / f"{file_hash}.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning(f"Ignoring corrupt extraction manifest for {file_hash}")
+            return None
+
+    def put_manifest(self, file_hash: str, page_hashes: List[str]) -> None:
+        """Record the ordered page hashes for a file."""
+        self._atomic_write(self.files_dir / f"{file_hash}.json", json.dumps(page_hashes))
+
+    @staticmethod
+    def _atomic_write(path: Path, data: str) -> None:
+        # Concurrent workers may write the same page; os.replace keeps readers safe
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,168 @@
+"""
+Service for incrementally re-ingesting an updated export of a journal file.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.journal import JournalEntry
+from ..utils.hashing import entry_content_hash
+from .db_operations import DatabaseOperations
+from .entry_parser import ParsedEntry
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IncrementalSync:
+    """
+    Diffs freshly parsed entries against what is already stored for a source file.
+
+    Stored rows are matched by (entry_date, content_hash): unchanged entries are
+    skipped, entries whose content changed are updated in place, new entries are
+    inserted, and rows that no longer appear in the export are deleted by
+    ``finish()``. Only the id, date and hash of existing rows are loaded. The
+    diff saves database writes only: every entry of the file is still
+    extracted, parsed, cleaned and validated, as the stored hash is of the
+    cleaned content.
+
+    ``load()`` must be awaited before the first batch is applied.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        source_file: str,
+        unmatched: Optional[Iterable[Tuple[int, int]]] = None
+    ):
+        self.db = db
+        self.source_file = source_file
+        # When resuming, the (id, year) of rows the interrupted run had not matched
+        # yet; the file's other rows were matched or inserted by that run
+        self.resume_unmatched = set(unmatched) if unmatched is not None else None
+        self.db_operations = DatabaseOperations(db)
+
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+
+        # entry_date -> [(id, year, content_hash)] for rows not yet matched by this upload
+        self._unmatched: Dict[date, List[Tuple[int, int, str]]] = defaultdict(list)
+        # (entry_date, content_hash) of rows already synced by an interrupted run
+        self._synced: Set[Tuple[date, str]] = set()
+
+    async def load(self) -> None:
+        """Index existing rows for the source file."""
+        query = (
+            select(JournalEntry.id, JournalEntry.year, JournalEntry.entry_date, JournalEntry.content_hash)
+            .where(JournalEntry.source_file == self.source_file)
+        )
+        rows = (await self.db.execute(query)).all()
+
+        for row in rows:
+            if self.resume_unmatched is None or (row.id, row.year) in self.resume_unmatched:
+                self._unmatched[row.entry_date].append((row.id, row.year, row.content_hash))
+            else:
+                self._synced.add((row.entry_date, row.content_hash))
+
+        logger.info(f"Loaded {len(rows)} existing entries for {self.source_file}")
+
+    async def apply_batch(self, entries: List[ParsedEntry]) -> Tuple[int, List[str]]:
+        """
+        Apply one batch of parsed entries.
+        Returns (changed_count, errors) where changed_count counts inserts and updates.
+        """
+        to_insert = []
+        updates = []
+
+        for entry in entries:
+            content_hash = entry_content_hash(entry.content)
+            if (entry.date, content_hash) in self._synced:
+                # Stored by the interrupted run, in a batch it had not checkpointed
+                self.unchanged += 1
+                continue
+            candidates = self._unmatched.get(entry.date, [])
+
+            exact = next((i for i, (_, _, h) in enumerate(candidates) if h == content_hash), None)
+            if exact is not None:
+                candidates.pop(exact)
+                self.unchanged += 1
+                continue
+
+            if candidates:
+                # Same date, different content: the entry was edited in the new export
+                entry_id, year, _ = candidates.pop(0)
+                updates.append({
+                    "id": entry_id,
+                    "year": year,
+                    "content": entry.content,
+                    "content_hash": content_hash,
+                    "word_count": entry.word_count,
+                    "day_of_week": entry.day_of_week,
+                    # Re-embedded with the new content
+                    "embedding": None,
+                })
+                continue
+
+            to_insert.append(entry)
+
+        errors: List[str] = []
+        updated = 0
+        if updates:
+            try:
+                await self.db.execute(update(JournalEntry), updates)
+                await self.db.commit()
+                updated = len(updates)
+                self.updated += updated
+            except Exception as e:
+                await self.db.rollback()
+                error_msg = f"Error updating {len(updates)} changed entries: {str(e)}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+
+        inserted = 0
+        if to_insert:
+            inserted, insert_errors = await self.db_operations.store_entries(to_insert)
+            self.inserted += inserted
+            errors.extend(insert_errors)
+
+        logger.info(
+            f"Incremental batch: {inserted} inserted, {updated} updated, "
+            f"{len(entries) - inserted - updated} unchanged or failed"
+        )
+        return inserted + updated, errors
+
+    def unmatched_rows(self) -> List[Tuple[int, int]]:
+        """(id, year) of existing rows no entry has matched so far, for the job's checkpoint."""
+        return [
+            (entry_id, year)
+            for candidates in self._unmatched.values()
+            for entry_id, year, _ in candidates
+        ]
+
+    async def finish(self) -> int:
+        """
+        Delete stored entries that were not present in the new export.
+        Must only be called once the whole file has been processed.
+        """
+        stale: Set[Tuple[int, int]] = {
+            (entry_id, year)
+            for candidates in self._unmatched.values()
+            for entry_id, year, _ in candidates
+        }
+        if stale:
+            await self.db.execute(
+                delete(JournalEntry)
+                .where(tuple_(JournalEntry.id, JournalEntry.year).in_(stale))
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+        self.deleted = len(stale)
+        self._unmatched.clear()
+
+        logger.info(
+            f"Incremental sync of {self.source_file} complete: {self.inserted} inserted, "
+            f"{self.updated} updated, {self.unchanged} unchanged, {self.deleted} deleted"
+        )
+        return self.deleted
@@ -10,9 +10,10 @@ from ..core.config import settings
 
 class LangChainService:
     def __init__(self):
+        # Must match the stored embeddings (EMBEDDING_DIMENSIONS)
         self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            dimensions=256
+            model=settings.EMBEDDING_MODEL,
+            dimensions=settings.EMBEDDING_DIMENSIONS
         )
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
@@ -28,12 +29,11 @@ class LangChainService:
         pass
 
     def generate_embeddings(self, documents: List[Document]) -> List[List[float]]:
-        """Generate embeddings for documents."""
-        # TODO: Implement embedding generation
-        # - Batch process documents
-        # - Generate embeddings
-        # - Handle rate limiting
-        pass
+        """
+        Generate embeddings for documents, in order. LangChain batches and
+        retries the requests; stored entries are embedded by EmbeddingPipeline.
+        """
+        return self.embeddings.embed_documents([document.page_content for document in documents])
 
     def setup_retrieval_pipeline(self) -> Any:
         """Set up the LangChain retrieval pipeline."""
@@ -8,12 +8,19 @@ from ..core.config import settings
 
 class OpenAIService:
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL or None)
         
     def generate_embeddings(self, text: str) -> List[float]:
-        """Generate embeddings for text using OpenAI API."""
-        # TODO: Implement embedding generation
-        pass
+        """
+        Generate embeddings for text using OpenAI API.
+        One request per call; embed many entries with EmbeddingPipeline.
+        """
+        response = self.client.embeddings.create(
+            model=settings.EMBEDDING_MODEL,
+            input=text,
+            dimensions=settings.EMBEDDING_DIMENSIONS
+        )
+        return response.data[0].embedding
 
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment of text using OpenAI API."""
@@ -1,38 +1,240 @@
 """
 Service for processing PDF files using PDFPlumber.
 """
+import asyncio
+import mmap
+import os
 import pdfplumber
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Union, Optional
+from typing import AsyncIterator, Iterator, List, Dict, Any, Union, Optional, Tuple
 import logging
+from ..core.config import settings
+from ..utils.hashing import manifest_key, page_content_hash, sha256_file
+from .extraction_cache import ExtractionCache
+from .text_extractors import build_extractor_chain
 
 logger = logging.getLogger(__name__)
 
+# Shared across uploads so worker processes are only spawned once
+_executor: Optional[ProcessPoolExecutor] = None
+
+def _get_executor(max_workers: int) -> ProcessPoolExecutor:
+    """Return the shared extraction process pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max_workers)
+    return _executor
+
+def shutdown_extraction_pool() -> None:
+    """Shut down the shared extraction process pool."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+@contextmanager
+def _open_pdf(file_path: str) -> Iterator[pdfplumber.PDF]:
+    """
+    Open a PDF through a read-only memory map where possible, so concurrent
+    workers share the OS page cache instead of each buffering their own copy.
+    """
+    with open(file_path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files and some filesystems cannot be mapped
+            mapped = None
+
+        if mapped is None:
+            with pdfplumber.open(file_path) as pdf:
+                yield pdf
+            return
+
+        try:
+            with pdfplumber.open(mapped) as pdf:
+                yield pdf
+        finally:
+            mapped.close()
+
+def _extract_page_range(
+    file_path: str,
+    start: int,
+    end: int,
+    cache_dir: Optional[str] = None
+) -> List[Tuple[int, str, str, str]]:
+    """
+    Extract text from pages [start, end) of a PDF.
+    Runs inside a worker process, so it opens its own handle on the file.
+    Returns (page_number, page_hash, text, source) tuples, where source is
+    "cache" or the name of the extractor tier that produced the text.
+    """
+    cache = ExtractionCache(cache_dir) if cache_dir else None
+    results = []
+    # Digests of resources shared between the pages of the range
+    memo = {}
+    with _open_pdf(file_path) as pdf:
+        with build_extractor_chain(file_path, pdf=pdf) as chain:
+            for page_number in range(start, end):
+                page_hash = page_content_hash(pdf.pages[page_number], settings.PDF_EXTRACTOR_TIERS, memo)
+                text = cache.get_page(page_hash) if cache else None
+                source = "cache"
+                if text is None:
+                    text, source = chain.extract_page(page_number)
+                    if cache:
+                        cache.put_page(page_hash, text)
+                results.append((page_number, page_hash, text, source))
+    return results
+
 class PDFProcessor:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        pages_per_task: Optional[int] = None,
+        cache_dir: Optional[str] = None
+    ):
         self.current_file: Optional[Path] = None
-        
-    async def process_pdf(self, file_path: str) -> str:
+        self.max_workers = max_workers or settings.PDF_EXTRACTION_WORKERS or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task or settings.PDF_PAGES_PER_TASK
+        self.cache: Optional[ExtractionCache] = None
+        if settings.EXTRACTION_CACHE_ENABLED:
+            self.cache = ExtractionCache(cache_dir or settings.EXTRACTION_CACHE_DIR)
+        self.page_count: Optional[int] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.tier_counts: Dict[str, int] = {}
+
+    async def process_pdf(self, file_path: str, parallel: bool = False) -> str:
         """
         Process PDF file and return extracted text content.
         Returns a single string with all content.
         """
+        if parallel:
+            return await self.process_pdf_parallel(file_path)
+
         try:
             logger.info(f"Opening PDF: {file_path}")
             text_content = []
-            
+
             with pdfplumber.open(file_path) as pdf:
                 for page in pdf.pages:
                     text = page.extract_text()
                     if text:
                         text_content.append(text)
-            
+
             # Join all pages with newlines
             full_text = "\n".join(text_content)
             logger.info(f"Successfully extracted {len(text_content)} pages of text")
-            
+
             return full_text
-            
+
         except Exception as e:
             logger.error(f"Error processing PDF: {str(e)}")
-            raise Exception(f"PDF processing failed: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"PDF processing failed: {str(e)}")
+
+    async def process_pdf_parallel(self, file_path: str) -> str:
+        """
+        Extract text by fanning page ranges out to a process pool.
+        Pages are reassembled in page order; the event loop stays free while workers run.
+        """
+        try:
+            text_content = [text async for _, text in self.iter_pages(file_path) if text]
+
+            full_text = "\n".join(text_content)
+            logger.info(f"Successfully extracted {len(text_content)} pages of text")
+
+            return full_text
+
+        except Exception as e:
+            logger.error(f"Error processing PDF: {str(e)}")
+            raise Exception(f"PDF processing failed: {str(e)}")
+
+    async def iter_pages(
+        self,
+        file_path: str,
+        file_hash: Optional[str] = None,
+        start_page: int = 0
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Yield (page_number, text) tuples in page order as extraction progresses,
+        beginning at ``start_page`` when resuming an interrupted job.
+
+        Page ranges are extracted in the process pool with a bounded number of
+        ranges in flight, so memory stays proportional to the window rather than
+        the document. ``self.page_count`` is set before the first page is yielded,
+        and ``self.cache_hits``/``self.cache_misses`` are updated as pages arrive.
+        """
+        logger.info(f"Opening PDF for parallel extraction: {file_path}")
+        loop = asyncio.get_running_loop()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.tier_counts = {}
+
+        # An identical re-upload is served straight from the cache without opening the PDF
+        if self.cache:
+            if file_hash is None:
+                file_hash = await loop.run_in_executor(None, sha256_file, file_path)
+            manifest = self.cache.get_manifest(manifest_key(file_hash, settings.PDF_EXTRACTOR_TIERS))
+            if manifest is not None and self.cache.has_pages(manifest):
+                logger.info(f"Serving all {len(manifest)} pages from extraction cache")
+                self.page_count = len(manifest)
+                for page_number, page_hash in enumerate(manifest[start_page:], start=start_page):
+                    text = self.cache.get_page(page_hash)
+                    if text is None:
+                        raise Exception(f"Extraction cache entry {page_hash} disappeared")
+                    self.cache_hits += 1
+                    yield page_number, text
+                return
+
+        self.page_count = await loop.run_in_executor(None, self._count_pages, file_path)
+        cache_dir = str(self.cache.cache_dir) if self.cache else None
+
+        ranges = iter([
+            (start, min(start + self.pages_per_task, self.page_count))
+            for start in range(start_page, self.page_count, self.pages_per_task)
+        ])
+
+        # A single range is not worth the inter-process round trip
+        if self.page_count - start_page <= self.pages_per_task:
+            executor = None
+        else:
+            executor = _get_executor(self.max_workers)
+
+        def submit(page_range: Tuple[int, int]) -> "asyncio.Future":
+            return loop.run_in_executor(executor, _extract_page_range, file_path, *page_range, cache_dir)
+
+        page_hashes = []
+        in_flight = deque(submit(page_range) for page_range in islice(ranges, self.max_workers * 2))
+        try:
+            while in_flight:
+                chunk = await in_flight.popleft()
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    in_flight.append(submit(next_range))
+                for page_number, page_hash, text, source in chunk:
+                    page_hashes.append(page_hash)
+                    if source == "cache":
+                        self.cache_hits += 1
+                    else:
+                        self.cache_misses += 1
+                        self.tier_counts[source] = self.tier_counts.get(source, 0) + 1
+                    yield page_number, text
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+        # A manifest is only complete when every page was seen
+        if self.cache and start_page == 0:
+            self.cache.put_manifest(manifest_key(file_hash, settings.PDF_EXTRACTOR_TIERS), page_hashes)
+        logger.info(
+            f"Extraction cache: {self.cache_hits} hits, {self.cache_misses} misses; "
+            f"extractor tiers used: {self.tier_counts}"
+        )
+
+    @staticmethod
+    def _count_pages(file_path: str) -> int:
+        with _open_pdf(file_path) as pdf:
+            return len(pdf.pages)
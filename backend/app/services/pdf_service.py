@@ -1,7 +1,7 @@
-from pdfplumber import open as pdf_open
 from typing import Dict, Any
 import uuid
 from pathlib import Path
+from .text_extractors import build_extractor_chain
 
 class PDFService:
     def __init__(self):
@@ -18,10 +18,11 @@ class PDFService:
         }
 
         try:
-            with pdf_open(file_path) as pdf:
-                text_content = ""
-                for page in pdf.pages:
-                    text_content += page.extract_text() or ""
+            with build_extractor_chain(str(file_path)) as chain:
+                text_content = "".join(
+                    chain.extract_page(page_number)[0]
+                    for page_number in range(chain.page_count)
+                )
                 
                 self._tasks[task_id].update({
                     "status": "completed",
@@ -1,11 +1,14 @@
 """
 Service for managing processing status.
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+from .validation_diagnostics import ValidationDiagnostics
+from ..core.config import settings
 
 class StatusManager:
     _instances: Dict[int, 'ProcessingStatus'] = {}
+    _batches: Dict[int, 'BatchStatus'] = {}
     
     @classmethod
     def create(cls) -> 'ProcessingStatus':
@@ -23,6 +26,22 @@ class StatusManager:
         }
         return cls._instances.get(status_id)
     
+    @classmethod
+    def create_batch(cls, filenames: List[str]) -> 'BatchStatus':
+        files = [(filename, cls.create()) for filename in filenames]
+        batch = BatchStatus(files)
+        cls._batches[id(batch)] = batch
+        return batch
+    
+    @classmethod
+    def get_batch(cls, batch_id: int) -> Optional['BatchStatus']:
+        current_time = datetime.utcnow()
+        cls._batches = {
+            k: v for k, v in cls._batches.items()
+            if current_time - v.created_at < timedelta(hours=1)
+        }
+        return cls._batches.get(batch_id)
+    
     @classmethod
     def remove(cls, status_id: int) -> None:
         if status_id in cls._instances:
@@ -34,4 +53,39 @@ class ProcessingStatus:
         self.progress = 0
         self.errors = []
         self.success_count = 0
-        self.created_at = datetime.utcnow() 
\ No newline at end of file
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.inserted_count = 0
+        self.updated_count = 0
+        self.skipped_count = 0
+        self.embedded_count = 0
+        self.deleted_count = 0
+        self.validation = ValidationDiagnostics(settings.VALIDATION_SAMPLE_SIZE)
+        self.created_at = datetime.utcnow()
+
+class BatchStatus:
+    """Aggregated status over the per-file statuses of a batch upload."""
+    def __init__(self, files: List[Tuple[str, ProcessingStatus]]):
+        self.files = files
+        self.created_at = datetime.utcnow()
+    
+    @property
+    def status(self) -> str:
+        states = {status.status for _, status in self.files}
+        if "processing" in states:
+            return "processing"
+        if states == {"completed"}:
+            return "completed"
+        if "completed" in states:
+            return "partially_failed"
+        return "failed"
+    
+    @property
+    def progress(self) -> int:
+        if not self.files:
+            return 100
+        return sum(status.progress for _, status in self.files) // len(self.files)
+    
+    @property
+    def success_count(self) -> int:
+        return sum(status.success_count for _, status in self.files)
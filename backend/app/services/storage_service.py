@@ -1,150 +1,538 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Set
+import json
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 import psycopg2
-from psycopg2.extras import execute_values
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool
+from ..core.config import settings
+from ..db.embeddings import (
+    candidate_count,
+    convert_embedding_column,
+    embedding_sql_type,
+    exact_distance_sql,
+    index_distance_sql,
+    is_quantized,
+    stored_embedding_type,
+)
+from ..db.partitions import (
+    copy_into_partitions,
+    detach_unpartitioned,
+    ensure_year_partitions_sync,
+    is_unpartitioned,
+    partition_name,
+)
+from ..db.vector_index import VectorIndexManager, ensure_state_table, search_settings_sync
 from ..models.journal import JournalEntry
 from ..models.database import VectorEntry, StorageMetrics
+from ..utils.hashing import entry_content_hash
 
 logger = logging.getLogger(__name__)
 
+def _similar_sql(in_year: bool) -> str:
+    """
+    Nearest entries by cosine distance. The inner ORDER BY ... LIMIT is what lets
+    each partition's similarity index serve the search; on a quantized index it picks
+    candidates, which are then reranked by exact distance.
+    """
+    year_filter = "WHERE year = $3" if in_year else ""
+    distance = exact_distance_sql("embedding", "$1")
+    limit = "$2"
+    if is_quantized():
+        limit = f"$2 * {candidate_count(1)}"
+    return f"""
+        SELECT e.id, e.date, e.content, v.distance
+        FROM (
+            SELECT entry_id, year, {distance} AS distance
+            FROM entry_vectors
+            {year_filter}
+            ORDER BY {index_distance_sql("embedding", "$1")}
+            LIMIT {limit}
+        ) AS v
+        JOIN journal_entries AS e ON e.id = v.entry_id AND e.year = v.year
+        {"WHERE e.year = $3" if in_year else ""}
+        ORDER BY v.distance
+        LIMIT $2
+    """
+
+def _live_rows_sql(table: str) -> str:
+    return f"""
+        SELECT COALESCE(sum(s.n_live_tup), 0)::bigint
+        FROM pg_partition_tree('{table}') AS t JOIN pg_stat_user_tables AS s ON s.relid = t.relid
+    """
+
+_DECLARED_DIMS_SQL = """
+    SELECT NULLIF(atttypmod, -1) FROM pg_attribute
+    WHERE attrelid = 'entry_vectors'::regclass AND attname = 'embedding'
+"""
+
+_TABLE_BYTES_SQL = """
+    SELECT COALESCE(sum(pg_table_size(relid)), 0)::bigint FROM (
+        SELECT relid FROM pg_partition_tree('journal_entries')
+        UNION ALL
+        SELECT relid FROM pg_partition_tree('entry_vectors')
+    ) AS t
+"""
+
+# Statements prepared on each pooled connection the first time it runs them.
+# Entries and vectors are passed as arrays and unnested, so one prepared
+# insert serves batches of any size.
+PREPARED_STATEMENTS = {
+    # Upsert on (date, content_hash, year): identical entries are skipped, entries
+    # whose other columns changed are updated; only those two kinds are returned,
+    # told apart by updated_at as xmax cannot be read from a partitioned table
+    "storage_upsert_entries": """
+        INSERT INTO journal_entries (date, content, content_hash, word_count, year, month, day, metadata)
+        SELECT date, content, content_hash, word_count, year, month, day, metadata::jsonb
+        FROM unnest($1::date[], $2::text[], $3::text[], $4::int[], $5::int[], $6::int[], $7::int[], $8::text[])
+            AS t(date, content, content_hash, word_count, year, month, day, metadata)
+        ON CONFLICT (date, content_hash, year) DO UPDATE
+        SET word_count = EXCLUDED.word_count, month = EXCLUDED.month,
+            day = EXCLUDED.day, metadata = EXCLUDED.metadata, updated_at = now()
+        WHERE (journal_entries.word_count, journal_entries.month,
+               journal_entries.day, journal_entries.metadata)
+            IS DISTINCT FROM (EXCLUDED.word_count, EXCLUDED.month,
+                              EXCLUDED.day, EXCLUDED.metadata)
+        RETURNING id, date, content_hash, year, updated_at IS NULL AS inserted
+    """,
+    "storage_delete_vectors": """
+        DELETE FROM entry_vectors AS v
+        USING unnest($1::bigint[], $2::int[]) AS t(entry_id, year)
+        WHERE v.entry_id = t.entry_id AND v.year = t.year
+    """,
+    "storage_insert_vectors": f"""
+        INSERT INTO entry_vectors (entry_id, year, embedding)
+        SELECT entry_id, year, embedding::{embedding_sql_type()}
+        FROM unnest($1::bigint[], $2::int[], $3::text[]) AS t(entry_id, year, embedding)
+    """,
+    "storage_similar": _similar_sql(in_year=False),
+    # Same search restricted to one year: only that year's partitions are scanned
+    "storage_similar_in_year": _similar_sql(in_year=True),
+    # Monitoring reads only the catalog and statistics: row counts are the live
+    # tuple counters PostgreSQL maintains per partition, dimensions come from
+    # the column type. Partitioned parents have no storage of their own, so
+    # sizes are summed over partitions.
+    "storage_metrics": f"""
+        SELECT
+            ({_live_rows_sql("journal_entries")}) AS total_entries,
+            ({_live_rows_sql("entry_vectors")}) AS total_vectors,
+            ({_DECLARED_DIMS_SQL}) AS dims,
+            ({_TABLE_BYTES_SQL}) AS table_bytes
+    """,
+    # Exact counts and dimensions, scanning both tables
+    "storage_metrics_exact": f"""
+        SELECT
+            (SELECT COUNT(*) FROM journal_entries) AS total_entries,
+            (SELECT COUNT(*) FROM entry_vectors) AS total_vectors,
+            (SELECT AVG(vector_dims(embedding)) FROM entry_vectors) AS dims,
+            ({_TABLE_BYTES_SQL}) AS table_bytes
+    """,
+    # Size of each index; an index on a partitioned table is the sum of its
+    # partitions' indexes, and per-partition similarity indexes stand alone
+    "storage_index_sizes": """
+        SELECT c.relname,
+               COALESCE((SELECT sum(pg_relation_size(p.relid)) FROM pg_partition_tree(c.oid) AS p),
+                        pg_relation_size(c.oid)) AS bytes
+        FROM pg_index AS i
+        JOIN pg_class AS c ON c.oid = i.indexrelid
+        WHERE NOT c.relispartition AND i.indrelid IN (
+            SELECT relid FROM pg_partition_tree('journal_entries')
+            UNION ALL
+            SELECT relid FROM pg_partition_tree('entry_vectors')
+        )
+        ORDER BY bytes DESC, c.relname
+    """,
+}
+
+# Both tables are partitioned by year, with partitions created on demand
+PARTITIONED_TABLES = ("journal_entries", "entry_vectors")
+
+# Built on the whole of entry_vectors before indexes were managed per partition
+LEGACY_VECTOR_INDEXES = ("idx_vector_hnsw",)
+
+def _pretty_size(size: int) -> str:
+    """Bytes as pg_size_pretty formats them, e.g. ``12 MB``."""
+    for unit in ("bytes", "kB", "MB", "GB", "TB"):
+        if abs(size) < 10 * 1024 or unit == "TB":
+            return f"{round(size)} {unit}"
+        size /= 1024
+
+class _PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which statements it has prepared."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: Set[str] = set()
+
+# One pool per database URL, shared by every StorageService in the process
+_pools: Dict[str, ThreadedConnectionPool] = {}
+_schema_ready: Set[str] = set()
+_pool_lock = threading.Lock()
+
+def _get_pool(db_url: str) -> ThreadedConnectionPool:
+    with _pool_lock:
+        pool = _pools.get(db_url)
+        if pool is None:
+            pool = ThreadedConnectionPool(
+                settings.STORAGE_POOL_MIN_SIZE,
+                settings.STORAGE_POOL_MAX_SIZE,
+                db_url,
+                connection_factory=_PooledConnection
+            )
+            _pools[db_url] = pool
+            logger.info(
+                f"Opened storage connection pool "
+                f"({settings.STORAGE_POOL_MIN_SIZE}-{settings.STORAGE_POOL_MAX_SIZE} connections)"
+            )
+        return pool
+
+def close_storage_pools():
+    """Close every storage connection pool. Called on application shutdown."""
+    with _pool_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+        _schema_ready.clear()
+
 class StorageService:
     def __init__(self, db_url: str):
         self.db_url = db_url
-        self._init_db()
-    
+        self.pool = _get_pool(db_url)
+        # DDL runs once per process and database, not per instance
+        with _pool_lock:
+            if db_url not in _schema_ready:
+                self._init_db()
+                _schema_ready.add(db_url)
+
+    @contextmanager
+    def _connection(self, autocommit: bool = False) -> Iterator[_PooledConnection]:
+        """Borrow a pooled connection, rolling back and returning it afterwards."""
+        conn = self.pool.getconn()
+        conn.autocommit = autocommit
+        broken = False
+        try:
+            yield conn
+        finally:
+            try:
+                # Discard anything left uncommitted so the next borrower starts clean
+                if not conn.autocommit:
+                    conn.rollback()
+                conn.autocommit = False
+            except psycopg2.Error:
+                broken = True
+            self.pool.putconn(conn, close=broken or bool(conn.closed))
+
+    @staticmethod
+    def _execute_prepared(cur, name: str, params: tuple = ()):
+        """Run a statement from PREPARED_STATEMENTS, preparing it on first use per connection."""
+        conn = cur.connection
+        if name not in conn.prepared:
+            cur.execute(f"PREPARE {name} AS {PREPARED_STATEMENTS[name]}")
+            conn.prepared.add(name)
+        placeholders = ", ".join(["%s"] * len(params))
+        cur.execute(f"EXECUTE {name}" + (f" ({placeholders})" if params else ""), params)
+
     def _init_db(self):
-        """Initialize database tables and extensions"""
-        with psycopg2.connect(self.db_url) as conn:
+        """
+        Create the tables and indexes if they do not exist yet. Nothing is
+        converted or dropped here; outdated tables are left to migrate_schema().
+        """
+        with self._connection() as conn:
             with conn.cursor() as cur:
-                # Enable vector extension
-                cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
-                
-                # Create journal entries table
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS journal_entries (
-                        id BIGSERIAL PRIMARY KEY,
-                        date DATE NOT NULL,
-                        content TEXT NOT NULL,
-                        word_count INTEGER NOT NULL,
-                        year INTEGER NOT NULL,
-                        month INTEGER NOT NULL,
-                        day INTEGER NOT NULL,
-                        metadata JSONB DEFAULT '{}'::jsonb,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                run = self._runner(cur)
+                self._check_own_database(run)
+
+                outdated = [table for table in PARTITIONED_TABLES if is_unpartitioned(run, table)]
+                if outdated:
+                    logger.warning(
+                        f"{', '.join(outdated)} predate partitioning; "
+                        f"run scripts/migrate_storage.py before storing entries"
                     )
-                """)
-                
-                # Create vectors table with pgvector
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS entry_vectors (
-                        id BIGSERIAL PRIMARY KEY,
-                        entry_id BIGINT REFERENCES journal_entries(id) ON DELETE CASCADE,
-                        embedding vector(1536),
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    return
+
+                self._create_tables(cur)
+                stored = stored_embedding_type(run, "entry_vectors")
+                if stored != embedding_sql_type():
+                    logger.warning(
+                        f"entry_vectors.embedding is {stored} but settings call for "
+                        f"{embedding_sql_type()}; run scripts/migrate_storage.py"
                     )
-                """)
-                
-                # Create indexes
-                cur.execute("CREATE INDEX IF NOT EXISTS idx_entries_date ON journal_entries(date)")
-                cur.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_vector_hnsw ON entry_vectors 
-                    USING hnsw (embedding vector_cosine_ops)
-                    WITH (m = 16, ef_construction = 64)
-                """)
-                
                 conn.commit()
-    
+
+    def migrate_schema(self) -> Dict[str, Any]:
+        """
+        Bring tables of older versions in line, which may delete data: tables
+        from before partitioning are deduplicated and copied into partitioned
+        ones, and vectors of other dimensions are deleted as the embedding
+        column is converted to the current settings. Never run on startup.
+        """
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                run = self._runner(cur)
+                self._check_own_database(run)
+
+                # Tables from before partitioning are moved aside and copied over below
+                legacy_entries = legacy_vectors = None
+                if is_unpartitioned(run, "journal_entries"):
+                    legacy_entries = detach_unpartitioned(run, "journal_entries")
+                    self._deduplicate(cur, legacy_entries)
+                if is_unpartitioned(run, "entry_vectors"):
+                    legacy_vectors = detach_unpartitioned(run, "entry_vectors")
+
+                self._create_tables(cur)
+                # Vectors of other dimensions or precision are converted or
+                # dropped; optimize_storage builds the similarity indexes again
+                converted = convert_embedding_column(run, "entry_vectors", delete_mismatched=True)
+
+                moved = 0
+                if legacy_entries:
+                    moved = self._migrate_unpartitioned(cur, legacy_entries, legacy_vectors)
+
+                conn.commit()
+        return {"partitioned_entries": moved, "converted_embeddings": converted}
+
+    @staticmethod
+    def _check_own_database(run):
+        """The app's database belongs to its Alembic migrations (see db.init_db), and its tables differ."""
+        if run("SELECT to_regclass('alembic_version') IS NOT NULL")[0][0]:
+            raise RuntimeError(
+                "The database schema is managed by Alembic migrations; "
+                "StorageService needs a database of its own"
+            )
+
+    @staticmethod
+    def _create_tables(cur):
+        # Enable vector extension
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+        # Create journal entries table
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS journal_entries (
+                id BIGSERIAL,
+                date DATE NOT NULL,
+                content TEXT NOT NULL,
+                content_hash VARCHAR(64),
+                word_count INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                month INTEGER NOT NULL,
+                day INTEGER NOT NULL,
+                metadata JSONB DEFAULT '{}'::jsonb,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP WITH TIME ZONE,
+                PRIMARY KEY (id, year)
+            ) PARTITION BY RANGE (year)
+        """)
+
+        # Create vectors table with pgvector, partitioned like its entries
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS entry_vectors (
+                id BIGSERIAL,
+                entry_id BIGINT NOT NULL,
+                year INTEGER NOT NULL,
+                embedding {embedding_sql_type()},
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id, year),
+                FOREIGN KEY (entry_id, year) REFERENCES journal_entries(id, year) ON DELETE CASCADE
+            ) PARTITION BY RANGE (year)
+        """)
+
+        # Create indexes; each is built per partition
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_entries_date ON journal_entries(date)")
+        cur.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_date_hash
+            ON journal_entries(date, content_hash, year)
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_vectors_entry ON entry_vectors(entry_id, year)")
+        ensure_state_table(StorageService._runner(cur))
+
+    @staticmethod
+    def _runner(cur):
+        """Adapt a cursor to the run(sql) -> rows callable used by db.partitions."""
+        def run(sql):
+            cur.execute(sql)
+            return cur.fetchall() if cur.description else []
+        return run
+
+    @staticmethod
+    def _deduplicate(cur, table: str):
+        """Hash rows stored before deduplication and drop duplicates, keeping the oldest."""
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)")
+        cur.execute(f"""
+            UPDATE {table}
+            SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')
+            WHERE content_hash IS NULL
+        """)
+        cur.execute(f"""
+            DELETE FROM {table} AS duplicate
+            USING {table} AS original
+            WHERE duplicate.date = original.date
+              AND duplicate.content_hash = original.content_hash
+              AND duplicate.id > original.id
+        """)
+        if cur.rowcount:
+            logger.info(f"Removed {cur.rowcount} duplicate journal entries")
+
+    def _migrate_unpartitioned(self, cur, legacy_entries: str, legacy_vectors: Optional[str]) -> int:
+        """
+        Copy rows of the pre-partitioning tables into the partitioned ones and
+        drop them. Returns the number of entries copied.
+        """
+        run = self._runner(cur)
+        copied = copy_into_partitions(
+            run, self.db_url, legacy_entries, "journal_entries",
+            ["id", "date", "content", "content_hash", "word_count", "year", "month", "day", "metadata", "created_at"]
+        )
+        if legacy_vectors:
+            years = [year for (year,) in run("SELECT DISTINCT year FROM journal_entries")]
+            ensure_year_partitions_sync(run, self.db_url, ["entry_vectors"], years)
+            cur.execute(f"""
+                INSERT INTO entry_vectors (id, entry_id, year, embedding, created_at)
+                SELECT v.id, v.entry_id, e.year, v.embedding::{embedding_sql_type()}, v.created_at
+                FROM {legacy_vectors} AS v JOIN journal_entries AS e ON e.id = v.entry_id
+                WHERE vector_dims(v.embedding) = {settings.EMBEDDING_DIMENSIONS}
+            """)
+            cur.execute("""
+                SELECT setval(pg_get_serial_sequence('entry_vectors', 'id'),
+                              COALESCE((SELECT max(id) FROM entry_vectors), 0) + 1, false)
+            """)
+            cur.execute(f"DROP TABLE {legacy_vectors}")
+        cur.execute(f"DROP TABLE {legacy_entries}")
+        logger.info(f"Moved {copied} journal entries into yearly partitions")
+        return copied
+
     def store_entries(self, entries: List[JournalEntry]) -> Dict[str, Any]:
-        """Store journal entries and their vector embeddings"""
+        """
+        Store journal entries and their vector embeddings.
+        Entries already stored with the same date and content are skipped, or
+        updated if their other fields changed; the counts of each are returned.
+        """
         try:
-            with psycopg2.connect(self.db_url) as conn:
+            # One statement cannot upsert the same row twice, so keep the first of each key
+            unique = {}
+            for e in entries:
+                unique.setdefault((e.date.date(), entry_content_hash(e.content)), e)
+
+            with self._connection() as conn:
                 with conn.cursor() as cur:
-                    # Store journal entries
-                    entry_data = [(
-                        e.date.date(),
-                        e.content,
-                        e.word_count,
-                        e.year,
-                        e.month,
-                        e.day,
-                        e.metadata
-                    ) for e in entries]
-                    
-                    query = """
-                        INSERT INTO journal_entries 
-                        (date, content, word_count, year, month, day, metadata)
-                        VALUES %s
-                        RETURNING id
-                    """
-                    
-                    entry_ids = execute_values(
-                        cur, 
-                        query, 
-                        entry_data,
-                        fetch=True
+                    # Partitions for new years are committed before any rows go in
+                    ensure_year_partitions_sync(
+                        self._runner(cur), self.db_url, PARTITIONED_TABLES, {e.year for e in entries}
                     )
-                    
-                    # Store vector embeddings if present
-                    vector_data = []
-                    for entry_id, entry in zip(entry_ids, entries):
+                    conn.commit()
+
+                    # Upsert journal entries, one array per column
+                    keys = list(unique)
+                    batch = list(unique.values())
+                    self._execute_prepared(cur, "storage_upsert_entries", (
+                        [entry_date for entry_date, _ in keys],
+                        [e.content for e in batch],
+                        [content_hash for _, content_hash in keys],
+                        [e.word_count for e in batch],
+                        [e.year for e in batch],
+                        [e.month for e in batch],
+                        [e.day for e in batch],
+                        [json.dumps(e.metadata, default=str) for e in batch],
+                    ))
+                    written = cur.fetchall()
+                    inserted = sum(1 for row in written if row[4])
+
+                    # Store vector embeddings if present, replacing those of updated entries
+                    vector_ids = []
+                    vector_years = []
+                    vectors = []
+                    for entry_id, entry_date, content_hash, year, _ in written:
+                        entry = unique[(entry_date, content_hash)]
                         if 'embedding' in entry.metadata:
-                            vector_data.append((
-                                entry_id[0],
-                                entry.metadata['embedding']
-                            ))
-                    
-                    if vector_data:
-                        vector_query = """
-                            INSERT INTO entry_vectors (entry_id, embedding)
-                            VALUES %s
-                        """
-                        execute_values(cur, vector_query, vector_data)
-                    
+                            vector_ids.append(entry_id)
+                            vector_years.append(year)
+                            vectors.append("[" + ",".join(map(str, entry.metadata['embedding'])) + "]")
+
+                    updated = [(row[0], row[3]) for row in written if not row[4]]
+                    if updated:
+                        self._execute_prepared(cur, "storage_delete_vectors", (
+                            [entry_id for entry_id, _ in updated],
+                            [year for _, year in updated],
+                        ))
+                    if vectors:
+                        self._execute_prepared(cur, "storage_insert_vectors", (vector_ids, vector_years, vectors))
+
                     conn.commit()
-                    
+
                     return {
-                        "stored_entries": len(entries),
-                        "stored_vectors": len(vector_data)
+                        "stored_entries": len(written),
+                        "stored_vectors": len(vectors),
+                        "inserted": inserted,
+                        "updated": len(written) - inserted,
+                        "skipped": len(entries) - len(written)
                     }
-                    
+
         except Exception as e:
             logger.error(f"Error storing entries: {str(e)}", exc_info=True)
             raise
-    
-    def get_storage_metrics(self) -> StorageMetrics:
-        """Get storage metrics"""
-        with psycopg2.connect(self.db_url) as conn:
+
+    def find_similar(self, embedding: List[float], limit: int = 5, year: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find the entries whose vectors are nearest to ``embedding``.
+        With ``year`` only that year's partitions and similarity index are searched.
+        """
+        vector = "[" + ",".join(map(str, embedding)) + "]"
+        fetched = candidate_count(limit) if is_quantized() else limit
+        partition = partition_name("entry_vectors", year) if year is not None else None
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                # ef_search / probes calibrated for the searched partitions
+                run = self._runner(cur)
+                for statement in search_settings_sync(run, self.db_url, "entry_vectors", fetched, partition):
+                    cur.execute(statement)
+                if year is None:
+                    self._execute_prepared(cur, "storage_similar", (vector, limit))
+                else:
+                    self._execute_prepared(cur, "storage_similar_in_year", (vector, limit, year))
+                return [
+                    {"entry_id": entry_id, "date": entry_date, "content": content, "distance": distance}
+                    for entry_id, entry_date, content, distance in cur.fetchall()
+                ]
+
+    def get_storage_metrics(self, exact: bool = False) -> StorageMetrics:
+        """
+        Get storage metrics from catalog statistics, without scanning any table.
+        Counts are PostgreSQL's live row estimates, which trail writes by at
+        most a second or so; ``exact`` counts the rows and measures the vectors.
+        """
+        with self._connection() as conn:
             with conn.cursor() as cur:
-                # Get table sizes
-                cur.execute("""
-                    SELECT 
-                        pg_size_pretty(pg_total_relation_size('journal_entries')) as entries_size,
-                        pg_size_pretty(pg_total_relation_size('entry_vectors')) as vectors_size,
-                        (SELECT COUNT(*) FROM journal_entries) as total_entries,
-                        (SELECT COUNT(*) FROM entry_vectors) as total_vectors,
-                        (SELECT AVG(vector_dims(embedding)) FROM entry_vectors) as avg_dims
-                """)
-                
-                result = cur.fetchone()
-                
+                self._execute_prepared(cur, "storage_metrics_exact" if exact else "storage_metrics")
+                total_entries, total_vectors, dims, table_bytes = cur.fetchone()
+
+                self._execute_prepared(cur, "storage_index_sizes")
+                index_bytes = cur.fetchall()
+
                 return StorageMetrics(
-                    total_entries=result[2],
-                    total_vectors=result[3],
-                    avg_vector_size=result[4] or 0,
-                    storage_size=result[0],
-                    index_size=result[1]
+                    total_entries=total_entries,
+                    total_vectors=total_vectors,
+                    avg_vector_size=dims or 0,
+                    storage_size=_pretty_size(table_bytes),
+                    index_size=_pretty_size(sum(size for _, size in index_bytes)),
+                    index_sizes={name: _pretty_size(size) for name, size in index_bytes},
+                    exact=exact
                 )
-    
-    def optimize_storage(self):
-        """Optimize database storage"""
-        with psycopg2.connect(self.db_url) as conn:
+
+    def optimize_storage(self) -> List[Dict[str, Any]]:
+        """
+        Vacuum the tables and bring the similarity indexes in line with the
+        size of each partition; see db.vector_index. Returns what was done
+        per partition.
+        """
+        # VACUUM and CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with self._connection(autocommit=True) as conn:
             with conn.cursor() as cur:
                 # Vacuum analyze tables
                 cur.execute("VACUUM ANALYZE journal_entries")
                 cur.execute("VACUUM ANALYZE entry_vectors")
-                
-                # Reindex to optimize HNSW index
-                cur.execute("REINDEX INDEX CONCURRENTLY idx_vector_hnsw")
-                
-                conn.commit() 
\ No newline at end of file
+
+                # Indexes are only rebuilt when their partition outgrew them
+                manager = VectorIndexManager(
+                    self._runner(cur), "entry_vectors", legacy_indexes=LEGACY_VECTOR_INDEXES
+                )
+                return manager.maintain()
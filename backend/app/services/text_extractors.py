@@ -0,0 +1,201 @@
+"""
+Pluggable page text extractors with a quality-checked fallback chain.
+
+Most journal pages are plain single-column text that a cheap extractor handles
+correctly, so the chain tries the fast tier first and only falls back to
+pdfplumber's layout analysis for pages that fail the quality heuristic.
+"""
+import re
+import pdfplumber
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+import logging
+from ..core.config import settings
+from .entry_parser import ENTRY_HEADER
+
+logger = logging.getLogger(__name__)
+
+# Share of characters that may be control/replacement/private-use glyphs
+MAX_GARBAGE_RATIO = 0.02
+# Average characters per whitespace-separated token before we assume lost spacing
+MAX_AVG_TOKEN_LENGTH = 25
+
+_GARBAGE_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffd\ue000-\uf8ff]')
+_DATE_LIKE_LINE = re.compile(r'^\s*\d{1,2}/\d{1,2}/\d{4}', re.MULTILINE)
+
+def check_page_quality(text: str) -> Optional[str]:
+    """
+    Return a reason the extracted page text looks unreliable, or None if it passes.
+    """
+    if not text.strip():
+        return "no text extracted"
+
+    garbage = len(_GARBAGE_CHARS.findall(text))
+    if garbage / len(text) > MAX_GARBAGE_RATIO:
+        return f"garbage character ratio {garbage / len(text):.3f}"
+
+    # Every line that starts like a date should parse as a full entry header
+    date_like = len(_DATE_LIKE_LINE.findall(text))
+    if date_like:
+        headers = len(ENTRY_HEADER.findall(text))
+        if headers < date_like:
+            return f"date header detection rate {headers}/{date_like}"
+
+    tokens = len(text.split())
+    if tokens and len(text) / tokens > MAX_AVG_TOKEN_LENGTH:
+        return "missing word spacing"
+
+    return None
+
+class TextExtractor:
+    """Base class for a single extraction tier over one open PDF."""
+    name = "base"
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    @property
+    def page_count(self) -> int:
+        raise NotImplementedError
+
+    def extract_page(self, page_number: int) -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "TextExtractor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class PdfiumExtractor(TextExtractor):
+    """Fast tier: pdfium's text layer, no layout analysis."""
+    name = "pdfium"
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        # Optional: only present as a pdfplumber dependency on some installs
+        import pypdfium2 as pdfium
+        self.pdf = pdfium.PdfDocument(file_path)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf)
+
+    def extract_page(self, page_number: int) -> str:
+        page = self.pdf[page_number]
+        textpage = page.get_textpage()
+        try:
+            text = textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    def close(self) -> None:
+        self.pdf.close()
+
+class PlumberExtractor(TextExtractor):
+    """Quality tier: pdfplumber layout analysis."""
+    name = "pdfplumber"
+
+    def __init__(self, file_path: str, pdf: Any = None):
+        super().__init__(file_path)
+        # Reuse an already-open document when the caller has one (e.g. for hashing)
+        self._owns_pdf = pdf is None
+        self.pdf = pdf if pdf is not None else pdfplumber.open(file_path)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.pages)
+
+    def extract_page(self, page_number: int) -> str:
+        page = self.pdf.pages[page_number]
+        text = page.extract_text() or ""
+        page.flush_cache()
+        return text
+
+    def close(self) -> None:
+        if self._owns_pdf:
+            self.pdf.close()
+
+EXTRACTORS: Dict[str, Type[TextExtractor]] = {
+    PdfiumExtractor.name: PdfiumExtractor,
+    PlumberExtractor.name: PlumberExtractor,
+}
+
+class ExtractorChain:
+    """
+    Tries each tier in order and keeps the first output that passes the quality
+    check. The last tier's output is always accepted.
+    """
+
+    def __init__(
+        self,
+        tiers: List[TextExtractor],
+        quality_check: Callable[[str], Optional[str]] = check_page_quality
+    ):
+        if not tiers:
+            raise ValueError("ExtractorChain needs at least one tier")
+        self.tiers = tiers
+        self.quality_check = quality_check
+
+    @property
+    def page_count(self) -> int:
+        return self.tiers[0].page_count
+
+    def extract_page(self, page_number: int) -> Tuple[str, str]:
+        """Return (text, tier_name) for a page."""
+        for tier in self.tiers[:-1]:
+            try:
+                text = tier.extract_page(page_number)
+            except Exception as e:
+                logger.debug(f"{tier.name} failed on page {page_number}: {str(e)}")
+                continue
+            reason = self.quality_check(text)
+            if reason is None:
+                return text, tier.name
+            logger.debug(f"{tier.name} rejected for page {page_number}: {reason}")
+
+        last = self.tiers[-1]
+        return last.extract_page(page_number), last.name
+
+    def close(self) -> None:
+        for tier in self.tiers:
+            tier.close()
+
+    def __enter__(self) -> "ExtractorChain":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def build_extractor_chain(
+    file_path: str,
+    tier_names: Optional[List[str]] = None,
+    pdf: Any = None
+) -> ExtractorChain:
+    """
+    Open the configured tiers over a file. Tiers whose backing library is not
+    installed are skipped; ``pdf`` is an already-open pdfplumber document to share.
+    """
+    tier_names = tier_names or [name.strip() for name in settings.PDF_EXTRACTOR_TIERS.split(",")]
+
+    tiers: List[TextExtractor] = []
+    try:
+        for name in tier_names:
+            if name not in EXTRACTORS:
+                raise ValueError(f"Unknown PDF extractor tier: {name}")
+            try:
+                if name == PlumberExtractor.name:
+                    tiers.append(PlumberExtractor(file_path, pdf=pdf))
+                else:
+                    tiers.append(EXTRACTORS[name](file_path))
+            except ImportError as e:
+                logger.warning(f"Skipping extractor tier {name}: {str(e)}")
+        return ExtractorChain(tiers)
+    except Exception:
+        for tier in tiers:
+            tier.close()
+        raise
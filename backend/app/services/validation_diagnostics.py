@@ -0,0 +1,69 @@
+"""
+Service for aggregating validation failures in constant memory.
+"""
+from collections import Counter, deque
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+# Sample failures kept per collector unless configured otherwise
+DEFAULT_MAX_SAMPLES = 20
+
+class ValidationDiagnostics:
+    """
+    Counts validation outcomes per rule and per source file, and keeps only
+    the most recent ``max_samples`` failures as examples. Memory use does not
+    grow with the number of entries validated, so a collector can live for the
+    whole of a long-running job.
+    """
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self.checked = 0
+        self.failed = 0
+        self.rule_counts: Counter = Counter()
+        self.source_counts: Counter = Counter()
+        self.samples: deque = deque(maxlen=max_samples)
+
+    def record_checked(self, count: int) -> None:
+        """Count entries that went through validation, valid or not."""
+        self.checked += count
+
+    def record_failure(
+        self,
+        rules: List[str],
+        source_file: Optional[str] = None,
+        entry_date: Optional[date] = None,
+        detail: Optional[str] = None
+    ) -> None:
+        """Count one failed entry under each rule it broke."""
+        self.failed += 1
+        self.rule_counts.update(rules)
+        if source_file:
+            self.source_counts[source_file] += 1
+        self.samples.append({
+            "rules": list(rules),
+            "source_file": source_file,
+            "date": entry_date.isoformat() if entry_date else None,
+            "detail": detail,
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+
+    def merge(self, other: "ValidationDiagnostics") -> None:
+        """Fold in the counts and samples of another collector, e.g. from a worker process."""
+        self.checked += other.checked
+        self.failed += other.failed
+        self.rule_counts.update(other.rule_counts)
+        self.source_counts.update(other.source_counts)
+        self.samples.extend(other.samples)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "failed": self.failed,
+            "rules": dict(self.rule_counts),
+            "source_files": dict(self.source_counts),
+            "samples": list(self.samples),
+        }
+
+    def summary(self) -> str:
+        """One-line summary for logging."""
+        rules = ", ".join(f"{rule}={count}" for rule, count in self.rule_counts.most_common())
+        return f"{self.failed} of {self.checked} entries failed validation" + (f" ({rules})" if rules else "")
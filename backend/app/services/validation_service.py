@@ -1,44 +1,31 @@
 from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
-from ..models.validation import JournalEntryValidation
+from ..models.validation import JournalEntryValidation, MAX_AVG_WORD_LENGTH
 from ..models.journal import JournalEntry
-from pydantic import ValidationError
+from .batch_validator import BatchValidator
+from .validation_diagnostics import ValidationDiagnostics
 
 logger = logging.getLogger(__name__)
 
 class ValidationService:
     def __init__(self):
-        self.validation_errors: List[Dict[str, Any]] = []
+        # Bounded: counters plus a ring buffer of recent failures
+        self.diagnostics = ValidationDiagnostics()
+        self.batch_validator = BatchValidator()
     
     def validate_entries(self, entries: List[JournalEntry]) -> List[JournalEntry]:
         """Validate a list of journal entries"""
-        validated_entries = []
+        # Same rules as JournalEntryValidation + _check_entry_consistency,
+        # evaluated column-wise over the whole list
+        result = self.batch_validator.validate(entries)
         
-        for entry in entries:
-            try:
-                # Convert to validation model
-                validated = JournalEntryValidation(
-                    date=entry.date,
-                    content=entry.content,
-                    word_count=entry.word_count,
-                    year=entry.year,
-                    month=entry.month,
-                    day=entry.day,
-                    metadata=entry.metadata
-                )
-                
-                # Additional custom validations
-                if self._check_entry_consistency(validated):
-                    validated_entries.append(entry)
-                else:
-                    self._log_validation_error(entry, "Failed consistency check")
-                    
-            except ValidationError as e:
-                self._log_validation_error(entry, str(e))
-                continue
-            
-        return validated_entries
+        for index, reasons in result.failures():
+            self._log_validation_error(entries[index], reasons)
+        self.diagnostics.record_checked(len(entries))
+        logger.info(f"Validation: {self.diagnostics.summary()}")
+        
+        return [entry for entry, valid in zip(entries, result.mask) if valid]
     
     def _check_entry_consistency(self, entry: JournalEntryValidation) -> bool:
         """Additional consistency checks"""
@@ -47,36 +34,36 @@ class ValidationService:
             if (entry.year != entry.date.year or 
                 entry.month != entry.date.month or 
                 entry.day != entry.date.day):
-                self._log_validation_error(entry, "Date components mismatch")
+                self._log_validation_error(entry, ["date_components_mismatch"])
                 return False
             
             # Check for future dates
             if entry.date > datetime.now():
-                self._log_validation_error(entry, "Future date detected")
+                self._log_validation_error(entry, ["future_date"])
                 return False
             
             # Check for reasonable content length per word
             avg_word_length = len(entry.content) / entry.word_count if entry.word_count > 0 else 0
-            if avg_word_length > 15:  # Suspicious if average word is too long
-                self._log_validation_error(entry, f"Suspicious average word length: {avg_word_length}")
+            if avg_word_length > MAX_AVG_WORD_LENGTH:  # Suspicious if average word is too long
+                self._log_validation_error(entry, ["avg_word_length"], f"Suspicious average word length: {avg_word_length}")
                 return False
             
             return True
             
         except Exception as e:
-            self._log_validation_error(entry, f"Consistency check error: {str(e)}")
+            self._log_validation_error(entry, ["consistency_error"], str(e))
             return False
     
-    def _log_validation_error(self, entry: Any, error: str):
-        """Log validation errors for later analysis"""
-        error_entry = {
-            "date": getattr(entry, "date", None),
-            "error": error,
-            "timestamp": datetime.now().isoformat()
-        }
-        self.validation_errors.append(error_entry)
-        logger.warning(f"Validation error: {error_entry}")
+    def _log_validation_error(self, entry: Any, rules: List[str], detail: Optional[str] = None):
+        """Record validation errors for later analysis"""
+        entry_date = getattr(entry, "date", None)
+        self.diagnostics.record_failure(rules, getattr(entry, "source_file", None), entry_date, detail)
+        logger.debug(f"Validation error for {entry_date}: {', '.join(rules)}")
     
     def get_validation_errors(self) -> List[Dict[str, Any]]:
-        """Return all validation errors"""
-        return self.validation_errors 
\ No newline at end of file
+        """Return the most recent validation errors"""
+        return list(self.diagnostics.samples)
+    
+    def get_validation_summary(self) -> Dict[str, Any]:
+        """Return failure counts per rule and source file, with recent samples"""
+        return self.diagnostics.to_dict() 
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+A local stand-in for the OpenAI embeddings API, for tests and benchmarks.
+
+It answers ``POST /v1/embeddings`` like the real service: deterministic unit
+vectors (the same text always gets the same vector), usage in tokens, float
+or base64 encoding, 400 for oversized requests, and 429 with Retry-After once
+a requests- or tokens-per-minute limit is reached. Point the app at it with
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1:
+
+    python -m app.utils.embedding_stand_in 8100
+"""
+import base64
+import hashlib
+import json
+import math
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Optional, Tuple
+import numpy as np
+
+# Request limits of the real API
+MAX_INPUTS = 2048
+MAX_INPUT_TOKENS = 8192
+
+def count_tokens(text: str) -> int:
+    """Roughly what a BPE tokenizer yields for English prose."""
+    return max(1, math.ceil(len(text) / 4))
+
+def stand_in_vector(text: str, dimensions: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+class EmbeddingStandIn:
+    """
+    Serves the stand-in API on a background thread; use as a context manager.
+
+    ``rpm``/``tpm`` limit requests and tokens per sliding ``window`` seconds
+    (a minute by default, shorter in tests). ``latency`` plus
+    ``latency_per_token`` seconds are slept per request to mimic the service.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        window: float = 60.0,
+        latency: float = 0.0,
+        latency_per_token: float = 0.0
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self.latency = latency
+        self.latency_per_token = latency_per_token
+        self.requests = 0
+        self.rate_limited = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        # (time, tokens) of requests accepted within the window
+        self._accepted: Deque[Tuple[float, int]] = deque()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def start(self) -> "EmbeddingStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "EmbeddingStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _admit(self, tokens: int) -> Optional[float]:
+        """Record an accepted request, or return the seconds until it would fit the limits."""
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            while self._accepted and self._accepted[0][0] <= now - self.window:
+                self._accepted.popleft()
+            used = sum(count for _, count in self._accepted)
+            if (self.rpm and len(self._accepted) >= self.rpm) or (self.tpm and used + tokens > self.tpm):
+                self.rate_limited += 1
+                # Until enough of the window expires for this request to fit
+                freed, requests = 0, len(self._accepted)
+                for accepted_at, count in self._accepted:
+                    freed += count
+                    requests -= 1
+                    if (not self.rpm or requests < self.rpm) and (not self.tpm or used - freed + tokens <= self.tpm):
+                        return accepted_at + self.window - now
+                return self.window
+            self._accepted.append((now, tokens))
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            return None
+
+    def _done(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _error(self, status: int, message: str, code: str, headers: Optional[dict] = None) -> None:
+                self._reply(status, {"error": {"message": message, "type": "invalid_request_error", "code": code}}, headers)
+
+            def do_POST(self):
+                if self.path.rstrip("/") not in ("/v1/embeddings", "/embeddings"):
+                    return self._error(404, f"Unknown path {self.path}", "not_found")
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                inputs = request.get("input")
+                inputs = [inputs] if isinstance(inputs, str) else inputs
+                if not inputs or len(inputs) > MAX_INPUTS:
+                    return self._error(400, f"input must hold 1 to {MAX_INPUTS} texts", "invalid_input")
+                tokens = [count_tokens(text) for text in inputs]
+                if max(tokens) > MAX_INPUT_TOKENS:
+                    return self._error(400, f"An input is longer than {MAX_INPUT_TOKENS} tokens", "context_length_exceeded")
+
+                wait = stand_in._admit(sum(tokens))
+                if wait is not None:
+                    return self._error(
+                        429, "Rate limit reached", "rate_limit_exceeded",
+                        {"retry-after-ms": str(int(wait * 1000) + 1)}
+                    )
+                try:
+                    time.sleep(stand_in.latency + stand_in.latency_per_token * sum(tokens))
+                    dimensions = request.get("dimensions") or 1536
+                    data = []
+                    for index, text in enumerate(inputs):
+                        vector = stand_in_vector(text, dimensions)
+                        if request.get("encoding_format") == "base64":
+                            embedding = base64.b64encode(vector.tobytes()).decode()
+                        else:
+                            embedding = vector.tolist()
+                        data.append({"object": "embedding", "index": index, "embedding": embedding})
+                    self._reply(200, {
+                        "object": "list",
+                        "data": data,
+                        "model": request.get("model"),
+                        "usage": {"prompt_tokens": sum(tokens), "total_tokens": sum(tokens)},
+                    })
+                finally:
+                    stand_in._done()
+
+        return Handler
+
+if __name__ == "__main__":
+    stand_in = EmbeddingStandIn(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8100)
+    print(f"Embeddings stand-in at {stand_in.url}")
+    try:
+        stand_in._server.serve_forever()
+    except KeyboardInterrupt:
+        stand_in.stop()
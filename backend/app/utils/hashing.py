@@ -0,0 +1,80 @@
+"""
+Content hashing helpers used for caching and deduplication.
+"""
+import hashlib
+from typing import Any, Dict, Optional
+from pdfminer.pdftypes import PDFObjRef, PDFStream, stream_value
+
+# Bump when extraction output for identical page content could change
+# (v2: tiered extractors, and page resources in the hash)
+PAGE_HASH_VERSION = b"v2"
+
+def sha256_file(file_path: str, chunk_size: int = 1_048_576) -> str:
+    """Return the hex SHA-256 of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def entry_content_hash(content: str) -> str:
+    """Return the hex SHA-256 of an entry's content, used to detect changed entries."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def _pdf_object_digest(obj: Any, memo: Dict[int, bytes]) -> bytes:
+    """
+    Digest of a resolved PDF object graph: dictionaries, arrays, decoded
+    stream data and scalars. Indirect objects are memoized by object id, so
+    fonts shared by many pages are only hashed once per ``memo``.
+    """
+    if isinstance(obj, PDFObjRef):
+        if obj.objid not in memo:
+            # Placeholder so reference cycles terminate
+            memo[obj.objid] = b"ref:%d" % obj.objid
+            memo[obj.objid] = _pdf_object_digest(obj.resolve(), memo)
+        return memo[obj.objid]
+    digest = hashlib.sha256()
+    if isinstance(obj, PDFStream):
+        digest.update(b"stream")
+        digest.update(_pdf_object_digest(obj.attrs, memo))
+        digest.update(obj.get_data())
+    elif isinstance(obj, dict):
+        digest.update(b"dict")
+        for key in sorted(obj, key=str):
+            # A back reference to the page tree would pull in the whole document
+            if key == "Parent":
+                continue
+            digest.update(str(key).encode())
+            digest.update(_pdf_object_digest(obj[key], memo))
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"list")
+        for item in obj:
+            digest.update(_pdf_object_digest(item, memo))
+    else:
+        digest.update(repr(obj).encode())
+    return digest.digest()
+
+def page_content_hash(page: Any, extractor_tiers: str = "", memo: Optional[Dict[int, bytes]] = None) -> str:
+    """
+    Return the hex SHA-256 of a pdfplumber page's content streams.
+
+    The page geometry and resources (fonts with their ToUnicode maps, form
+    XObjects) are mixed in as well, so a page that renders the same operators
+    onto a different media box or with different font subsets is not treated
+    as identical. So is the extractor tier configuration that produces the
+    text. Pass one ``memo`` for all pages of a document to hash shared
+    resources once.
+    """
+    memo = {} if memo is None else memo
+    digest = hashlib.sha256(PAGE_HASH_VERSION)
+    digest.update(extractor_tiers.encode())
+    digest.update(repr(tuple(page.mediabox)).encode())
+    # Items of a /Contents array are left as unresolved references
+    for stream in page.page_obj.contents:
+        digest.update(stream_value(stream).get_data())
+    digest.update(_pdf_object_digest(page.page_obj.resources, memo))
+    return digest.hexdigest()
+
+def manifest_key(file_hash: str, extractor_tiers: str = "") -> str:
+    """Key of a file's page manifest, tied to the hash version and extractor tiers like its pages."""
+    return hashlib.sha256(PAGE_HASH_VERSION + extractor_tiers.encode() + file_hash.encode()).hexdigest()
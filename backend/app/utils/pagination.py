@@ -0,0 +1,23 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor encodes the sort key of the last row of a page, here
+``(entry_date, id)``; the next page starts strictly after it, so fetching a
+page costs the same however deep into the journal it is.
+"""
+import base64
+from datetime import date
+from typing import Tuple
+
+def encode_cursor(entry_date: date, entry_id: int) -> str:
+    raw = f"{entry_date.isoformat()}|{entry_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """Return the (entry_date, id) of a cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        entry_date, entry_id = raw.split("|")
+        return date.fromisoformat(entry_date), int(entry_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
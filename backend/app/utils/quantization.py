@@ -0,0 +1,96 @@
+"""
+Utilities for compact embedding formats and the recall they keep.
+
+Each format trades bytes per vector against search quality. ``evaluate``
+searches a sample of embeddings in every format and reports recall@k against
+exact float32 search, so the cost of EMBEDDING_STORAGE and
+EMBEDDING_INDEX_QUANTIZATION choices can be measured before switching.
+"""
+from typing import Dict, Tuple
+import numpy as np
+
+# Bytes per vector of each format, excluding per-row overhead
+BYTES_PER_DIMENSION = {
+    "float32": 4.0,
+    "float16": 2.0,
+    "int8": 1.0,
+    "binary": 1 / 8,
+}
+
+def bytes_per_vector(format: str, dimensions: int) -> float:
+    return BYTES_PER_DIMENSION[format] * dimensions
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length, so cosine distance is 1 - dot product."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def to_float16(vectors: np.ndarray) -> np.ndarray:
+    """Half precision, as pgvector's halfvec stores it."""
+    return np.asarray(vectors, dtype=np.float16)
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scalar quantization: each dimension's range over ``vectors`` is split into
+    256 steps. Returns (codes, offset, scale); see dequantize_int8.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    offset = vectors.min(axis=0)
+    scale = (vectors.max(axis=0) - offset) / 255
+    scale[scale == 0] = 1
+    codes = np.clip(np.round((vectors - offset) / scale), 0, 255) - 128
+    return codes.astype(np.int8), offset, scale
+
+def dequantize_int8(codes: np.ndarray, offset: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    return (codes.astype(np.float32) + 128) * scale + offset
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """One bit per dimension, set where the value is positive, as pgvector's binary_quantize."""
+    return np.packbits(np.asarray(vectors) > 0, axis=-1)
+
+def hamming_distances(query_bits: np.ndarray, bits: np.ndarray) -> np.ndarray:
+    return np.unpackbits(np.bitwise_xor(bits, query_bits), axis=-1).sum(axis=-1)
+
+def cosine_distances(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    return 1 - normalize(vectors) @ normalize(query)
+
+def nearest(distances: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` smallest distances, nearest first."""
+    k = min(k, len(distances))
+    candidates = np.argpartition(distances, k - 1)[:k]
+    return candidates[np.argsort(distances[candidates], kind="stable")]
+
+def rerank(query: np.ndarray, vectors: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+    """Reorder ``candidates`` by exact cosine distance and keep the nearest ``k``."""
+    distances = cosine_distances(query, vectors[candidates])
+    return candidates[nearest(distances, k)]
+
+def recall_at_k(exact: np.ndarray, approximate: np.ndarray) -> float:
+    """Share of the exact nearest neighbours that the approximate search found."""
+    if len(exact) == 0:
+        return 1.0
+    return len(set(exact.tolist()) & set(approximate.tolist())) / len(exact)
+
+def evaluate(vectors: np.ndarray, queries: np.ndarray, k: int = 10, rerank_factor: int = 4) -> Dict[str, float]:
+    """
+    Mean recall@k of each format against exact float32 search over ``vectors``.
+    ``binary+rerank`` takes ``k * rerank_factor`` Hamming candidates and reranks
+    them exactly, as searches on a binary index do.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    half = to_float16(vectors).astype(np.float32)
+    codes, offset, scale = quantize_int8(vectors)
+    int8 = dequantize_int8(codes, offset, scale)
+    bits = quantize_binary(vectors)
+
+    recalls = {"float16": [], "int8": [], "binary": [], "binary+rerank": []}
+    for query in np.asarray(queries, dtype=np.float32):
+        exact = nearest(cosine_distances(query, vectors), k)
+        recalls["float16"].append(recall_at_k(exact, nearest(cosine_distances(query, half), k)))
+        recalls["int8"].append(recall_at_k(exact, nearest(cosine_distances(query, int8), k)))
+        hamming = hamming_distances(quantize_binary(query), bits)
+        recalls["binary"].append(recall_at_k(exact, nearest(hamming, k)))
+        candidates = nearest(hamming, k * rerank_factor)
+        recalls["binary+rerank"].append(recall_at_k(exact, rerank(query, vectors, candidates, k)))
+    return {name: float(np.mean(values)) for name, values in recalls.items()}
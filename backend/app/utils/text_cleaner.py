@@ -1,26 +1,88 @@
+"""
+Precompiled text-cleaning engine shared by the ingestion pipeline.
+"""
 import re
-from typing import Optional
+from typing import Callable, Dict, List
+
+CleaningStep = Callable[[str], str]
+
+class TextCleaningEngine:
+    """
+    Applies a fixed sequence of cleaning steps and strips the result.
+
+    Steps are built once at import time: patterns are precompiled, character
+    replacements are grouped into one step, and runs of whitespace are
+    collapsed with ``str.split``/``str.join`` instead of a regex. Because the
+    result is always stripped, steps may leave a leading or trailing space.
+    """
+    def __init__(self, steps: List[CleaningStep]):
+        self.steps = steps
+
+    def clean(self, text: str) -> str:
+        for step in self.steps:
+            text = step(text)
+        return text.strip()
+
+def substitute(pattern: str, replacement: str, flags: int = 0) -> CleaningStep:
+    """Step replacing every match of a pattern."""
+    sub = re.compile(pattern, flags).sub
+    return lambda text: sub(replacement, text)
+
+def replace_chars(replacements: Dict[str, str]) -> CleaningStep:
+    """
+    Step replacing single characters. ``str.replace`` skips absent characters
+    with a fast scan, which is quicker than ``str.translate`` on non-ASCII text.
+    """
+    items = list(replacements.items())
+
+    def step(text: str) -> str:
+        for old, new in items:
+            if old in text:
+                text = text.replace(old, new)
+        return text
+    return step
+
+def collapse_whitespace(text: str) -> str:
+    """Step replacing every run of whitespace with a single space."""
+    # str.split and re's \s agree on what is whitespace; the ends are stripped later
+    return ' '.join(text.split())
+
+# Journal entry cleaning (DataCleaner). The order matters: page numbers are
+# matched per line before whitespace is collapsed, dashes are normalized only
+# after spaces before punctuation are removed, and table borders are only
+# looked for once dash runs are gone.
+ENTRY_CLEANER = TextCleaningEngine([
+    # Form feeds
+    replace_chars({'\x0c': ''}),
+    # Page numbers
+    substitute(r'^\s*Page\s+\d+\s*$', '', re.MULTILINE),
+    # Standalone numbers
+    substitute(r'^\s*\d+\s*$', '', re.MULTILINE),
+    # Normalize whitespace (this also normalizes line endings, as no newlines remain)
+    collapse_whitespace,
+    # Remove spaces before punctuation
+    substitute(r' (?=[.,!?])', ''),
+    # Special characters
+    replace_chars({'…': '...', '–': '-', '—': '-'}),
+    # Repeated dashes or underscores
+    substitute(r'[-_]{3,}', ''),
+    # Table borders
+    substitute(r'[|+]\s*[|+]', ''),
+])
+
+# Generic extracted-text cleaning. Table characters are removed after
+# whitespace is collapsed so the spaces around them are kept.
+EXTRACTED_TEXT_CLEANER = TextCleaningEngine([
+    # PDF artifacts and control characters
+    substitute(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\xff]', ''),
+    # Remove multiple spaces; no newlines survive, so paragraph breaks need no handling
+    collapse_whitespace,
+    # Table artifacts (common in PDFs)
+    substitute(r'[|┌┐└┘├┤┬┴┼═║╒╓╔╕╖╗╘╙╚╛╜╝╞╟╠╡╢╣╤╥╦╧╨╩╪╫╬]', ''),
+    # Image references
+    substitute(r'\[Image:.*?\]', '', re.DOTALL),
+])
 
 def clean_text(text: str) -> str:
     """Clean and normalize text content"""
-    
-    # Remove any PDF artifacts or control characters
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\xff]', '', text)
-    
-    # Remove multiple spaces
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove multiple newlines while preserving paragraph breaks
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    
-    # Remove table artifacts (common in PDFs)
-    text = re.sub(r'[|┌┐└┘├┤┬┴┼═║╒╓╔╕╖╗╘╙╚╛╜╝╞╟╠╡╢╣╤╥╦╧╨╩╪╫╬]', '', text)
-    
-    # Remove image references and captions
-    text = re.sub(r'\[Image:.*?\]', '', text, flags=re.DOTALL)
-    text = re.sub(r'Figure \d+:.*?\n', '', text)
-    
-    # Clean up whitespace
-    text = text.strip()
-    
-    return text 
\ No newline at end of file
+    return EXTRACTED_TEXT_CLEANER.clean(text)
@@ -0,0 +1,170 @@
+"""
+Utilities for spooling uploaded files to disk.
+"""
+import hashlib
+import os
+import tempfile
+from typing import List, Optional, Tuple
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+# Headers and boundaries a multipart body carries on top of its files
+MULTIPART_OVERHEAD = 65_536
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload crosses the configured size limit while spooling."""
+
+class SpooledUpload:
+    """An upload copied to disk, with its size and SHA-256 computed during the copy."""
+    def __init__(self, path: str, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+    def cleanup(self) -> None:
+        """Delete the spooled file if it still exists."""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+class _FilePartSpooler:
+    """
+    python-multipart callbacks that write the file parts of one form field to
+    temporary files as the body arrives. Other fields are ignored.
+    """
+
+    def __init__(self, field: str, max_size: int, max_files: Optional[int], suffix: str, spool_dir: Optional[str]):
+        self.field = field
+        self.max_size = max_size
+        self.max_files = max_files
+        self.suffix = suffix
+        self.spool_dir = spool_dir
+        self.uploads: List[SpooledUpload] = []
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._header_field = b""
+        self._header_value = b""
+        # The file part being spooled
+        self._out = None
+        self._path = None
+        self._filename = None
+        self._digest = None
+        self._size = 0
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = []
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers.append((self._header_field.lower(), self._header_value))
+        self._header_field = self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        disposition = dict(self._headers).get(b"content-disposition", b"")
+        _, options = parse_options_header(disposition)
+        if options.get(b"name", b"").decode("utf-8", "replace") != self.field:
+            return
+        if b"filename" not in options:
+            raise ValueError(f"Form field {self.field} must be a file")
+        # Refused on its headers, before any of its data is read
+        if self.max_files and len(self.uploads) >= self.max_files:
+            raise ValueError(f"Too many files, at most {self.max_files} per upload")
+        filename = options[b"filename"].decode("utf-8", "replace")
+        if not filename.endswith(self.suffix):
+            raise ValueError(f"Only {self.suffix} files are supported: {filename}")
+        fd, self._path = tempfile.mkstemp(suffix=self.suffix, dir=self.spool_dir)
+        self._out = os.fdopen(fd, "wb")
+        self._filename = filename
+        self._digest = hashlib.sha256()
+        self._size = 0
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._out is None:
+            return
+        self._size += end - start
+        if self._size > self.max_size:
+            raise UploadTooLargeError(
+                f"File size of {self._filename} exceeds maximum limit of {self.max_size // 1_048_576}MB"
+            )
+        chunk = data[start:end]
+        self._digest.update(chunk)
+        self._out.write(chunk)
+
+    def on_part_end(self) -> None:
+        if self._out is None:
+            return
+        self._out.close()
+        self.uploads.append(SpooledUpload(self._path, self._filename, self._size, self._digest.hexdigest()))
+        self._out = self._path = None
+
+    @property
+    def in_part(self) -> bool:
+        return self._out is not None
+
+    def abort(self) -> None:
+        """Delete every file spooled so far, including a partial one."""
+        if self._out is not None:
+            self._out.close()
+            os.unlink(self._path)
+            self._out = self._path = None
+        for upload in self.uploads:
+            upload.cleanup()
+
+async def spool_multipart_files(
+    request: Request,
+    field: str,
+    max_size: int,
+    max_files: Optional[int] = None,
+    suffix: str = ".pdf",
+    spool_dir: Optional[str] = None
+) -> List[SpooledUpload]:
+    """
+    Stream the files of a multipart/form-data field straight from the request
+    body to temporary files, computing each file's hash and size on the way.
+
+    Nothing is buffered ahead of this, so an upload is rejected as soon as a
+    file crosses ``max_size`` or a file beyond ``max_files`` begins, or up
+    front when Content-Length shows the body is too large for ``max_files``
+    files. Raises ValueError (or its subclass
+    UploadTooLargeError) for rejected or malformed uploads; no spooled file is
+    left behind then.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise ValueError("Expected a multipart/form-data upload")
+    content_length = request.headers.get("content-length")
+    if max_files and content_length and content_length.isdigit():
+        if int(content_length) > max_files * max_size + MULTIPART_OVERHEAD:
+            raise UploadTooLargeError(f"Upload exceeds maximum limit of {max_size // 1_048_576}MB per file")
+
+    spooler = _FilePartSpooler(field, max_size, max_files, suffix, spool_dir)
+    parser = MultipartParser(params[b"boundary"], spooler.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+        if spooler.in_part:
+            raise ValueError("Upload ended in the middle of a file")
+        if not spooler.uploads:
+            raise ValueError(f"No file was uploaded in form field {field}")
+    except BaseException:
+        spooler.abort()
+        raise
+    return spooler.uploads
@@ -2,10 +2,14 @@
 """
 Utilities for vector search operations.
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import numpy as np
+from app.db.embeddings import candidate_count, index_distance, is_quantized
+from app.db.partitions import connection_runner, partition_name
+from app.db.vector_index import VectorIndexManager, search_settings
+from app.models.journal import JournalEntry
 from app.services.langchain_service import LangChainService
-from sqlalchemy import text
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 class VectorUtils:
@@ -44,30 +48,59 @@ class VectorUtils:
         # - Handle edge cases
         pass
 
-async def create_vector_similarity_index(db: AsyncSession):
-    """Create an index for vector similarity search"""
-    query = text("""
-    CREATE INDEX IF NOT EXISTS journal_entries_embedding_idx 
-    ON journal_entries 
-    USING ivfflat (embedding vector_cosine_ops)
-    WITH (lists = 100);
-    """)
-    
-    await db.execute(query)
-    await db.commit()
+async def create_vector_similarity_index(db: AsyncSession) -> List[Dict[str, Any]]:
+    """
+    Create, rebuild or recalibrate the similarity index of each journal_entries
+    partition as its size calls for; see db.vector_index. Run it again as the
+    corpus grows. Returns what was done per partition.
+    """
+    def maintain(conn):
+        return VectorIndexManager(connection_runner(conn), "journal_entries").maintain()
+
+    # CREATE INDEX CONCURRENTLY cannot run inside the session's transaction
+    async with db.bind.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        return await conn.run_sync(maintain)
+
+async def find_similar_entries(
+    db: AsyncSession,
+    embedding: List[float],
+    limit: int = 5,
+    year: Optional[int] = None
+):
+    """
+    Find similar journal entries based on vector similarity.
+    With ``year`` only that year's partition and its index are searched.
+    On a quantized index the nearest candidates are reranked by exact distance.
+    """
+    # ef_search / probes calibrated for the searched partitions, for this transaction
+    fetched = candidate_count(limit) if is_quantized() else limit
+    partition = partition_name(JournalEntry.__tablename__, year) if year is not None else None
+    for statement in await search_settings(db, JournalEntry.__tablename__, fetched, partition):
+        await db.execute(text(statement))
 
-async def find_similar_entries(db: AsyncSession, embedding: List[float], limit: int = 5):
-    """Find similar journal entries based on vector similarity"""
-    query = text("""
-    SELECT id, content, embedding <=> :embedding AS distance
-    FROM journal_entries
-    ORDER BY embedding <=> :embedding
-    LIMIT :limit
-    """)
+    # The embedding column type binds the embedding, which a raw text() parameter
+    # cannot do portably across drivers (asyncpg has no list -> vector codec)
+    distance = JournalEntry.embedding.cosine_distance(embedding)
+    if not is_quantized():
+        query = (
+            select(JournalEntry.id, JournalEntry.content, distance.label("distance"))
+            .order_by(distance)
+            .limit(limit)
+        )
+        if year is not None:
+            query = query.where(JournalEntry.year == year)
+    else:
+        candidates = (
+            select(JournalEntry.id, JournalEntry.content, distance.label("distance"))
+            .order_by(index_distance(JournalEntry.embedding, embedding))
+            .limit(candidate_count(limit))
+        )
+        if year is not None:
+            candidates = candidates.where(JournalEntry.year == year)
+        candidates = candidates.subquery()
+        query = select(candidates).order_by(candidates.c.distance).limit(limit)
     
-    result = await db.execute(
-        query,
-        {"embedding": embedding, "limit": limit}
-    )
+    result = await db.execute(query)
     
-    return result.fetchall()
\ No newline at end of file
+    return result.fetchall()
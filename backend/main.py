@@ -2,8 +2,8 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.db.init_db import init_db, verify_database, reset_database, check_table_structure
-import asyncio
+from app.db.init_db import init_db
+import time
 
 app = FastAPI(
     title="Mental Health Journal Analysis API",
@@ -22,14 +22,13 @@ app.add_middleware(
 
 @app.on_event("startup")
 def startup_event():
-    """Initialize the database on startup"""
+    """Bring the database schema up to date on startup; existing data is kept"""
     try:
         print("\n=== Starting Application ===")
-        print("Performing complete database reset...")
-        # Direct synchronous calls
-        reset_database()
-        check_table_structure()
-        print("=== Startup Complete ===\n")
+        start = time.perf_counter()
+        # Applies pending migrations only; no DDL when the schema is current
+        init_db()
+        print(f"=== Startup Complete in {(time.perf_counter() - start) * 1000:.1f} ms ===\n")
     except Exception as e:
         print(f"Error during startup: {e}")
         raise e
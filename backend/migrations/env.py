@@ -0,0 +1,93 @@
+"""
+Alembic environment for the journal database.
+
+The database URL comes from the app settings (DATABASE_URL), not alembic.ini.
+``init_db`` passes its own connection in ``config.attributes["connection"]``
+so startup upgrades run inside its transaction and advisory lock.
+"""
+from logging.config import fileConfig
+import re
+
+from alembic import context
+
+from app.db.init_db import database_url, engine
+from app.models.journal import Base
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Yearly partitions (journal_entries_y2021, ...) are created at runtime by
+# db.partitions, so autogenerate must not try to drop them or the copies of
+# foreign keys PostgreSQL makes for each of them
+PARTITION_NAME = re.compile(r"^(?P<table>\w+)_y\d{4}$")
+
+# The similarity indexes' state table is managed by db.vector_index, which
+# builds the indexes on each partition, not by migrations
+RUNTIME_TABLES = {"vector_index_state"}
+
+# Migrations create the embedding column as vector(256); scripts/convert_embeddings.py
+# changes its type to match the EMBEDDING_* settings, which the model follows
+SETTINGS_TYPED_COLUMNS = {("journal_entries", "embedding")}
+
+def _is_partition(name: str) -> bool:
+    match = PARTITION_NAME.match(name)
+    return bool(match) and match.group("table") in target_metadata.tables
+
+def include_object(object, name, type_, reflected, compare_to):
+    if not reflected or compare_to is not None:
+        return True
+    if type_ == "table":
+        return not _is_partition(name) and name not in RUNTIME_TABLES
+    if type_ == "foreign_key_constraint":
+        return not _is_partition(object.referred_table.name)
+    return True
+
+def compare_type(context, inspected_column, metadata_column, inspected_type, metadata_type):
+    if (metadata_column.table.name, metadata_column.name) in SETTINGS_TYPED_COLUMNS:
+        return False
+    # Alembic's default comparison
+    return None
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL instead of running it."""
+    context.configure(
+        url=database_url("psycopg2"),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        compare_type=compare_type,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    """Run migrations on the caller's connection, or on one from the app engine."""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+
+    with engine.connect() as connection:
+        _run(connection)
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        compare_type=compare_type,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
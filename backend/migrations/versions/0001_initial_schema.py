@@ -0,0 +1,163 @@
+"""Initial schema: year-partitioned journal_entries and analysis_results
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+Databases created before migrations existed are adopted: tables that already
+exist are left alone, and a journal_entries table from before partitioning is
+deduplicated and copied into the partitioned table.
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+from app.db.partitions import connection_runner, copy_into_partitions, detach_unpartitioned, is_unpartitioned
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ENTRY_COLUMNS = (
+    "id", "entry_date", "day_of_week", "content", "word_count", "year", "month", "day",
+    "sentiment_score", "complexity_score", "topics", "mentioned_people", "mentioned_locations",
+    "embedding", "source_file", "content_hash", "created_at", "updated_at",
+)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    run = connection_runner(connection)
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    legacy = None
+    if is_unpartitioned(run, "journal_entries"):
+        legacy = detach_unpartitioned(run, "journal_entries")
+        _deduplicate_entries(legacy)
+
+    inspector = sa.inspect(connection)
+    if not inspector.has_table("journal_entries"):
+        _create_journal_entries()
+    if not inspector.has_table("analysis_results"):
+        _create_analysis_results()
+
+    if legacy:
+        _migrate_unpartitioned_entries(connection, legacy)
+
+
+def downgrade() -> None:
+    op.drop_table("analysis_results")
+    op.drop_table("journal_entries")
+
+
+def _create_journal_entries() -> None:
+    op.create_table(
+        "journal_entries",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("entry_date", sa.Date(), nullable=False),
+        sa.Column("day_of_week", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("word_count", sa.Integer(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Integer(), nullable=False),
+        sa.Column("sentiment_score", sa.Float(), nullable=True),
+        sa.Column("complexity_score", sa.Float(), nullable=True),
+        sa.Column("topics", sa.JSON(), nullable=True),
+        sa.Column("mentioned_people", sa.JSON(), nullable=True),
+        sa.Column("mentioned_locations", sa.JSON(), nullable=True),
+        sa.Column("embedding", Vector(1536), nullable=True),
+        sa.Column("source_file", sa.String(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id", "year"),
+        postgresql_partition_by="RANGE (year)",
+    )
+    op.create_index("ix_journal_entries_id", "journal_entries", ["id"])
+    op.create_index("ix_journal_entries_year", "journal_entries", ["year"])
+    op.create_index("ix_journal_entries_month", "journal_entries", ["month"])
+    op.create_index("ix_journal_entries_content_hash", "journal_entries", ["content_hash"])
+    op.create_index(
+        "uq_journal_entries_entry_key", "journal_entries",
+        ["source_file", "entry_date", "content_hash", "year"], unique=True
+    )
+
+
+def _create_analysis_results() -> None:
+    op.create_table(
+        "analysis_results",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("entry_id", sa.Integer(), nullable=True),
+        sa.Column("entry_year", sa.Integer(), nullable=True),
+        sa.Column("analysis_type", sa.String(), nullable=True),
+        sa.Column("results", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["entry_id", "entry_year"], ["journal_entries.id", "journal_entries.year"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_analysis_results_id", "analysis_results", ["id"])
+
+
+def _deduplicate_entries(table: str) -> None:
+    """
+    Prepare rows stored before the unique entry key existed: hash rows stored
+    without one and drop duplicate rows, keeping the oldest.
+    """
+    op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)")
+    op.execute(f"""
+        UPDATE {table}
+        SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')
+        WHERE content_hash IS NULL
+    """)
+    op.execute(f"""
+        DELETE FROM {table} AS duplicate
+        USING {table} AS original
+        WHERE duplicate.source_file = original.source_file
+          AND duplicate.entry_date = original.entry_date
+          AND duplicate.content_hash = original.content_hash
+          AND duplicate.id > original.id
+    """)
+
+
+def _migrate_unpartitioned_entries(connection, legacy: str) -> None:
+    """
+    Copy the detached pre-partitioning table into the partitioned
+    journal_entries, repoint analysis_results at it and drop the old table.
+    """
+    copy_into_partitions(
+        connection_runner(connection), connection.engine.url.render_as_string(hide_password=True),
+        legacy, "journal_entries", _legacy_columns(connection, legacy)
+    )
+    # analysis_results rows reference entries by (id, year) now
+    op.execute("ALTER TABLE analysis_results ADD COLUMN IF NOT EXISTS entry_year INTEGER")
+    op.execute("""
+        UPDATE analysis_results AS result SET entry_year = entry.year
+        FROM journal_entries AS entry
+        WHERE entry.id = result.entry_id AND result.entry_year IS NULL
+    """)
+    op.execute(f"DROP TABLE {legacy} CASCADE")
+    if not _analysis_results_foreign_key(connection):
+        op.create_foreign_key(
+            None, "analysis_results", "journal_entries",
+            ["entry_id", "entry_year"], ["id", "year"]
+        )
+
+
+def _legacy_columns(connection, legacy: str) -> Sequence[str]:
+    """Columns of the old table that the partitioned table also has."""
+    existing = {column["name"] for column in sa.inspect(connection).get_columns(legacy)}
+    return [column for column in ENTRY_COLUMNS if column in existing]
+
+
+def _analysis_results_foreign_key(connection) -> Optional[int]:
+    return connection.execute(sa.text("""
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'analysis_results'::regclass AND confrelid = 'journal_entries'::regclass
+    """)).scalar()
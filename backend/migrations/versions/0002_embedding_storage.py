@@ -0,0 +1,37 @@
+"""Store 256-dimensional embeddings
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+journal_entries.embedding becomes vector(256), the default EMBEDDING_STORAGE
+of EMBEDDING_DIMENSIONS. Stored embeddings of another dimensionality are
+cleared so they are generated again. The similarity index is dropped, as its
+operator class depends on the column type; scripts/setup_db.py builds it again.
+
+The migration does not read the settings, so every database ends up with the
+same schema. Other EMBEDDING_* settings are applied afterwards by
+scripts/convert_embeddings.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS journal_entries_embedding_idx")
+    op.execute("UPDATE journal_entries SET embedding = NULL WHERE vector_dims(embedding) <> 256")
+    op.execute("ALTER TABLE journal_entries ALTER COLUMN embedding TYPE vector(256) USING embedding::vector(256)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS journal_entries_embedding_idx")
+    op.execute("UPDATE journal_entries SET embedding = NULL WHERE vector_dims(embedding) <> 1536")
+    op.execute("ALTER TABLE journal_entries ALTER COLUMN embedding TYPE vector(1536) USING embedding::vector(1536)")
@@ -0,0 +1,31 @@
+"""Covering index for keyset pagination of journal entries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+Entries are listed by (entry_date, id). The index includes every summary
+column (db.crud.SUMMARY_COLUMNS), so summary pages are index-only scans.
+It is built on each yearly partition.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_journal_entries_entry_date_id", "journal_entries", ["entry_date", "id"],
+        postgresql_include=["year", "month", "day", "day_of_week", "word_count", "source_file"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_journal_entries_entry_date_id", table_name="journal_entries")
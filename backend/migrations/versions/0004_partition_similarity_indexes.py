@@ -0,0 +1,35 @@
+"""Similarity indexes per partition
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+Similarity indexes are built on each yearly partition by db.vector_index,
+sized for the embeddings it holds. The index built on the whole table is
+dropped; scripts/maintain_vector_indexes.py builds the per-partition ones.
+Searches scan exactly until it has run.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.embeddings import similarity_indexes
+from app.db.partitions import connection_runner
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS journal_entries_embedding_idx")
+
+
+def downgrade() -> None:
+    # The per-partition indexes may use an operator class that 0002's
+    # downgrade cannot convert; they are not rebuilt on the whole table
+    for index in similarity_indexes(connection_runner(op.get_bind()), "journal_entries"):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
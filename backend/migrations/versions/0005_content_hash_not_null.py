@@ -0,0 +1,58 @@
+"""Require a content hash on every journal entry
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+Rows with a NULL content_hash never conflict under uq_journal_entries_entry_key,
+so uploading their file again duplicated them. Rows equal under the key once
+their hash is known (SHA-256 of the content, as
+utils.hashing.entry_content_hash computes it) are deleted, keeping the oldest
+row and moving their analysis results to it; missing hashes are then filled
+in and the column becomes NOT NULL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The hash a row has, or will have once filled in
+ENTRY_HASH = "coalesce(content_hash, encode(sha256(convert_to(content, 'UTF8')), 'hex'))"
+
+
+def upgrade() -> None:
+    # Duplicates go first: filling in their hashes would violate the unique index
+    op.execute(f"""
+        CREATE TEMPORARY TABLE duplicate_entries ON COMMIT DROP AS
+        SELECT id, year, keep_id FROM (
+            SELECT id, year, min(id) OVER (PARTITION BY source_file, entry_date, {ENTRY_HASH}, year) AS keep_id
+            FROM journal_entries
+        ) AS k
+        WHERE id <> keep_id
+    """)
+    # Analysis results of a duplicate move to the row that is kept
+    op.execute("""
+        UPDATE analysis_results AS a
+        SET entry_id = d.keep_id
+        FROM duplicate_entries AS d
+        WHERE a.entry_id = d.id AND a.entry_year = d.year
+    """)
+    op.execute("""
+        DELETE FROM journal_entries AS j
+        USING duplicate_entries AS d
+        WHERE j.id = d.id AND j.year = d.year
+    """)
+    op.execute(f"UPDATE journal_entries SET content_hash = {ENTRY_HASH} WHERE content_hash IS NULL")
+    op.alter_column("journal_entries", "content_hash", existing_type=sa.String(length=64), nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column("journal_entries", "content_hash", existing_type=sa.String(length=64), nullable=True)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import date, timedelta
+from typing import List
+from app.core.config import settings
+from app.services.batch_stage import _clean_and_validate_shard, clean_and_validate, shutdown_batch_stage_pool
+from app.services.entry_parser import ParsedEntry
+
+WORDS = (
+    "today I felt really tired after work but the walk in the park helped "
+    "talked with mom about the trip and we planned dinner for friday night "
+    "anxious about the interview grateful for friends coffee rain sunshine"
+).split()
+
+def make_entries(count: int, seed: int = 5) -> List[ParsedEntry]:
+    """Entry bodies as extraction leaves them: hyphenated line breaks, stray spaces, page numbers"""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        entry_date = date(2015, 1, 1) + timedelta(days=i)
+        lines = []
+        for _ in range(rng.randint(3, 40)):
+            line = "  ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14)))
+            lines.append(line + ("-" if rng.random() < 0.1 else ""))
+            if rng.random() < 0.05:
+                lines.append(str(rng.randint(1, 400)))
+        text = "\n".join(lines)
+        entries.append(ParsedEntry(entry_date, entry_date.weekday(), "bench.pdf", text=text, end=len(text)))
+    return entries
+
+def run_inline(batches: List[List[ParsedEntry]]) -> int:
+    return sum(len(_clean_and_validate_shard(batch, settings.VALIDATION_SAMPLE_SIZE)[0]) for batch in batches)
+
+async def run_stage(batches: List[List[ParsedEntry]], workers: int, min_shard_size: int) -> int:
+    valid = 0
+    # Batches go through one at a time, as an ingest job sends them
+    for batch in batches:
+        valid += len((await clean_and_validate(batch, workers, min_shard_size)).valid_entries)
+    return valid
+
+def batched(entries: List[ParsedEntry], size: int) -> List[List[ParsedEntry]]:
+    return [entries[start:start + size] for start in range(0, len(entries), size)]
+
+def timed(label: str, count: int, batch_size: int, fn, repeats: int = 3) -> None:
+    """Best of ``repeats`` runs; cleaning rewrites the entries, so each run gets fresh ones"""
+    best = float("inf")
+    for _ in range(repeats):
+        batches = batched(make_entries(count), batch_size)
+        start = time.perf_counter()
+        valid = fn(batches)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:38s} {best * 1000:8.1f} ms  ({count / best:,.0f} entries/sec, {valid:,} valid)")
+
+if __name__ == "__main__":
+    import sys
+
+    logging.disable(logging.WARNING)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else settings.INGEST_BATCH_SIZE
+    cores = os.cpu_count() or 1
+
+    print(f"{count:,} entries in batches of {batch_size}, {cores} CPU cores")
+    print("-" * 80)
+    # The first call compiles the cleaning patterns and validation tables
+    run_inline(batched(make_entries(200), batch_size))
+    timed("inline", count, batch_size, run_inline)
+    for workers in sorted({1, 2, 4, cores}):
+        # With two or more workers, shards of at least 50 are what a batch of 100
+        # was split into before shards were sized from the worker count
+        configurations = [("one shard per worker", settings.CLEAN_VALIDATE_MIN_SHARD_SIZE)]
+        if workers > 1:
+            configurations.insert(0, ("shards of 50", 50))
+        for label, min_shard_size in configurations:
+            # Warm up so worker start-up is not counted
+            asyncio.run(run_stage(batched(make_entries(200), batch_size), workers, min_shard_size))
+            timed(
+                f"{workers} workers, {label}", count, batch_size,
+                lambda batches: asyncio.run(run_stage(batches, workers, min_shard_size))
+            )
+            shutdown_batch_stage_pool()
@@ -0,0 +1,96 @@
+import logging
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+from pydantic import ValidationError
+from app.models.validation import JournalEntryValidation
+from app.services.batch_validator import BatchValidator
+from app.services.validation_service import ValidationService
+
+WORDS = (
+    "today I felt really tired after work but the walk in the park helped "
+    "talked with mom about the trip and we planned dinner for friday night "
+    "anxious about the interview grateful for friends coffee rain sunshine"
+).split()
+
+class Entry:
+    def __init__(self, entry_date, content, word_count, year, month, day):
+        self.date = entry_date
+        self.content = content
+        self.word_count = word_count
+        self.year = year
+        self.month = month
+        self.day = day
+
+def make_entries(count: int = 20000, seed: int = 3) -> List[Entry]:
+    """Mostly valid entries, with roughly one in five breaking some rule"""
+    rng = random.Random(seed)
+    entries = []
+    for _ in range(count):
+        entry_date = date(2018, 6, 1) + timedelta(days=rng.randint(0, 365 * 8))
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 300))]
+        content = " ".join(words)
+        word_count = len(words)
+        year, month, day = entry_date.year, entry_date.month, entry_date.day
+
+        fault = rng.random()
+        if fault < 0.02:
+            content = content + "\x0c"
+        elif fault < 0.04:
+            content = "1234567890 ...."
+        elif fault < 0.06:
+            content = content[:5]
+        elif fault < 0.08:
+            content = " " * (len(content) + 1) + content
+        elif fault < 0.10:
+            word_count += rng.choice([-7, 6, 20])
+        elif fault < 0.12:
+            day = (day % 28) + 1
+        elif fault < 0.14:
+            content = "x" * 200 + " " + content[:10]
+            word_count = len(content.split())
+        elif fault < 0.15:
+            word_count = 0
+        entries.append(Entry(entry_date, content, word_count, year, month, day))
+    return entries
+
+def reference_mask(entries: List[Entry], now: datetime) -> List[bool]:
+    """The per-entry pydantic validation plus consistency checks"""
+    service = ValidationService()
+    mask = []
+    for entry in entries:
+        try:
+            validated = JournalEntryValidation(
+                date=entry.date, content=entry.content, word_count=entry.word_count,
+                year=entry.year, month=entry.month, day=entry.day
+            )
+        except ValidationError:
+            mask.append(False)
+            continue
+        mask.append(service._check_entry_consistency(validated) and validated.date <= now)
+    return mask
+
+if __name__ == "__main__":
+    import sys
+
+    logging.disable(logging.WARNING)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    entries = make_entries(count)
+    now = datetime.now()
+
+    start = time.perf_counter()
+    expected = reference_mask(entries, now)
+    per_entry = time.perf_counter() - start
+
+    # The first call builds the per-character lookup table once per process
+    BatchValidator().validate(entries[:1], now=now)
+    start = time.perf_counter()
+    result = BatchValidator().validate(entries, now=now)
+    batch = time.perf_counter() - start
+
+    print(f"{count:,} entries, {count - sum(expected):,} invalid")
+    print("-" * 60)
+    print(f"per-entry pydantic: {per_entry * 1000:8.1f} ms  ({count / per_entry:,.0f} entries/sec)")
+    print(f"batch validator:    {batch * 1000:8.1f} ms  ({count / batch:,.0f} entries/sec)")
+    print(f"identical mask: {list(result.mask) == expected}")
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from openai import AsyncOpenAI
+from sqlalchemy import delete, func, select
+from app.db.init_db import AsyncSessionLocal, async_engine, init_db
+from app.models.journal import JournalEntry
+from app.services.db_operations import DatabaseOperations
+from app.services.embedding_pipeline import EmbeddingPipeline, EmbeddingStats, embed_pending_entries
+from app.utils.embedding_stand_in import EmbeddingStandIn
+from benchmark_store_entries import make_entries
+
+# Stand-in service: 20 ms + 10 µs per token per request
+LATENCY = 0.02
+LATENCY_PER_TOKEN = 0.00001
+
+def pipeline(stand_in: EmbeddingStandIn, **options) -> EmbeddingPipeline:
+    client = AsyncOpenAI(api_key="stand-in", base_url=stand_in.url, max_retries=0)
+    return EmbeddingPipeline(client=client, **options)
+
+async def embed_texts(texts, **options) -> EmbeddingStats:
+    with EmbeddingStandIn(latency=LATENCY, latency_per_token=LATENCY_PER_TOKEN) as stand_in:
+        stats = EmbeddingStats()
+        start = time.perf_counter()
+        await pipeline(stand_in, **options).embed(texts, stats)
+        stats.seconds = time.perf_counter() - start
+    return stats
+
+async def main(count: int):
+    texts = [entry.content for entry in make_entries("benchmark.pdf", count)]
+    print(f"{count:,} entries against the stand-in API (no database)")
+    print("-" * 90)
+    configurations = [
+        ("one text per request", dict(batch_size=1, concurrency=1)),
+        ("batches, sequential", dict(concurrency=1)),
+        ("batches, 4 in flight", dict(concurrency=4)),
+        ("batches, 8 in flight", dict(concurrency=8)),
+    ]
+    for label, options in configurations:
+        texts_used = texts[:count // 20] if options.get("batch_size") == 1 else texts
+        stats = await embed_texts(texts_used, **options)
+        print(f"{label:26s} {stats.summary()}")
+
+    # A limit of 200k tokens per second: requests are paced by 429s
+    with EmbeddingStandIn(tpm=200_000, window=1.0, latency=LATENCY, latency_per_token=LATENCY_PER_TOKEN) as stand_in:
+        stats = EmbeddingStats()
+        start = time.perf_counter()
+        await pipeline(stand_in, concurrency=8).embed(texts, stats)
+        stats.seconds = time.perf_counter() - start
+        print(f"{'rate limited, 8 in flight':26s} {stats.summary()}; {stand_in.rate_limited} answered 429")
+
+    # End to end: read pending entries, embed, write back in bulk
+    source_file = f"benchmark-{uuid.uuid4().hex[:8]}.pdf"
+    async with AsyncSessionLocal() as db:
+        await DatabaseOperations(db).store_entries(make_entries(source_file, count))
+        try:
+            with EmbeddingStandIn(latency=LATENCY, latency_per_token=LATENCY_PER_TOKEN) as stand_in:
+                stats = await embed_pending_entries(db, pipeline(stand_in), source_file=source_file)
+            missing = (await db.execute(
+                select(func.count()).select_from(JournalEntry)
+                .where(JournalEntry.source_file == source_file, JournalEntry.embedding.is_(None))
+            )).scalar()
+            print(f"{'stored entries':26s} {stats.summary()}; {missing} left without an embedding")
+        finally:
+            await db.execute(delete(JournalEntry).where(JournalEntry.source_file == source_file))
+            await db.commit()
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    # Stores ``count`` entries under a unique source file and removes them afterwards
+    logging.disable(logging.WARNING)
+    init_db()
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Callable, List
+from sqlalchemy import delete, func, select, text
+from app.db.crud import SUMMARY_COLUMNS, get_journal_entries
+from app.db.init_db import AsyncSessionLocal, async_engine, init_db
+from app.models.journal import JournalEntry
+from app.services.db_operations import DatabaseOperations
+from app.services.entry_parser import ParsedEntry
+from benchmark_store_entries import WORDS
+
+def make_entries(source_file: str, count: int, years: int = 30, seed: int = 9) -> List[ParsedEntry]:
+    """Synthetic entries spread over ``years`` years, several per day"""
+    rng = random.Random(seed)
+    days = years * 365
+    entries = []
+    for offset in range(count):
+        entry_date = date(1995, 1, 1) + timedelta(days=offset % days)
+        entries.append(ParsedEntry(
+            date=entry_date,
+            day_of_week=entry_date.isoweekday() % 7 + 1,
+            source_file=source_file,
+            content=f"{offset} " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 300)))
+        ))
+    return entries
+
+async def timed(fetch: Callable, repeats: int = 20) -> float:
+    """Median milliseconds of ``fetch()``"""
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await fetch()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+async def main(count: int, page_size: int = 100):
+    source_file = f"benchmark-{uuid.uuid4().hex[:8]}.pdf"
+    async with AsyncSessionLocal() as db:
+        await DatabaseOperations(db).store_entries(make_entries(source_file, count))
+        # Index-only scans skip the table once the visibility map is set
+        async with async_engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE journal_entries"))
+        try:
+            total = (await db.execute(select(func.count()).select_from(JournalEntry))).scalar()
+            print(f"{total:,} entries, pages of {page_size} summary rows")
+            print("-" * 60)
+            print(f"{'depth':>10s} {'OFFSET ms':>12s} {'keyset ms':>12s}")
+            order = (JournalEntry.entry_date, JournalEntry.id)
+            for depth in (0, total // 10, total // 2, total - page_size):
+                # The previous implementation's skip/limit, as OFFSET
+                offset_query = select(*SUMMARY_COLUMNS).order_by(*order).offset(depth).limit(page_size)
+                last = (await db.execute(select(*order).order_by(*order).offset(max(depth - 1, 0)).limit(1))).first()
+                after = (last.entry_date, last.id) if depth else None
+
+                async def by_offset():
+                    (await db.execute(offset_query)).fetchall()
+
+                async def by_keyset():
+                    await get_journal_entries(db, after=after, limit=page_size, summary=True)
+
+                print(f"{depth:10,d} {await timed(by_offset):12.2f} {await timed(by_keyset):12.2f}")
+
+            plan = await db.execute(text(
+                "EXPLAIN SELECT id, entry_date, year, month, day, day_of_week, word_count, source_file "
+                "FROM journal_entries WHERE year = 2010 AND (entry_date, id) > ('2010-06-01', 0) "
+                "ORDER BY entry_date, id LIMIT 100"
+            ))
+            print("summary page of one year:", " / ".join(line.strip() for (line,) in plan.fetchall()[:3]))
+        finally:
+            await db.execute(delete(JournalEntry).where(JournalEntry.source_file == source_file))
+            await db.commit()
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    # Stores ``count`` entries under a unique source file and removes them afterwards
+    logging.disable(logging.ERROR)
+    init_db()
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
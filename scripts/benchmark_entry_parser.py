@@ -0,0 +1,126 @@
+import random
+import re
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, List
+from app.services.entry_parser import EntryParser
+
+WORDS = (
+    "today I felt really tired after work but the walk in the park helped "
+    "talked with mom about the trip and we planned dinner for friday night "
+    "anxious about the interview grateful for friends coffee rain sunshine"
+).split()
+
+def make_corpus(total_words: int = 500_000, seed: int = 42) -> str:
+    """Build a synthetic journal export with month headers and blank lines"""
+    rng = random.Random(seed)
+    lines = []
+    day = date(2019, 1, 1)
+    words = 0
+    current_month = None
+
+    while words < total_words:
+        if day.month != current_month:
+            current_month = day.month
+            lines.append(day.strftime("%B"))
+            lines.append("")
+        lines.append(f"{day.month}/{day.day}/{day.year} – {day.strftime('%A')}")
+        for _ in range(rng.randint(1, 6)):
+            paragraph = rng.randint(10, 80)
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(paragraph)))
+            if rng.random() < 0.3:
+                lines.append("")
+            words += paragraph
+        day += timedelta(days=1)
+
+    return "\n".join(lines)
+
+def legacy_parse_entries(parser: EntryParser, content: str, source_file: str) -> List[dict]:
+    """The pre-scanner implementation: two full-text re.sub passes, a re.split and 14-key dicts"""
+    month_header = r'^(January|February|March|April|May|June|July|August|September|October|November|December)$'
+    entry_pattern = r'(\d{1,2}/\d{1,2}/\d{4})\s*[–-]\s*(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)'
+
+    content = re.sub(month_header, '', content, flags=re.MULTILINE)
+    content = re.sub(r'\n\s*\n', '\n', content)
+    entries_split = re.split(entry_pattern, content)
+    if entries_split[0].strip() == '':
+        entries_split = entries_split[1:]
+
+    entries = []
+    for i in range(0, len(entries_split), 3):
+        if i + 2 >= len(entries_split):
+            break
+        content_text = entries_split[i + 2].strip()
+        try:
+            entry_date = parser.parse_date(entries_split[i])
+        except ValueError:
+            continue
+        entries.append({
+            'date': entry_date,
+            'content': content_text,
+            'day_of_week': parser.DAY_MAPPING[entries_split[i + 1]],
+            'word_count': len(content_text.split()),
+            'year': entry_date.year,
+            'month': entry_date.month,
+            'day': entry_date.day,
+            'source_file': source_file,
+            'sentiment_score': None,
+            'complexity_score': None,
+            'topics': None,
+            'mentioned_people': None,
+            'mentioned_locations': None,
+            'embedding': None
+        })
+    return entries
+
+def consumed(entries: list) -> list:
+    """Read every entry's content and word count, as the ingest pipeline does"""
+    for entry in entries:
+        if isinstance(entry, dict):
+            entry['content'], entry['word_count']
+        else:
+            entry.content, entry.word_count
+    return entries
+
+def measure(label: str, parse: Callable[[], List[dict]], content: str, runs: int = 5) -> List[dict]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        entries = parse()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    tracemalloc.start()
+    parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label}:")
+    print(f"  best of {runs}: {best * 1000:8.1f} ms  "
+          f"({len(entries) / best:,.0f} entries/sec, {len(content) / best / 1_048_576:.1f} MB/sec)")
+    print(f"  peak traced allocation: {peak / 1_048_576:.1f} MB")
+    return entries
+
+if __name__ == "__main__":
+    total_words = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    content = make_corpus(total_words)
+    parser = EntryParser()
+
+    print(f"Corpus: {total_words:,} words, {len(content) / 1_048_576:.1f} MB of text")
+    print("-" * 60)
+
+    # Both outputs are read in full: an unread lazy record would time less
+    # work than the pipeline does
+    legacy = measure(
+        "legacy (sub + sub + split, dicts)",
+        lambda: consumed(legacy_parse_entries(parser, content, "bench.pdf")),
+        content
+    )
+    scanner = measure("scanner, records", lambda: consumed(parser.parse_entries(content, "bench.pdf")), content)
+
+    print("-" * 60)
+    # Shallow sizes: the values an entry points to are counted by the allocation figures above
+    print(f"Entry container size: dict {sys.getsizeof(legacy[0])} bytes, record {sys.getsizeof(scanner[0])} bytes")
+    print(f"Identical output: {legacy == [entry.to_dict() for entry in scanner]} ({len(scanner)} entries)")
@@ -0,0 +1,69 @@
+import time
+from collections import Counter
+from typing import Dict, List, Any
+from app.services.entry_parser import EntryParser
+from app.services.data_cleaner import DataCleaner
+from app.services.text_extractors import build_extractor_chain
+
+# Each configuration is a list of tiers tried in order
+CONFIGURATIONS = {
+    "pdfium": ["pdfium"],
+    "pdfplumber": ["pdfplumber"],
+    "chain (pdfium -> pdfplumber)": ["pdfium", "pdfplumber"],
+}
+
+def extract_all(pdf_path: str, tiers: List[str]) -> Dict[str, Any]:
+    """Extract every page with the given tiers and time it"""
+    start = time.perf_counter()
+    pages = []
+    tiers_used = Counter()
+    with build_extractor_chain(pdf_path, tiers) as chain:
+        for page_number in range(chain.page_count):
+            text, tier = chain.extract_page(page_number)
+            pages.append(text)
+            tiers_used[tier] += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "text": "\n".join(text for text in pages if text),
+        "pages": len(pages),
+        "seconds": elapsed,
+        "tiers_used": dict(tiers_used),
+    }
+
+def parsed_entries(text: str) -> List[tuple]:
+    """Parse and normalize entries so whitespace differences between tiers don't count"""
+    cleaner = DataCleaner()
+    try:
+        entries = EntryParser().parse_entries(text, source_file="benchmark")
+    except Exception:
+        return []
+    return [(entry.date, cleaner.clean_text(entry.content)) for entry in entries]
+
+def benchmark(pdf_paths: List[str]):
+    for pdf_path in pdf_paths:
+        print(f"\n{pdf_path}")
+        print("-" * 72)
+
+        results = {name: extract_all(pdf_path, tiers) for name, tiers in CONFIGURATIONS.items()}
+        reference = parsed_entries(results["pdfplumber"]["text"])
+        reference_set = set(reference)
+
+        for name, result in results.items():
+            entries = parsed_entries(result["text"])
+            matching = sum(1 for entry in entries if entry in reference_set)
+            pages_per_sec = result["pages"] / result["seconds"] if result["seconds"] else float("inf")
+
+            print(f"{name}:")
+            print(f"  {pages_per_sec:8.1f} pages/sec ({result['pages']} pages in {result['seconds']:.2f}s)")
+            print(f"  tiers used: {result['tiers_used']}")
+            print(f"  entries: {len(entries)} parsed, {matching}/{len(reference)} identical to pdfplumber")
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_extractors.py <pdf_file1> [pdf_file2 ...]")
+        sys.exit(1)
+
+    benchmark(sys.argv[1:])
@@ -0,0 +1,125 @@
+import logging
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, List
+import psycopg2
+from psycopg2.extras import execute_values
+from app.core.config import settings
+from app.db.partitions import ensure_year_partitions_sync
+from app.services.storage_service import PARTITIONED_TABLES, StorageService, close_storage_pools
+
+class Entry:
+    def __init__(self, entry_date: datetime, content: str, embedding: List[float]):
+        self.date = entry_date
+        self.content = content
+        self.word_count = len(content.split())
+        self.year = entry_date.year
+        self.month = entry_date.month
+        self.day = entry_date.day
+        self.metadata = {"embedding": embedding}
+
+def make_batch(size: int, rng: random.Random) -> List[Entry]:
+    start = datetime(2020, 1, 1) + timedelta(days=rng.randint(0, 1000))
+    return [
+        Entry(start + timedelta(days=i), "a short entry about the day",
+              [rng.random() for _ in range(settings.EMBEDDING_DIMENSIONS)])
+        for i in range(size)
+    ]
+
+def legacy_store_entries(db_url: str, entries: List[Entry]) -> None:
+    """The previous path: a fresh connection and client-side VALUES expansion per call"""
+    conn = psycopg2.connect(db_url)
+    try:
+        with conn.cursor() as cur:
+            entry_ids = execute_values(cur, """
+                INSERT INTO journal_entries (date, content, word_count, year, month, day)
+                VALUES %s RETURNING id
+            """, [(e.date.date(), e.content, e.word_count, e.year, e.month, e.day) for e in entries], fetch=True)
+            execute_values(cur, "INSERT INTO entry_vectors (entry_id, year, embedding) VALUES %s", [
+                (entry_id[0], e.year, str(e.metadata["embedding"])) for entry_id, e in zip(entry_ids, entries)
+            ])
+        conn.commit()
+    finally:
+        conn.close()
+
+def legacy_get_storage_metrics(db_url: str) -> None:
+    conn = psycopg2.connect(db_url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT
+                    pg_size_pretty(pg_total_relation_size('journal_entries')),
+                    pg_size_pretty(pg_total_relation_size('entry_vectors')),
+                    (SELECT COUNT(*) FROM journal_entries),
+                    (SELECT COUNT(*) FROM entry_vectors),
+                    (SELECT AVG(vector_dims(embedding)) FROM entry_vectors)
+            """)
+            cur.fetchone()
+    finally:
+        conn.close()
+
+def create_partitions(db_url: str, batches: List[List[Entry]]) -> None:
+    """The connect-per-call path has no partition handling of its own"""
+    conn = psycopg2.connect(db_url)
+    try:
+        with conn.cursor() as cur:
+            def run(sql):
+                cur.execute(sql)
+                return cur.fetchall() if cur.description else []
+            years = {e.year for batch in batches for e in batch}
+            ensure_year_partitions_sync(run, db_url, PARTITIONED_TABLES, years)
+        conn.commit()
+    finally:
+        conn.close()
+
+def truncate(db_url: str) -> None:
+    conn = psycopg2.connect(db_url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE journal_entries, entry_vectors")
+        conn.commit()
+    finally:
+        conn.close()
+
+def run(call: Callable[[], None], requests: int, concurrency: int) -> List[float]:
+    """Issue requests from a thread pool; return per-request latencies in ms"""
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return (time.perf_counter() - start) * 1000
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(timed, range(requests)))
+
+def report(label: str, latencies: List[float]) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:28s} median {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms")
+
+if __name__ == "__main__":
+    # Uses its own tables (journal_entries, entry_vectors); point it at a scratch database
+    logging.disable(logging.WARNING)
+    db_url = sys.argv[1]
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    rng = random.Random(1)
+    batches = [make_batch(5, rng) for _ in range(requests)]
+
+    service = StorageService(db_url)
+    try:
+        print(f"{requests} requests, {concurrency} concurrent")
+        print("-" * 60)
+        report("metrics, connect per call", run(lambda: legacy_get_storage_metrics(db_url), requests, concurrency))
+        report("metrics, pooled + prepared", run(service.get_storage_metrics, requests, concurrency))
+        create_partitions(db_url, batches)
+        # Each store phase starts from empty tables so HNSW insert cost is comparable
+        truncate(db_url)
+        report("store, connect per call", run(lambda: legacy_store_entries(db_url, batches.pop()), requests // 2, concurrency))
+        truncate(db_url)
+        report("store, pooled + prepared", run(lambda: service.store_entries(batches.pop()), requests // 2, concurrency))
+    finally:
+        truncate(db_url)
+        close_storage_pools()
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from typing import List, Tuple
+from sqlalchemy import delete
+from app.core.config import settings
+from app.db.init_db import AsyncSessionLocal, SessionLocal, async_engine, engine
+from app.db.partitions import connection_runner, ensure_year_partitions_sync
+from app.models.journal import JournalEntry
+from app.services.db_operations import DatabaseOperations
+from app.services.entry_parser import ParsedEntry
+from app.utils.hashing import entry_content_hash
+
+WORDS = (
+    "today I felt really tired after work but the walk in the park helped "
+    "talked with mom about the trip and we planned dinner for friday night "
+    "anxious about the interview grateful for friends coffee rain sunshine"
+).split()
+
+def make_entries(source_file: str, count: int = 10000, seed: int = 5) -> List[ParsedEntry]:
+    """Synthetic parsed entries, one per day"""
+    rng = random.Random(seed)
+    entries = []
+    for offset in range(count):
+        entry_date = date(1990, 1, 1) + timedelta(days=offset)
+        content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 300)))
+        entries.append(ParsedEntry(
+            date=entry_date,
+            day_of_week=entry_date.isoweekday() % 7 + 1,
+            source_file=source_file,
+            content=content
+        ))
+    return entries
+
+def legacy_store_entries(db, entries: List[ParsedEntry]) -> int:
+    """The previous path: one ORM add, commit and refresh per entry"""
+    success_count = 0
+    for entry_data in entries:
+        db_entry = JournalEntry(
+            entry_date=entry_data.date,
+            content=entry_data.content,
+            day_of_week=entry_data.day_of_week,
+            word_count=entry_data.word_count,
+            year=entry_data.year,
+            month=entry_data.month,
+            day=entry_data.day,
+            source_file=entry_data.source_file,
+            content_hash=entry_content_hash(entry_data.content)
+        )
+        db.add(db_entry)
+        db.commit()
+        db.refresh(db_entry)
+        success_count += 1
+    return success_count
+
+def clear(db, source_file: str) -> None:
+    db.execute(delete(JournalEntry).where(JournalEntry.source_file == source_file))
+    db.commit()
+
+async def store_bulk(entries: List[ParsedEntry]) -> Tuple[int, List[str]]:
+    try:
+        async with AsyncSessionLocal() as db:
+            return await DatabaseOperations(db).store_entries(entries)
+    finally:
+        # Pooled connections belong to this event loop
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    logging.disable(logging.ERROR)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    JournalEntry.__table__.create(engine, checkfirst=True)
+    db = SessionLocal()
+
+    # Rows are tagged with a unique source file and removed afterwards
+    source_file = f"benchmark-{uuid.uuid4().hex[:8]}.pdf"
+    entries = make_entries(source_file, count)
+    # The per-row path has no partition handling of its own
+    with engine.begin() as conn:
+        ensure_year_partitions_sync(connection_runner(conn), engine.url, [JournalEntry.__tablename__], {e.year for e in entries})
+
+    try:
+        start = time.perf_counter()
+        legacy_count = legacy_store_entries(db, entries)
+        legacy = time.perf_counter() - start
+        clear(db, source_file)
+
+        start = time.perf_counter()
+        bulk_count, errors = asyncio.run(store_bulk(entries))
+        bulk = time.perf_counter() - start
+
+        # Uploading the same entries again only skips them
+        start = time.perf_counter()
+        repeat_count, _ = asyncio.run(store_bulk(entries))
+        repeat = time.perf_counter() - start
+
+        # One malformed entry in the middle only costs its own row
+        broken = make_entries(source_file, count)
+        broken[count // 2].day_of_week = None
+        clear(db, source_file)
+        isolated_count, isolated_errors = asyncio.run(store_bulk(broken))
+    finally:
+        clear(db, source_file)
+        db.close()
+
+    print(f"{count:,} entries, batch size {settings.DB_INSERT_BATCH_SIZE}")
+    print("-" * 60)
+    print(f"per-row commit:  {legacy * 1000:9.1f} ms  ({legacy_count / legacy:,.0f} rows/sec)")
+    print(f"bulk insert:     {bulk * 1000:9.1f} ms  ({bulk_count / bulk:,.0f} rows/sec, {len(errors)} errors)")
+    print(f"repeat upload:   {repeat * 1000:9.1f} ms  ({repeat_count} rows written)")
+    print(f"with one bad row: {isolated_count:,} stored, {len(isolated_errors)} error(s)")
@@ -0,0 +1,81 @@
+import random
+import re
+import time
+from typing import Callable, List
+from app.services.data_cleaner import DataCleaner
+from app.utils.text_cleaner import clean_text
+
+WORDS = (
+    "today I felt really tired after work but the walk in the park helped "
+    "talked with mom about the trip and we planned dinner for friday night "
+    "anxious about the interview grateful for friends coffee rain sunshine"
+).split()
+
+# Fragments typical of PDF-extracted journal text
+ARTIFACTS = [
+    "\n", "\n\n", "\n\n\n", "  ", "\t", " ,", " .", " !", " ?", "\x0c", "\nPage 12\n", "\n  7  \n",
+    "…", "–", "—", "“", "”", "‘", "’", "-----", "___", "| |", "+--+", "┌──┐", "║", "\x07", "é",
+    "[Image: photo\nof the lake]", "\nFigure 3: the lake\n",
+]
+
+def make_entries(count: int = 5000, seed: int = 7) -> List[str]:
+    """Build synthetic entry bodies sprinkled with PDF artifacts"""
+    rng = random.Random(seed)
+    entries = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(40, 400)):
+            parts.append(rng.choice(WORDS))
+            parts.append(rng.choice(ARTIFACTS) if rng.random() < 0.15 else " ")
+        entries.append("".join(parts))
+    return entries
+
+def legacy_data_cleaner(text: str) -> str:
+    """DataCleaner.clean_text before the shared engine (its no-op quote replacements omitted)"""
+    for artifact in [r'\f', r'\x0c', r'^\s*Page\s+\d+\s*$', r'^\s*\d+\s*$']:
+        text = re.sub(artifact, '', text, flags=re.MULTILINE)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\r\n|\r|\n', '\n', text)
+    text = re.sub(r'\s+([.,!?])', r'\1', text)
+    for old, new in {'…': '...', '–': '-', '—': '-'}.items():
+        text = text.replace(old, new)
+    text = re.sub(r'[-_]{3,}', '', text)
+    text = re.sub(r'[|+]\s*[|+]', '', text)
+    return text.strip()
+
+def legacy_text_cleaner(text: str) -> str:
+    """utils.text_cleaner.clean_text before the shared engine"""
+    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\xff]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r'[|┌┐└┘├┤┬┴┼═║╒╓╔╕╖╗╘╙╚╛╜╝╞╟╠╡╢╣╤╥╦╧╨╩╪╫╬]', '', text)
+    text = re.sub(r'\[Image:.*?\]', '', text, flags=re.DOTALL)
+    text = re.sub(r'Figure \d+:.*?\n', '', text)
+    return text.strip()
+
+def measure(label: str, clean: Callable[[str], str], entries: List[str], runs: int = 3) -> List[str]:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        cleaned = [clean(entry) for entry in entries]
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<10} {best * 1000:8.1f} ms  ({len(entries) / best:,.0f} entries/sec)")
+    return cleaned
+
+def compare(name: str, legacy: Callable[[str], str], engine: Callable[[str], str], entries: List[str]):
+    print(f"{name}:")
+    before = measure("legacy", legacy, entries)
+    after = measure("engine", engine, entries)
+    mismatches = sum(1 for a, b in zip(before, after) if a.encode("utf-8") != b.encode("utf-8"))
+    print(f"  byte-identical: {mismatches == 0} ({len(entries) - mismatches}/{len(entries)} entries)")
+
+if __name__ == "__main__":
+    import sys
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    entries = make_entries(count)
+    print(f"{count:,} entries, {sum(len(e) for e in entries) / 1_048_576:.1f} MB of text")
+    print("-" * 60)
+
+    compare("DataCleaner.clean_text", legacy_data_cleaner, DataCleaner().clean_text, entries)
+    compare("text_cleaner.clean_text", legacy_text_cleaner, clean_text, entries)
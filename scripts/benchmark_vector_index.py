@@ -0,0 +1,95 @@
+import logging
+import statistics
+import sys
+import time
+from typing import List
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+from app.core.config import settings
+from app.db.embeddings import embedding_sql_type, exact_distance_sql
+from app.db.vector_index import VectorIndexManager, search_settings_sync
+from app.utils.quantization import cosine_distances, nearest, normalize, recall_at_k
+
+def make_embeddings(count: int, queries: int, seed: int = 3):
+    """
+    Clustered synthetic embeddings, as topics cluster real journal entries,
+    and queries near stored ones, as questions about the journal are
+    """
+    rng = np.random.default_rng(seed)
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    centers = rng.normal(size=(64, dimensions))
+    vectors = centers[rng.integers(0, 64, count)] + rng.normal(scale=0.8, size=(count, dimensions))
+    return normalize(vectors), rng.normal(scale=0.4, size=(queries, dimensions))
+
+def literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
+
+def run_searches(cur, vectors: np.ndarray, noise: np.ndarray, k: int) -> List[float]:
+    """Median latency (ms) and mean recall@k of searches with the recorded settings"""
+    # Queries near random stored vectors
+    picks = np.random.default_rng(5).integers(0, len(vectors), len(noise))
+    queries = normalize(vectors[picks] + noise * np.abs(vectors).mean())
+    sql = f"""
+        SELECT id FROM vector_index_benchmark
+        ORDER BY {exact_distance_sql("embedding", "%(q)s")} LIMIT {k}
+    """
+    run = lambda statement: cur.execute(statement) or (cur.fetchall() if cur.description else [])
+    latencies, recalls = [], []
+    for query in queries:
+        expected = nearest(cosine_distances(query, vectors), k)
+        start = time.perf_counter()
+        cur.execute("BEGIN")
+        for statement in search_settings_sync(run, "benchmark", "vector_index_benchmark", k):
+            cur.execute(statement)
+        cur.execute(sql, {"q": literal(query)})
+        found = np.array([row[0] for row in cur.fetchall()])
+        cur.execute("COMMIT")
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(recall_at_k(expected, found))
+    return [statistics.median(latencies), float(np.mean(recalls))]
+
+if __name__ == "__main__":
+    # Grows its own vector_index_benchmark table step by step, running index
+    # maintenance after each step; point it at a scratch database
+    logging.disable(logging.WARNING)
+    db_url = sys.argv[1]
+    sizes = [int(size) for size in sys.argv[2].split(",")] if len(sys.argv) > 2 else [500, 5000, 20000, 50000]
+    k = 10
+
+    vectors, noise = make_embeddings(sizes[-1], 100)
+    conn = psycopg2.connect(db_url)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        def run(statement):
+            cur.execute(statement)
+            return cur.fetchall() if cur.description else []
+
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        cur.execute("DROP TABLE IF EXISTS vector_index_benchmark")
+        cur.execute(f"CREATE TABLE vector_index_benchmark (id INTEGER PRIMARY KEY, embedding {embedding_sql_type()})")
+        manager = VectorIndexManager(run, "vector_index_benchmark")
+        print(f"{settings.VECTOR_INDEX_METHOD}, target recall {settings.VECTOR_SEARCH_TARGET_RECALL}, "
+              f"exact below {settings.VECTOR_INDEX_MIN_ROWS:,} rows, recall@{k} of 100 queries")
+        print("-" * 100)
+        print(f"{'rows':>8s} {'action':>10s} {'index':>32s} {'build s':>8s} {'MB':>6s} "
+              f"{'search':>7s} {'median ms':>10s} {'recall':>7s}")
+        loaded = 0
+        for size in sizes:
+            execute_values(cur, "INSERT INTO vector_index_benchmark (id, embedding) VALUES %s",
+                           [(i, literal(vectors[i])) for i in range(loaded, size)], page_size=500)
+            loaded = size
+            cur.execute("ANALYZE vector_index_benchmark")
+            report = manager.maintain()[0]
+            state = run("SELECT build_seconds, index_bytes FROM vector_index_state "
+                        "WHERE table_name = 'vector_index_benchmark'")
+            build, size_bytes = state[0] if state else (0.0, 0)
+            index = f"{report.get('method', 'exact scan')} {report.get('params', '')}"
+            median, recall = run_searches(cur, vectors[:size], noise, k)
+            print(f"{size:8,d} {report['action']:>10s} {index:>32s} {build:8.1f} {size_bytes / 2**20:6.1f} "
+                  f"{str(report.get('search_value', '-')):>7s} {median:10.2f} {recall:7.3f}")
+            # A second pass finds nothing to do
+            assert manager.maintain()[0]["action"] in ("exact", "kept")
+        cur.execute("DROP TABLE vector_index_benchmark")
+        cur.execute("DELETE FROM vector_index_state WHERE table_name = 'vector_index_benchmark'")
+    conn.close()
@@ -0,0 +1,145 @@
+import logging
+import statistics
+import sys
+import time
+from typing import List, Tuple
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+from app.core.config import settings
+from app.db.embeddings import (
+    candidate_count,
+    embedding_sql_type,
+    exact_distance_sql,
+    index_distance_sql,
+    index_expression,
+    index_operator_class,
+    is_quantized,
+)
+from app.utils.quantization import bytes_per_vector, cosine_distances, evaluate, nearest, normalize, recall_at_k
+
+# (storage, dimensions, index quantization); halfvec and binary need pgvector 0.7+
+CONFIGURATIONS = [
+    ("vector", 1536, "none"),
+    ("vector", 256, "none"),
+    ("halfvec", 256, "none"),
+    ("vector", 256, "halfvec"),
+    ("vector", 256, "binary"),
+]
+
+def make_embeddings(count: int, queries: int, seed: int = 7) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Synthetic 1536-dim embeddings whose variance decays across dimensions, so
+    the leading dimensions carry most of the signal, as in embedding models
+    whose vectors may be shortened (text-embedding-3 with ``dimensions``).
+    """
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.sqrt(1 + np.arange(1536) / 64)
+    centers = rng.normal(size=(64, 1536)) * weights
+    vectors = centers[rng.integers(0, 64, count)] + rng.normal(scale=0.6, size=(count, 1536)) * weights
+    query_vectors = vectors[rng.integers(0, count, queries)] + rng.normal(scale=0.3, size=(queries, 1536)) * weights
+    return normalize(vectors), normalize(query_vectors)
+
+def literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
+
+def pgvector_version(cur) -> Tuple[int, ...]:
+    cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    return tuple(int(part) for part in cur.fetchone()[0].split("."))
+
+def run_configuration(cur, vectors: np.ndarray, queries: np.ndarray, truth: List[np.ndarray], k: int) -> dict:
+    """Load ``vectors`` with the current settings, index them and search; returns the measurements."""
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    # Shortened embeddings are renormalized, as the embedding API does
+    stored = normalize(vectors[:, :dimensions])
+    cur.execute("DROP TABLE IF EXISTS vector_benchmark")
+    cur.execute(f"CREATE TABLE vector_benchmark (id INTEGER PRIMARY KEY, embedding {embedding_sql_type()})")
+    execute_values(cur, "INSERT INTO vector_benchmark (id, embedding) VALUES %s",
+                   [(i, literal(vector)) for i, vector in enumerate(stored)], page_size=500)
+
+    start = time.perf_counter()
+    cur.execute(f"""
+        CREATE INDEX vector_benchmark_idx ON vector_benchmark
+        USING hnsw ({index_expression()} {index_operator_class()}) WITH (m = 16, ef_construction = 64)
+    """)
+    build = time.perf_counter() - start
+    cur.execute("ANALYZE vector_benchmark")
+    cur.execute("SELECT pg_relation_size('vector_benchmark_idx'), pg_table_size('vector_benchmark')")
+    index_size, table_size = cur.fetchone()
+
+    limit = candidate_count(k) if is_quantized() else k
+    sql = f"""
+        SELECT id FROM (
+            SELECT id, {exact_distance_sql("embedding", "%(q)s")} AS distance
+            FROM vector_benchmark
+            ORDER BY {index_distance_sql("embedding", "%(q)s")}
+            LIMIT {limit}
+        ) AS candidates
+        ORDER BY distance
+        LIMIT {k}
+    """
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        q = literal(normalize(query[:dimensions]))
+        start = time.perf_counter()
+        cur.execute(sql, {"q": q})
+        found = np.array([row[0] for row in cur.fetchall()])
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(recall_at_k(expected, found))
+    cur.execute("DROP TABLE vector_benchmark")
+    return {
+        "index_mb": index_size / 2**20,
+        "table_mb": table_size / 2**20,
+        "build_s": build,
+        "median_ms": statistics.median(latencies),
+        "recall": float(np.mean(recalls)),
+    }
+
+if __name__ == "__main__":
+    # Creates and drops its own vector_benchmark table; point it at a scratch database
+    logging.disable(logging.WARNING)
+    db_url = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    k = 10
+    if len(sys.argv) > 3:
+        # Real 1536-dim embeddings (a .npy array); how well shortened vectors
+        # keep neighbours depends on the model, which synthetic data cannot show
+        loaded = normalize(np.load(sys.argv[3])[:count + 100])
+        vectors, queries = loaded[:-100], loaded[-100:]
+        count = len(vectors)
+    else:
+        vectors, queries = make_embeddings(count, 100)
+    # Ground truth: exact float32 search over the full 1536 dimensions
+    truth = [nearest(cosine_distances(query, vectors), k) for query in queries]
+
+    conn = psycopg2.connect(db_url)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        version = pgvector_version(cur)
+        print(f"{count:,} vectors, {len(queries)} queries, recall@{k} against exact 1536-dim float32 search")
+        print(f"rerank factor {settings.EMBEDDING_RERANK_FACTOR}, pgvector {'.'.join(map(str, version))}")
+        print("-" * 92)
+        print(f"{'configuration':34s} {'index MB':>9s} {'table MB':>9s} {'build s':>8s} {'median ms':>10s} {'recall':>8s}")
+        for storage, dimensions, quantization in CONFIGURATIONS:
+            label = f"{storage}({dimensions}), index {quantization}"
+            if (storage == "halfvec" or quantization != "none") and version < (0, 7):
+                print(f"{label:34s} skipped: needs pgvector 0.7+")
+                continue
+            settings.EMBEDDING_STORAGE = storage
+            settings.EMBEDDING_DIMENSIONS = dimensions
+            settings.EMBEDDING_INDEX_QUANTIZATION = quantization
+            result = run_configuration(cur, vectors, queries, truth, k)
+            print(f"{label:34s} {result['index_mb']:9.1f} {result['table_mb']:9.1f} {result['build_s']:8.1f} "
+                  f"{result['median_ms']:10.2f} {result['recall']:8.3f}")
+    conn.close()
+
+    # Formats pgvector cannot index (int8) are compared with exact search in memory
+    dimensions = 256
+    shortened = normalize(vectors[:, :dimensions])
+    in_memory = evaluate(shortened, normalize(queries[:, :dimensions]), k, settings.EMBEDDING_RERANK_FACTOR)
+    print("-" * 92)
+    print(f"exact search over {dimensions}-dim codes, recall@{k} against exact {dimensions}-dim float32:")
+    for name, recall in in_memory.items():
+        format = name.split("+")[0]
+        print(f"  {name:14s} {bytes_per_vector(format, dimensions):6.0f} bytes/vector  recall {recall:.3f}")
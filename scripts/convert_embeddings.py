@@ -0,0 +1,28 @@
+import asyncio
+from app.core.config import settings
+from app.db.embeddings import convert_embedding_column, embedding_sql_type
+from app.db.init_db import AsyncSessionLocal, async_engine, engine
+from app.db.partitions import connection_runner
+from app.utils.vector_utils import create_vector_similarity_index
+
+async def create_index():
+    async with AsyncSessionLocal() as db:
+        reports = await create_vector_similarity_index(db)
+    await async_engine.dispose()
+    return reports
+
+def main():
+    # Apply changed EMBEDDING_DIMENSIONS / EMBEDDING_STORAGE / EMBEDDING_INDEX_QUANTIZATION
+    # to an existing database; embeddings of other dimensions are cleared
+    with engine.begin() as conn:
+        run = connection_runner(conn)
+        changed = convert_embedding_column(run, "journal_entries")
+    # Indexes built for other settings are rebuilt
+    reports = asyncio.run(create_index())
+    rebuilt = sum(1 for report in reports if report["action"] in ("built", "rebuilt"))
+    print(f"journal_entries.embedding is {embedding_sql_type()} "
+          f"({'converted' if changed else 'unchanged'}), "
+          f"{rebuilt} partition indexes on {settings.EMBEDDING_INDEX_QUANTIZATION} quantization rebuilt")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import asyncio
+import logging
+import sys
+from app.db.init_db import AsyncSessionLocal, async_engine
+from app.services.embedding_pipeline import embed_pending_entries
+
+async def embed(source_file=None):
+    async with AsyncSessionLocal() as db:
+        stats = await embed_pending_entries(db, source_file=source_file)
+    await async_engine.dispose()
+    return stats
+
+if __name__ == "__main__":
+    # Embeds every entry without an embedding (or those of one source file),
+    # e.g. entries stored while OPENAI_API_KEY was unset or the API failed.
+    # Run scripts/maintain_vector_indexes.py afterwards if many were added.
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(embed(sys.argv[1] if len(sys.argv) > 1 else None)).summary())
@@ -0,0 +1,22 @@
+import asyncio
+from app.db.init_db import AsyncSessionLocal, async_engine
+from app.utils.vector_utils import create_vector_similarity_index
+
+async def maintain():
+    async with AsyncSessionLocal() as db:
+        reports = await create_vector_similarity_index(db)
+    await async_engine.dispose()
+    return reports
+
+if __name__ == "__main__":
+    # Run periodically (and after large uploads): indexes are only rebuilt
+    # when a partition outgrew its parameters, so repeated runs are cheap
+    for report in asyncio.run(maintain()):
+        details = ""
+        if "method" in report:
+            details = f" {report['method']} {report['params']}"
+        if "search_value" in report:
+            details += f", search value {report['search_value']}"
+        if "recall" in report:
+            details += f", recall {report['recall']:.3f}"
+        print(f"{report['partition']}: {report['rows']} embeddings, {report['action']}{details}")
@@ -0,0 +1,14 @@
+import sys
+from app.services.storage_service import StorageService, close_storage_pools
+
+if __name__ == "__main__":
+    # Moves StorageService tables from before partitioning into partitions and
+    # converts entry_vectors to the EMBEDDING_* settings; vectors of other
+    # dimensions are deleted. Run it on StorageService's own database.
+    db_url = sys.argv[1]
+    try:
+        result = StorageService(db_url).migrate_schema()
+    finally:
+        close_storage_pools()
+    print(f"{result['partitioned_entries']} entries moved into partitions, "
+          f"entry_vectors.embedding {'converted' if result['converted_embeddings'] else 'unchanged'}")
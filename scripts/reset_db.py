@@ -1,8 +1,14 @@
-from app.db.init_db import engine, init_db, SessionLocal
+from app.db.init_db import engine, init_db, AsyncSessionLocal, SessionLocal, async_engine
 from app.utils.vector_utils import create_vector_similarity_index
 from sqlalchemy import text
+import asyncio
 from app.models.journal import Base
 
+async def create_index():
+    async with AsyncSessionLocal() as db:
+        await create_vector_similarity_index(db)
+    await async_engine.dispose()
+
 def reset_database():
     # Drop all tables
     engine.dispose()
@@ -10,8 +16,12 @@ def reset_database():
         conn.execute(text('DROP EXTENSION IF EXISTS vector CASCADE'))
         conn.commit()
     
-    # Drop and recreate all tables
+    # Drop and recreate all tables; without a recorded revision init_db
+    # runs every migration again
     Base.metadata.drop_all(bind=engine)
+    with engine.connect() as conn:
+        conn.execute(text('DROP TABLE IF EXISTS alembic_version'))
+        conn.commit()
     
     # Reinitialize everything
     init_db()
@@ -21,7 +31,7 @@ def reset_database():
     try:
         db.execute(text('CREATE EXTENSION IF NOT EXISTS vector'))
         db.commit()
-        create_vector_similarity_index(db)
+        asyncio.run(create_index())
         print("Database reset successfully!")
     except Exception as e:
         print(f"Error during reset: {e}")
@@ -1,7 +1,13 @@
 from app.db.init_db import init_db
 from app.utils.vector_utils import create_vector_similarity_index
-from app.db.init_db import SessionLocal
+from app.db.init_db import AsyncSessionLocal, SessionLocal, async_engine
 from sqlalchemy import text
+import asyncio
+
+async def create_index():
+    async with AsyncSessionLocal() as db:
+        await create_vector_similarity_index(db)
+    await async_engine.dispose()
 
 def main():
     # Initialize database and create tables
@@ -15,7 +21,7 @@ def main():
         print("Vector extension created successfully!")
         
         # Create vector similarity index
-        create_vector_similarity_index(db)
+        asyncio.run(create_index())
         print("Vector similarity index created successfully!")
     except Exception as e:
         print(f"Error during setup: {e}")
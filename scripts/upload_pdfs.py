@@ -2,8 +2,8 @@ import requests
 from pathlib import Path
 
 def upload_pdfs(pdf_files, base_url):
-    """Upload PDFs to Replit instance"""
-    url = f"{base_url}/api/upload/"
+    """Upload PDFs to Replit instance as a single batch"""
+    url = f"{base_url}/api/upload/batch/"
     files = [
         ('files', (f.name, open(f, 'rb'), 'application/pdf'))
         for f in pdf_files
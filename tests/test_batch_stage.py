@@ -0,0 +1,27 @@
+import asyncio
+from datetime import date, timedelta
+from app.services.batch_stage import clean_and_validate, shard_size_for, shutdown_batch_stage_pool
+from app.services.entry_parser import ParsedEntry
+
+def _entries(count):
+    text = "Walked to the park and met an old friend for coffee in the afternoon sun"
+    return [
+        ParsedEntry(date(2019, 1, 1) + timedelta(days=i), 0, "test.pdf", text=f"{text} {i}")
+        for i in range(count)
+    ]
+
+def test_shards_are_sized_from_the_worker_count():
+    assert shard_size_for(100, 8, 10) == 13
+    assert shard_size_for(100, 32, 10) == 10
+    assert shard_size_for(100, 1, 10) == 100
+    assert shard_size_for(0, 4, 10) == 10
+
+def test_results_come_back_in_input_order():
+    entries = _entries(40)
+    try:
+        for workers in (1, 2):
+            result = asyncio.run(clean_and_validate(_entries(40), max_workers=workers, min_shard_size=10))
+            assert [entry.date for entry in result.valid_entries] == [entry.date for entry in entries]
+            assert not result.errors
+    finally:
+        shutdown_batch_stage_pool()
@@ -0,0 +1,71 @@
+import random
+from datetime import date, datetime
+from pydantic import ValidationError
+from app.models.validation import JournalEntryValidation
+from app.services.batch_validator import BatchValidator
+from app.services.validation_service import ValidationService
+
+NOW = datetime(2024, 6, 1)
+
+class Entry:
+    def __init__(self, entry_date, content, word_count=None, year=None, month=None, day=None):
+        self.date = entry_date
+        self.content = content
+        self.word_count = len(content.split()) if word_count is None and isinstance(content, str) else word_count
+        self.year = entry_date.year if year is None and entry_date else year
+        self.month = entry_date.month if month is None and entry_date else month
+        self.day = entry_date.day if day is None and entry_date else day
+
+def is_valid(entry):
+    """The per-entry rules: pydantic field validation, then the consistency checks"""
+    try:
+        validated = JournalEntryValidation(
+            date=entry.date, content=entry.content, word_count=entry.word_count,
+            year=entry.year, month=entry.month, day=entry.day
+        )
+    except ValidationError:
+        return False
+    return ValidationService()._check_entry_consistency(validated) and validated.date <= NOW
+
+def test_reports_failed_rules_per_row():
+    entries = [
+        Entry(date(2021, 5, 4), "A quiet morning walk by the river."),
+        Entry(date(2021, 5, 4), "short"),
+        Entry(date(2018, 5, 4), "Bad\x0c characters here", word_count=0),
+        Entry(date(2021, 5, 4), "1234567890 !!"),
+        Entry(date(2021, 5, 4), "A quiet morning walk by the river.", day=5),
+        Entry(date(2024, 7, 1), "A quiet morning walk by the river."),
+        Entry(date(2021, 5, 4), "Supercalifragilisticexpialidocious words"),
+        Entry(None, None, word_count=None, year=2021, month=5, day=4),
+    ]
+    result = BatchValidator().validate(entries, now=NOW)
+
+    assert list(result.mask) == [True, False, False, False, False, False, False, False]
+    assert result.reasons[1] == ["content_length"]
+    assert result.reasons[2] == ["date_range", "content_invalid_chars", "word_count_positive", "year_range"]
+    assert result.reasons[3] == ["content_no_letters"]
+    assert result.reasons[4] == ["date_components_mismatch"]
+    assert result.reasons[5] == ["future_date"]
+    assert result.reasons[6] == ["avg_word_length"]
+    assert result.reasons[7] == ["date_missing", "content_missing", "word_count_missing"]
+    assert result.valid_count == 1
+    assert [index for index, _ in result.failures()] == [1, 2, 3, 4, 5, 6, 7]
+
+def test_matches_per_entry_validation():
+    rng = random.Random(11)
+    common = ["word", " ", " ", "\n", "!", "7", "\u201c", "\U0001d400", "aaaaaaaaaaaaaaaaaaaa"]
+    # Roman numeral, vulgar fraction, Latin-1, form feed, separator, em space
+    rare = ["\u216b", "\xbd", "\xe9", "\x0c", "\x1c", "\u2003", "  "]
+    entries = []
+    for _ in range(3000):
+        content = "".join(
+            rng.choice(rare if rng.random() < 0.03 else common) for _ in range(rng.randint(0, 30))
+        )
+        entry_date = rng.choice([date(2021, 3, 9), date(2018, 12, 31), date(2024, 12, 31), datetime(2024, 5, 31, 23, 59)])
+        entry = Entry(entry_date, content)
+        entry.word_count = rng.choice([entry.word_count] * 4 + [entry.word_count + 6, entry.word_count - 5, 0])
+        entries.append(entry)
+
+    result = BatchValidator().validate(entries, now=NOW)
+
+    assert list(result.mask) == [is_valid(entry) for entry in entries]
@@ -0,0 +1,61 @@
+import asyncio
+import httpx
+import numpy as np
+import pytest
+from openai import AsyncOpenAI, RateLimitError
+from app.core.config import settings
+from app.services.embedding_pipeline import EmbeddingPipeline, EmbeddingStats, backoff_delay, pack_batches
+from app.utils.embedding_stand_in import EmbeddingStandIn, stand_in_vector
+
+def _pipeline(stand_in, **options):
+    return EmbeddingPipeline(client=AsyncOpenAI(api_key="test", base_url=stand_in.url, max_retries=0), **options)
+
+def test_batches_respect_token_budget_and_size():
+    texts = ["a" * 30, "b" * 30, "c" * 30, "d" * 300, "e"]
+    assert pack_batches(texts, max_tokens=25, max_texts=10) == [[0, 1], [2], [3], [4]]
+    assert pack_batches(texts, max_tokens=1000, max_texts=2) == [[0, 1], [2, 3], [4]]
+
+def test_backoff_honours_retry_after():
+    response = httpx.Response(429, headers={"retry-after-ms": "250"}, request=httpx.Request("POST", "http://test"))
+    error = RateLimitError("rate limited", response=response, body=None)
+    assert 0.25 <= backoff_delay(0, error) <= 0.375
+    assert 1.0 <= backoff_delay(2, error) <= 1.5
+
+def test_vectors_come_back_in_order_with_bounded_concurrency():
+    texts = [f"entry {i} " + "word " * (i % 40) for i in range(120)]
+    with EmbeddingStandIn(latency=0.01) as stand_in:
+        stats = EmbeddingStats()
+        vectors = asyncio.run(_pipeline(stand_in, concurrency=3, batch_size=8).embed(texts, stats))
+        assert stand_in.max_in_flight <= 3
+    assert len(vectors) == 120 and len(vectors[0]) == 256
+    assert all(np.allclose(vectors[i], stand_in_vector(texts[i], 256), atol=1e-6) for i in (0, 57, 119))
+    assert stats.texts == 120 and stats.requests == 15 and stats.tokens > 0
+
+def test_rate_limited_requests_are_retried():
+    texts = [f"entry {i} " + "word " * 50 for i in range(60)]
+    with EmbeddingStandIn(tpm=1200, window=0.2) as stand_in:
+        stats = EmbeddingStats()
+        vectors = asyncio.run(_pipeline(stand_in, concurrency=4, batch_size=5).embed(texts, stats))
+        assert stand_in.rate_limited > 0
+    assert stats.retries == stand_in.rate_limited
+    assert all(vector is not None for vector in vectors)
+
+def test_gives_up_after_max_retries():
+    with EmbeddingStandIn(rpm=1, window=30) as stand_in:
+        pipeline = _pipeline(stand_in, max_retries=0)
+        asyncio.run(pipeline.embed(["first"]))
+        with pytest.raises(RateLimitError):
+            asyncio.run(pipeline.embed(["second"]))
+
+def test_text_over_the_input_limit_is_skipped(monkeypatch):
+    # Truncation keeps texts within the stand-in's limit, as the stand-in counts
+    # more characters per token than the estimate; a laxer limit lets one through
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_INPUT_TOKENS", 20000)
+    texts = [f"entry {i}" for i in range(10)]
+    texts[6] = "x" * 40000
+    with EmbeddingStandIn() as stand_in:
+        stats = EmbeddingStats()
+        vectors = asyncio.run(_pipeline(stand_in, batch_size=4).embed(texts, stats))
+    assert vectors[6] is None
+    assert all(vectors[i] is not None for i in range(10) if i != 6)
+    assert stats.skipped == 1 and stats.texts == 9
@@ -0,0 +1,71 @@
+import pickle
+import asyncio
+from datetime import date
+from app.services.entry_parser import EntryParser
+
+SAMPLE = """January
+
+1/1/2020 – Wednesday
+New year, new journal.
+
+Walked to the lake.
+January
+1/2/2020 - Thursday
+Work started again.
+2/30/2020 – Sunday
+Not a real date.
+1/3/2020 – Friday
+   Quiet day at home.
+"""
+
+def _stream(pages):
+    async def gen():
+        for page_number, text in enumerate(pages):
+            yield page_number, text
+    return gen()
+
+def test_parse_entries_scans_headers_and_cleans_bodies():
+    entries = EntryParser().parse_entries(SAMPLE, source_file="sample.pdf")
+
+    assert [e.date for e in entries] == [date(2020, 1, 1), date(2020, 1, 2), date(2020, 1, 3)]
+    assert entries[0].content == "New year, new journal.\nWalked to the lake."
+    assert entries[1].content == "Work started again."
+    assert entries[2].content == "Quiet day at home."
+    assert entries[0].day_of_week == 4
+    assert entries[0].word_count == 8
+
+def test_parse_entries_ignores_preamble():
+    entries = EntryParser().parse_entries("My Journal\nby me\n" + SAMPLE, source_file="sample.pdf")
+    assert len(entries) == 3
+    assert entries[0].content == "New year, new journal.\nWalked to the lake."
+
+def test_iter_entries_matches_parse_entries_across_page_breaks():
+    parser = EntryParser()
+    lines = SAMPLE.split("\n")
+    # The first entry spans pages 0 and 1; the rest start on page 2
+    pages = ["\n".join(lines[:4]), "\n".join(lines[4:7]), "\n".join(lines[7:])]
+
+    async def collect():
+        return [e async for e in parser.iter_entries(_stream(pages), source_file="sample.pdf")]
+
+    streamed = asyncio.run(collect())
+    expected = parser.parse_entries("\n".join(pages), source_file="sample.pdf")
+
+    assert [e.to_dict() for e in streamed] == [dict(e.to_dict(), page=p) for e, p in zip(expected, [0, 2, 2])]
+
+def test_record_keeps_parsed_word_count_when_content_is_replaced():
+    entry = EntryParser().parse_entries(SAMPLE, source_file="sample.pdf")[0]
+    assert entry.year == 2020 and entry.month == 1 and entry.day == 1
+
+    entry.content = "cleaned"
+    assert entry.content == "cleaned"
+    assert entry.word_count == 8
+    assert entry.to_dict()["content"] == "cleaned"
+
+def test_record_pickles_only_its_own_body():
+    entry = EntryParser().parse_entries(SAMPLE, source_file="sample.pdf")[1]
+    payload = pickle.dumps(entry)
+    assert b"lake" not in payload
+
+    restored = pickle.loads(payload)
+    assert restored.to_dict() == entry.to_dict()
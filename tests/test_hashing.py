@@ -0,0 +1,48 @@
+import io
+import pdfplumber
+from app.utils.hashing import manifest_key, page_content_hash
+
+def _pdf(objects):
+    """Serialize numbered PDF objects (1 = catalog) with a valid xref table."""
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return io.BytesIO(out.getvalue())
+
+def _stream(data):
+    return b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data)
+
+def _pages(font_a, font_b):
+    """Two pages with identical operators split over a /Contents array, drawn with different fonts."""
+    return _pdf([
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 /MediaBox [0 0 200 200] >>",
+        b"<< /Type /Page /Parent 2 0 R /Contents [5 0 R 6 0 R] /Resources << /Font << /F1 7 0 R >> >> >>",
+        b"<< /Type /Page /Parent 2 0 R /Contents [5 0 R 6 0 R] /Resources << /Font << /F1 8 0 R >> >> >>",
+        _stream(b"BT /F1 12 Tf 20 100 Td"),
+        _stream(b"(Dear diary) Tj ET"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /%s >>" % font_a,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /%s >>" % font_b,
+    ])
+
+def test_contents_arrays_are_resolved_and_fonts_distinguish_pages():
+    with pdfplumber.open(_pages(b"Helvetica", b"Courier")) as pdf:
+        first, second = (page_content_hash(page) for page in pdf.pages)
+    assert first != second
+    with pdfplumber.open(_pages(b"Helvetica", b"Helvetica")) as pdf:
+        first, second = (page_content_hash(page) for page in pdf.pages)
+    assert first == second
+
+def test_extractor_tiers_are_part_of_the_key():
+    with pdfplumber.open(_pages(b"Helvetica", b"Courier")) as pdf:
+        page = pdf.pages[0]
+        assert page_content_hash(page, "pdfium,pdfplumber") != page_content_hash(page, "pdfplumber")
+    assert manifest_key("abc", "pdfium,pdfplumber") != manifest_key("abc", "pdfplumber")
@@ -0,0 +1,13 @@
+from datetime import date
+import pytest
+from app.utils.pagination import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(date(2010, 6, 1), 101004)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (date(2010, 6, 1), 101004)
+
+@pytest.mark.parametrize("cursor", ["nope!", encode_cursor(date(2010, 6, 1), 1)[:-3], "MjAxMC0wNi0wMQ"])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
@@ -0,0 +1,34 @@
+import numpy as np
+from app.utils.quantization import (
+    dequantize_int8,
+    evaluate,
+    hamming_distances,
+    nearest,
+    quantize_binary,
+    quantize_int8,
+    recall_at_k,
+)
+
+def test_int8_round_trip_error_is_within_half_a_step():
+    vectors = np.random.default_rng(0).normal(size=(100, 16)).astype(np.float32)
+    codes, offset, scale = quantize_int8(vectors)
+    assert codes.dtype == np.int8
+    assert np.all(np.abs(dequantize_int8(codes, offset, scale) - vectors) <= scale / 2 + 1e-6)
+
+def test_binary_quantization_packs_sign_bits():
+    bits = quantize_binary(np.array([[0.5, -1, 2, 0, -3, 1, 1, -1, 4]]))
+    assert bits.tolist() == [[0b10100110, 0b10000000]]
+    assert hamming_distances(bits[0], quantize_binary(np.array([[-0.5, -1, 2, 0, -3, 1, 1, -1, -4]]))).tolist() == [2]
+
+def test_nearest_and_recall():
+    assert nearest(np.array([0.3, 0.1, 0.9, 0.2]), 2).tolist() == [1, 3]
+    assert recall_at_k(np.array([1, 2, 3, 4]), np.array([4, 3, 9, 8])) == 0.5
+
+def test_reranking_recovers_recall_lost_to_binary_quantization():
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(2000, 64)).astype(np.float32)
+    recall = evaluate(vectors, vectors[:20] + rng.normal(scale=0.3, size=(20, 64)), k=10, rerank_factor=8)
+
+    assert recall["float16"] > 0.95
+    assert recall["int8"] > 0.85
+    assert recall["binary+rerank"] > recall["binary"]
@@ -0,0 +1,13 @@
+from app.services.data_cleaner import DataCleaner
+from app.utils.text_cleaner import clean_text
+
+def test_entry_cleaning_removes_pdf_and_table_artifacts():
+    text = "Morning walk\x0c\nPage 4\n  12  \nSaw a heron , then rain !\n\n\nIt was cold… really – cold\n-----\n| |"
+    assert DataCleaner().clean_text(text) == "Morning walk Saw a heron, then rain! It was cold... really - cold"
+
+def test_entry_cleaning_keeps_page_numbers_inside_sentences():
+    assert DataCleaner().clean_text("Read page 4 of 12 today") == "Read page 4 of 12 today"
+
+def test_extracted_text_cleaning():
+    text = "\x07Caf\xe9  notes\n\n\n║ table ║ [Image: a\nphoto] end  "
+    assert clean_text(text) == "Caf notes  table   end"
@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import pytest
+from starlette.requests import Request
+from app.utils.uploads import UploadTooLargeError, spool_multipart_files
+
+BOUNDARY = b"spool-test-boundary"
+
+def _body(*parts):
+    body = b""
+    for name, filename, data in parts:
+        body += b"--" + BOUNDARY + b"\r\n"
+        body += b'Content-Disposition: form-data; name="%s"; filename="%s"\r\n' % (name, filename)
+        body += b"Content-Type: application/pdf\r\n\r\n" + data + b"\r\n"
+    return body + b"--" + BOUNDARY + b"--\r\n"
+
+def _spool(body, tmp_path, chunk_size=100, content_length=True, **options):
+    """Run spool_multipart_files over ``body`` sent in chunks; returns (result or error, chunks read)."""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    read = 0
+
+    async def receive():
+        nonlocal read
+        read += 1
+        return {"type": "http.request", "body": chunks[read - 1], "more_body": read < len(chunks)}
+
+    headers = [(b"content-type", b"multipart/form-data; boundary=" + BOUNDARY)]
+    if content_length:
+        headers.append((b"content-length", str(len(body)).encode()))
+    request = Request({"type": "http", "method": "POST", "headers": headers}, receive)
+    try:
+        result = asyncio.run(spool_multipart_files(request, spool_dir=str(tmp_path), **options))
+    except ValueError as e:
+        result = e
+    return result, read
+
+def test_files_are_spooled_with_size_and_hash(tmp_path):
+    first, second = b"%PDF-1.4 first" * 50, b"%PDF-1.4 second"
+    uploads, _ = _spool(_body((b"files", b"a.pdf", first), (b"other", b"x.pdf", b"ignored"), (b"files", b"b.pdf", second)),
+                        tmp_path, field="files", max_size=10_000)
+    assert [(u.filename, u.size, u.sha256) for u in uploads] == [
+        ("a.pdf", len(first), hashlib.sha256(first).hexdigest()),
+        ("b.pdf", len(second), hashlib.sha256(second).hexdigest()),
+    ]
+    assert open(uploads[0].path, "rb").read() == first
+
+def test_oversized_file_is_rejected_while_streaming(tmp_path):
+    body = _body((b"file", b"big.pdf", b"x" * 100_000))
+    error, read = _spool(body, tmp_path, content_length=False, field="file", max_size=1_000)
+    assert isinstance(error, UploadTooLargeError)
+    # Stopped right after the limit, not at the end of the 1,000 chunk body
+    assert read < 20
+    assert list(tmp_path.iterdir()) == []
+
+def test_content_length_rejects_before_reading(tmp_path):
+    error, read = _spool(_body((b"file", b"big.pdf", b"x" * 200_000)), tmp_path, field="file", max_size=1_000, max_files=1)
+    assert isinstance(error, UploadTooLargeError) and read == 0
+
+def test_non_pdf_and_missing_files_are_rejected(tmp_path):
+    error, _ = _spool(_body((b"file", b"notes.txt", b"text")), tmp_path, field="file", max_size=1_000)
+    assert "Only .pdf files are supported" in str(error)
+    error, _ = _spool(_body((b"other", b"a.pdf", b"data")), tmp_path, field="file", max_size=1_000)
+    assert "No file was uploaded" in str(error)
+    error, _ = _spool(_body((b"file", b"a.pdf", b"1"), (b"file", b"b.pdf", b"2")), tmp_path, field="file", max_size=1_000, max_files=1)
+    assert "Too many files" in str(error)
+    assert list(tmp_path.iterdir()) == []
+
+def test_extra_file_is_rejected_before_its_data(tmp_path):
+    body = _body((b"file", b"a.pdf", b"1"), (b"file", b"b.pdf", b"x" * 100_000))
+    error, read = _spool(body, tmp_path, content_length=False, field="file", max_size=1_000_000, max_files=1)
+    assert "Too many files" in str(error)
+    # Stopped at the second part's headers, not at the end of the 1,000 chunk body
+    assert read < 5
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,44 @@
+from datetime import date
+from app.services.data_validator import DataValidator
+from app.services.entry_parser import ParsedEntry
+from app.services.validation_diagnostics import ValidationDiagnostics
+
+def test_counts_are_aggregated_and_samples_bounded():
+    diagnostics = ValidationDiagnostics(max_samples=3)
+    for day in range(1, 11):
+        diagnostics.record_failure(["empty_content"], "a.pdf", date(2021, 1, day))
+    diagnostics.record_failure(["missing_date", "empty_content"], "b.pdf")
+    diagnostics.record_checked(50)
+
+    summary = diagnostics.to_dict()
+    assert summary["checked"] == 50
+    assert summary["failed"] == 11
+    assert summary["rules"] == {"empty_content": 11, "missing_date": 1}
+    assert summary["source_files"] == {"a.pdf": 10, "b.pdf": 1}
+    assert [sample["date"] for sample in summary["samples"]] == ["2021-01-09", "2021-01-10", None]
+
+def test_merge_keeps_the_sample_bound():
+    total = ValidationDiagnostics(max_samples=2)
+    for _ in range(3):
+        shard = ValidationDiagnostics(max_samples=2)
+        shard.record_failure(["empty_content"], "a.pdf")
+        shard.record_checked(10)
+        total.merge(shard)
+
+    assert total.checked == 30
+    assert total.rule_counts["empty_content"] == 3
+    assert len(total.samples) == 2
+
+def test_data_validator_records_failures():
+    entries = [
+        ParsedEntry(date(2021, 1, 1), 6, "a.pdf", content="A walk."),
+        ParsedEntry(date(2021, 1, 2), 7, "a.pdf", content="   "),
+        ParsedEntry(date(2021, 1, 3), 1, "", content="Text"),
+    ]
+    diagnostics = ValidationDiagnostics()
+
+    valid = DataValidator().validate_entries(entries, diagnostics)
+
+    assert valid == entries[:1]
+    assert diagnostics.checked == 3
+    assert dict(diagnostics.rule_counts) == {"empty_content": 1, "missing_source_file": 1}
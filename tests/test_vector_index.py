@@ -0,0 +1,23 @@
+from app.core.config import settings
+from app.db.vector_index import IndexPlan, _statements, plan_index, search_values
+
+def test_small_partitions_are_searched_exactly():
+    assert plan_index(settings.VECTOR_INDEX_MIN_ROWS - 1) is None
+    assert plan_index(settings.VECTOR_INDEX_MIN_ROWS).method == "hnsw"
+
+def test_index_parameters_grow_with_the_partition():
+    assert plan_index(50_000, "hnsw").params == {"m": 16, "ef_construction": 64}
+    assert plan_index(500_000, "hnsw").params == {"m": 24, "ef_construction": 128}
+    assert plan_index(20_000, "ivfflat").params == {"lists": 20}
+    assert plan_index(4_000_000, "ivfflat").params == {"lists": 2000}
+
+def test_search_values_start_at_the_rows_fetched():
+    assert search_values(IndexPlan("hnsw", {"m": 16, "ef_construction": 64}), 10)[:2] == [40, 64]
+    assert search_values(IndexPlan("hnsw", {"m": 16, "ef_construction": 64}), 80)[:3] == [80, 100, 160]
+    assert search_values(IndexPlan("ivfflat", {"lists": 20}), 10) == [1, 2, 4, 8, 16, 20]
+
+def test_search_settings_take_the_largest_value_of_the_searched_partitions():
+    recorded = [("t_y2023", "hnsw", 64), ("t_y2024", "hnsw", 160), ("t_y2024", "ivfflat", 4)]
+    assert _statements(recorded, None, 10) == ["SET LOCAL hnsw.ef_search = 160", "SET LOCAL ivfflat.probes = 4"]
+    assert _statements(recorded, "t_y2023", 100) == ["SET LOCAL hnsw.ef_search = 100"]
+    assert _statements(recorded, "t_y2022", 10) == []